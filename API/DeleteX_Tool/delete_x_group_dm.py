@@ -1,40 +1,60 @@
 # X（旧Twitter）グループDMリクエスト自動削除ツール（Selenium+API版/Bearer自動取得）
-# 必要パッケージ: selenium, webdriver_manager, requests
+# 必要パッケージ: requests（初回の認証取得のみ selenium, webdriver_manager）
 # 使い方:
-# 1. ChromeでXにログイン（手動ログイン）
-# 2. DMリクエストページで1件だけ手動で「会話から退出」操作を行う
-# 3. Bearerトークンが自動取得されたら、以降APIで自動削除
+# 1. 初回はChromeが起動するので、Xに手動でログインする
+# 2. ブラウザが送るAPIリクエストからBearerトークン・ct0・Cookieを自動取得し、
+#    auth_bundle.jsonに保存してChromeを終了する
+# 3. 以降はブラウザなしでAPIだけで自動削除
+#    （x_api.DeleteEngineで並列・レート制限追従しながら退出）
+# 4. 進捗はdelete_x_journal.jsonlに記録され、中断しても再実行で続きから再開
+#    2回目以降はauth_bundle.jsonを使うためChromeは起動しない（期限切れ時のみ再取得）
+#
+#   python delete_x_group_dm.py                # 保存済みの認証情報があればブラウザなしで実行
+#   python delete_x_group_dm.py --recapture    # 認証情報を取り直す
+#   python delete_x_group_dm.py --capture-only # 認証情報の取得・保存だけ行う
 
-import time
-import random
+import argparse
+import json
+import os
 import tempfile
-import requests
-import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-# DMリクエストページへ移動
-def go_to_dm_requests(driver):
-    driver.get('https://x.com/messages/requests/additional')
-    time.sleep(5)
-
-# Seleniumで会話IDを抽出（リクエストタブ専用）
-def get_conversation_ids(driver):
-    # 「/messages/リクエスト」ページ専用: /messages/<数字>/participants 形式のhrefのみ抽出
-    elems = driver.find_elements(By.XPATH, "//a[starts-with(@href, '/messages/') and contains(@href, '/participants')]")
-    ids = set()
-    for elem in elems:
-        href = elem.get_attribute('href')
-        if href:
-            m = re.match(r'/messages/(\d+)/participants$', href)
-            if m:
-                ids.add(m.group(1))
-    return list(ids)
+import time
+from journal import Journal
+from x_api import BASE_URL, AuthBundle, DeleteEngine, InboxScanner, XApiError
+
+AUTH_BUNDLE_PATH = 'auth_bundle.json'
+JOURNAL_PATH = 'delete_x_journal.jsonl'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
+
+# Chromeを起動（seleniumは認証取得時のみ必要なのでここで読み込む）
+def start_chrome(profile_dir=None, headless=False):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = webdriver.ChromeOptions()
+    options.add_argument(f'--user-data-dir={profile_dir or tempfile.mkdtemp()}')
+    options.add_argument('--profile-directory=Default')
+    options.add_argument(f'--user-agent={USER_AGENT}')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--log-level=3')  # エラーレベルのみ
+    options.add_argument('--disable-logging')
+    if headless:
+        options.add_argument('--headless=new')
+    # performanceログはNetworkドメインのみ有効化（Page・Timelineのイベントは溜めない）
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    # ChromeDriverのログも捨てる
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install(), log_path=os.devnull),
+        options=options
+    )
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        "source": """
+            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+        """
+    })
+    driver.switch_to.window(driver.window_handles[0])
+    return driver
 
 # Seleniumでcookie/ct0取得
 def get_auth_info(driver):
@@ -44,163 +64,156 @@ def get_auth_info(driver):
     csrf_token = cookie_dict.get('ct0', None)
     return cookie_str, csrf_token
 
-# CDPでBearerトークンを自動取得
+# CDPのNetwork.requestWillBeSentからBearerトークン付きのAPIリクエストを探す
+# get_log()は読んだ分のバッファを消費するため、呼ぶたびに新しいイベントだけを見る
 def get_bearer_token(driver):
-    token = None
     for entry in driver.get_log('performance'):
         msg = entry['message']
-        if 'authorization' in msg and 'Bearer ' in msg:
-            m = re.search(r'Bearer ([a-zA-Z0-9%-._~+/=]+)', msg)
-            if m:
-                token = m.group(1)
-                break
-    return token
-
-# APIでグループDM退出
-# driver引数を追加し、User-Agentを動的取得
-# 必要なヘッダーをすべて追加
-
-def leave_group_dm_api(conversation_id, cookie_str, csrf_token, bearer_token, driver):
-    url = f"https://x.com/i/api/1.1/dm/conversation/{conversation_id}/delete.json"
-    user_agent = driver.execute_script("return navigator.userAgent;")
-    headers = {
-        "authorization": f"Bearer {bearer_token}",
-        "x-csrf-token": csrf_token,
-        "cookie": cookie_str,
-        "content-type": "application/json",
-        "user-agent": user_agent,
-        "referer": "https://x.com/messages/requests/additional",
-        "x-twitter-auth-type": "OAuth2Session",
-        "x-twitter-active-user": "yes",
-        "accept": "*/*",
-        "accept-language": "ja,en-US;q=0.9,en;q=0.8",
-        "origin": "https://x.com",
-        "sec-fetch-site": "same-origin",
-        "sec-fetch-mode": "cors",
-        "sec-fetch-dest": "empty"
-    }
-    resp = requests.post(url, headers=headers)
-    print(f"{conversation_id} 削除レスポンス: {resp.text}")
-    return resp
-
-# APIからグループDM会話ID一覧を取得
-# driver, cookie_str, csrf_token, bearer_tokenを利用
-
-def get_group_dm_ids_via_api(cookie_str, csrf_token, bearer_token, driver):
-    url = "https://x.com/i/api/1.1/dm/inbox_initial_state.json?nsfw_filtering_enabled=false&filter_low_quality=true&include_quality=all&include_profile_interstitial_type=1&include_blocking=1&include_blocked_by=1&include_followed_by=1&include_want_retweets=1&include_mute_edge=1&include_can_dm=1&include_can_media_tag=1&include_ext_is_blue_verified=1&include_ext_verified_type=1&include_ext_profile_image_shape=1&skip_status=1&dm_secret_conversations_enabled=false&krs_registration_enabled=false&cards_platform=Web-12&include_cards=1&include_ext_alt_text=true&include_ext_limited_action_results=true&include_quote_count=true&include_reply_count=1&tweet_mode=extended&include_ext_views=true&dm_users=true&include_groups=true&include_inbox_timelines=true&include_ext_media_color=true&supports_reactions=true&supports_edit=true&include_ext_edit_control=true&include_ext_business_affiliations_label=true&include_ext_parody_commentary_fan_label=true&ext=mediaColor,altText,mediaStats,highlightedLabel,parodyCommentaryFanLabel,voiceInfo,birdwatchPivot,superFollowMetadata,unmentionInfo,editControl,article"
-    user_agent = driver.execute_script("return navigator.userAgent;")
-    headers = {
-        "authorization": f"Bearer {bearer_token}",
-        "x-csrf-token": csrf_token,
-        "cookie": cookie_str,
-        "user-agent": user_agent,
-        "accept": "application/json, text/plain, */*",
-        "referer": "https://x.com/messages/requests/additional",
-        "x-twitter-auth-type": "OAuth2Session",
-        "x-twitter-active-user": "yes",
-        "accept-language": "ja,en-US;q=0.9,en;q=0.8",
-        "origin": "https://x.com",
-        "sec-fetch-site": "same-origin",
-        "sec-fetch-mode": "cors",
-        "sec-fetch-dest": "empty"
-    }
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        print(f"DMリストAPI取得失敗: {resp.status_code} {resp.text}")
-        return []
-    try:
-        data = resp.json()
-        ids = []
-        # inboxTimelines > entries > messageConversation > conversationType == 'Group'
-        timelines = data.get('inboxTimelines', {})
-        for timeline in timelines.values():
-            for entry in timeline.get('entries', []):
-                conv = entry.get('messageConversation', {})
-                if conv.get('conversationType') == 'Group':
-                    ids.append(conv.get('conversationId'))
-        return ids
-    except Exception as e:
-        print(f"DMリストJSON解析エラー: {e}")
-        return []
+        # JSONとして解析する前に安価な文字列判定で大半のイベントを除外
+        if 'Network.requestWillBeSent' not in msg or '/i/api/' not in msg:
+            continue
+        try:
+            event = json.loads(msg)['message']
+        except (ValueError, KeyError):
+            continue
+        if event.get('method') != 'Network.requestWillBeSent':
+            continue
+        request = event.get('params', {}).get('request', {})
+        for name, value in request.get('headers', {}).items():
+            if name.lower() == 'authorization' and value.startswith('Bearer '):
+                return value[len('Bearer '):]
+    return None
 
-def main():
-    import os
-    options = webdriver.ChromeOptions()
-    tmp_profile = tempfile.mkdtemp()
-    options.add_argument(f'--user-data-dir={tmp_profile}')
-    options.add_argument('--profile-directory=Default')
-    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument('--log-level=3')  # エラーレベルのみ
-    options.add_argument('--disable-logging')
-    # performanceログ有効化
-    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-    driver = None
+# ログイン済みのブラウザが送るAPIリクエストを監視して認証情報を取得する
+def capture_auth(profile_dir=None, headless=False, timeout=600, poll_interval=1.0):
+    driver = start_chrome(profile_dir, headless)
     try:
-        # ChromeDriverのログも捨てる
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install(), log_path=os.devnull),
-            options=options
-        )
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": """
-                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            """
-        })
-        driver.switch_to.window(driver.window_handles[0])
         driver.get('https://x.com/')
         print('''\nChromeが起動しました。\n''')
         print('【操作手順】')
-        print('1. X（旧Twitter）に手動でログインしてください。')
-        print('2. 画面上部の「メッセージ」→「リクエスト」タブに移動してください。')
-        print('3. グループDMの「オプション」メニューから「会話から退出」を1件だけ手動で実行してください。')
-        print('   （この操作で認証トークンが取得できます）')
-        input('上記の手動操作が完了したらEnterを押してください...')
-        # Bearerトークン自動取得
-        bearer_token = get_bearer_token(driver)
-        if not bearer_token:
-            print('\n【エラー】Bearerトークンが取得できませんでした。')
-            print('手動操作が正しく行われたか、またはNetworkタブから取得できるかご確認ください。')
-            return
-        print(f'\n【成功】Bearerトークンを取得しました。自動処理を開始します。')
-        go_to_dm_requests(driver)
-        # グループDMリンクが現れるまで最大15秒待機
+        print('X（旧Twitter）に手動でログインしてください。')
+        print('ログイン後、ホーム画面の読み込みで認証トークンが自動取得されます（操作は不要です）。')
+        deadline = time.time() + timeout
+        bearer_token = None
+        while time.time() < deadline:
+            # 見つかった後もバッファを読み捨てて溜めないようにする
+            bearer_token = get_bearer_token(driver) or bearer_token
+            if bearer_token:
+                cookie_str, csrf_token = get_auth_info(driver)
+                # ct0はログイン完了後に発行される
+                if csrf_token:
+                    user_agent = driver.execute_script("return navigator.userAgent;")
+                    return AuthBundle(bearer_token, csrf_token, cookie_str, user_agent)
+            time.sleep(poll_interval)
+        return None
+    finally:
+        driver.quit()
+
+# APIでグループDM退出（単発用。一括処理はx_api.DeleteEngineを使う）
+def leave_group_dm_api(conversation_id, auth, base_url=BASE_URL):
+    result = DeleteEngine(auth.session(1), base_url).delete(conversation_id)
+    print(f"{conversation_id} 削除レスポンス: HTTP {result.status} {result.error or ''}")
+    return result
+
+# APIからグループDM会話ID一覧を取得（受信箱の全ページをたどる）
+# 一括処理ではx_api.InboxScanner.iter_group_ids()のジェネレータを直接DeleteEngineに渡す
+def get_group_dm_ids_via_api(auth, base_url=BASE_URL):
+    try:
+        return list(InboxScanner(auth.session(1), base_url).iter_group_ids())
+    except (XApiError, ValueError) as e:
+        print(e)
+        return []
+
+# 保存済みの認証情報を読み込み、なければブラウザで取得して保存する
+def load_or_capture_auth(path, recapture=False, profile_dir=None, headless=False):
+    if not recapture and os.path.exists(path):
         try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "//a[starts-with(@href, '/messages/') and contains(@href, '/participants')]"))
-            )
-        except Exception:
-            print('グループDMリンクの出現を待ちましたが見つかりません。追加で5秒待機します。')
-            time.sleep(5)
-        # 取得リトライ
-        conversation_ids = get_conversation_ids(driver)
-        if not conversation_ids:
-            print('再度5秒待機してリトライします...')
-            time.sleep(5)
-            conversation_ids = get_conversation_ids(driver)
-        print(f"取得した会話ID: {conversation_ids}")
-        if not conversation_ids:
-            print('グループDMが見つかりませんでした。')
-            return
-        # cookie/ct0取得
-        cookie_str, csrf_token = get_auth_info(driver)
-        # APIからグループDM会話IDを取得
-        conversation_ids = get_group_dm_ids_via_api(cookie_str, csrf_token, bearer_token, driver)
-        print(f"APIから取得したグループDM会話ID: {conversation_ids}")
-        if not conversation_ids:
-            print('グループDMが見つかりませんでした。')
-            return
-        for cid in conversation_ids:
-            leave_group_dm_api(cid, cookie_str, csrf_token, bearer_token, driver)
-            time.sleep(3)  # レート制限対策（3秒間隔）
-        print('全てのグループDMを退出しました。')
+            auth = AuthBundle.load(path)
+            print(f'保存済みの認証情報を使用します: {path}')
+            return auth
+        except (ValueError, KeyError) as e:
+            print(f'認証情報ファイルを読み込めませんでした（再取得します）: {e}')
+    try:
+        auth = capture_auth(profile_dir, headless)
     except Exception as e:
         print('Chrome起動エラー:', e)
         print('Chromeの全ウィンドウを閉じてから再度実行してください。')
         print('プロファイルパスやプロファイル名が正しいかもご確認ください。')
+        return None
+    if not auth:
+        print('\n【エラー】Bearerトークンが取得できませんでした。')
+        print('ログインが完了しているか、ホーム画面が表示されているかご確認ください。')
+        return None
+    auth.save(path)
+    print(f'\n【成功】認証情報を取得し、{path} に保存しました。Chromeを終了してAPIで処理します。')
+    return auth
+
+# ブラウザなしで受信箱の取得と退出を行う
+def run_api_phase(auth, journal_path=JOURNAL_PATH, concurrency=3, base_url=BASE_URL):
+    # 認証ヘッダーは1回だけ組み立て、接続プール付きセッションで使い回す
+    session = auth.session(pool_size=max(10, concurrency))
+    scanner = InboxScanner(session, base_url)
+    engine = DeleteEngine(session, base_url, concurrency=concurrency)
+
+    journal = Journal(journal_path)
+    if journal.status:
+        print('前回の進捗から再開します。')
+        print(journal.report())
+
+    def report(result):
+        journal.record_result(result)
+        if result.status in (401, 403):
+            # 認証切れのまま残りを送っても全件失敗するため中断する
+            raise XApiError(f"退出API認証エラー: HTTP {result.status} {result.error}", result.status)
+        if result.ok:
+            print(f"{result.conversation_id} 退出完了 (HTTP {result.status}, 試行{result.attempts}回)")
+        else:
+            print(f"{result.conversation_id} 退出失敗 (HTTP {result.status}): {result.error}")
+
+    def on_page(timeline, cursors, ids):
+        print(f"受信箱ページ取得: {timeline or 'initial'} グループDM {len(ids)}件")
+
+    # 前回の未処理分を先に、続けて受信箱を保存済みカーソルの続きから取得しつつ順に退出する
+    # （固定sleepではなくレスポンスのレート制限ヘッダーに合わせて送信ペースを調整）
+    journal.start_run()
+    try:
+        engine.run(journal.resume_ids(scanner, on_page=on_page), on_result=report)
+        return True
+    except XApiError as e:
+        if e.auth_expired:
+            print(f"認証情報が無効または期限切れです: {e}")
+            return False
+        print(f"DMリストの取得を中断しました（再実行で続きから再開できます）: {e}")
+        return True
+    except ValueError as e:
+        print(f"DMリストの取得を中断しました（再実行で続きから再開できます）: {e}")
+        return True
     finally:
-        if driver:
-            driver.quit()
+        journal.finish_run()
+        print(journal.report())
+        journal.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='X グループDMリクエスト一括退出ツール')
+    parser.add_argument('--auth', default=AUTH_BUNDLE_PATH, help='認証情報の保存先')
+    parser.add_argument('--journal', default=JOURNAL_PATH, help='進捗ジャーナルの保存先')
+    parser.add_argument('--recapture', action='store_true', help='保存済みの認証情報を使わずブラウザで取り直す')
+    parser.add_argument('--capture-only', action='store_true', help='認証情報の取得・保存だけ行う')
+    parser.add_argument('--profile-dir', help='Chromeのプロファイルディレクトリ（ログイン状態を再利用する場合）')
+    parser.add_argument('--headless', action='store_true', help='ログイン済みプロファイルでChromeを画面なしで起動する')
+    parser.add_argument('--concurrency', type=int, default=3, help='同時に送る退出リクエスト数')
+    parser.add_argument('--base-url', default=BASE_URL, help='APIの接続先（mock_server.pyでの動作確認用）')
+    args = parser.parse_args()
+
+    auth = load_or_capture_auth(args.auth, args.recapture, args.profile_dir, args.headless)
+    if not auth or args.capture_only:
+        return
+    if not run_api_phase(auth, args.journal, args.concurrency, args.base_url):
+        # 保存済みの認証情報が期限切れなら1回だけ取り直して続きから再開
+        print('ブラウザで認証情報を取り直します。')
+        auth = load_or_capture_auth(args.auth, True, args.profile_dir, args.headless)
+        if auth:
+            run_api_phase(auth, args.journal, args.concurrency, args.base_url)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,165 @@
+# DeleteXツールの再開用ジャーナル（追記専用JSON Lines）
+# - 受信箱ページごとに見つかった会話IDと次のカーソル、退出結果を1行ずつ追記する
+# - 途中でクラッシュ・セッション切れになっても、再実行時にファイルを読み直して
+#   退出済みのIDは飛ばし、未処理・失敗したIDから再開し、受信箱も保存したカーソルの続きから取得する
+# - 書き込みは1行ごとにflushするため、最後の行が途中で切れていても読み飛ばして続行できる
+#
+# 使い方:
+#   journal = Journal('delete_x_journal.jsonl')
+#   journal.start_run()
+#   ids = journal.resume_ids(scanner)
+#   engine.run(ids, on_result=journal.record_result)
+#   journal.finish_run()
+#   print(journal.report())
+
+import json
+import os
+import time
+from itertools import chain
+
+DISCOVERED = 'discovered'
+DELETED = 'deleted'
+FAILED = 'failed'
+
+
+class Journal:
+    def __init__(self, path='delete_x_journal.jsonl'):
+        self.path = os.path.abspath(path)
+        # 会話ID -> 状態(discovered / deleted / failed)。dictの挿入順 = 発見順
+        self.status = {}
+        self.errors = {}
+        # タイムライン名 -> (status, 次のカーソル)
+        self.cursors = {}
+        self.runs = 0
+        self._run = None
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except ValueError:
+                    # 書き込み途中で止まった行は捨てる
+                    continue
+
+    def _apply(self, event):
+        kind = event.get('e')
+        if kind == 'page':
+            for cid in event.get('ids', ()):
+                self.status.setdefault(cid, DISCOVERED)
+            for name, (status, cursor) in (event.get('cursors') or {}).items():
+                self.cursors[name] = (status, cursor)
+        elif kind == 'result':
+            cid = event['id']
+            if event.get('ok'):
+                self.status[cid] = DELETED
+                self.errors.pop(cid, None)
+            elif self.status.get(cid) != DELETED:
+                self.status[cid] = FAILED
+                self.errors[cid] = (event.get('status'), event.get('error'))
+        elif kind == 'rescan':
+            self.cursors = {}
+        elif kind == 'start':
+            self.runs += 1
+
+    def _append(self, event):
+        self._apply(event)
+        self._file.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+
+    # --- 記録 ---
+
+    def start_run(self):
+        self._run = {'started': time.time(), 'deleted': 0, 'failed': 0, 'discovered': 0, 'pages': 0}
+        self._append({'e': 'start', 't': self._run['started']})
+
+    def record_page(self, timeline, cursors, ids):
+        """InboxScanner.iter_group_idsのon_page（resume_ids経由で呼ばれる）"""
+        new = sum(1 for cid in ids if cid not in self.status)
+        self._append({'e': 'page', 'timeline': timeline, 'cursors': cursors, 'ids': list(ids), 't': time.time()})
+        if self._run is not None:
+            self._run['pages'] += 1
+            self._run['discovered'] += new
+
+    def record_result(self, result):
+        """DeleteEngine.runのon_resultとして渡す"""
+        self._append({'e': 'result', 'id': result.conversation_id, 'ok': result.ok, 'status': result.status,
+                      'attempts': result.attempts, 'error': result.error,
+                      'elapsed': round(result.elapsed, 3), 't': time.time()})
+        if self._run is not None:
+            self._run['deleted' if result.ok else 'failed'] += 1
+
+    def finish_run(self):
+        if self._run is not None:
+            self._run['finished'] = time.time()
+            self._append({'e': 'finish', 't': self._run['finished'],
+                          'deleted': self._run['deleted'], 'failed': self._run['failed']})
+
+    def rescan(self):
+        """保存したカーソルを捨て、次回は受信箱を先頭から取得し直す（退出済みIDの記録は残る）"""
+        self._append({'e': 'rescan', 't': time.time()})
+
+    def close(self):
+        self._file.close()
+
+    # --- 再開 ---
+
+    def pending(self, retry_failed=True):
+        """発見済みで未退出の会話ID（前回失敗した分も含む）"""
+        targets = (DISCOVERED, FAILED) if retry_failed else (DISCOVERED,)
+        return [cid for cid, status in self.status.items() if status in targets]
+
+    def scan_complete(self):
+        return bool(self.cursors) and all(status != 'HAS_MORE' for status, _ in self.cursors.values())
+
+    def resume_ids(self, scanner, retry_failed=True, on_page=None):
+        """
+        前回の未処理分を先に返し、続けて受信箱を保存済みカーソルの続きから取得するジェネレータ。
+        前回までに受信箱を最後まで取得済みなら先頭から取り直す（新着分の取りこぼし防止）
+        on_page: ジャーナルへの記録後に同じ引数で呼ばれる（進捗表示用）
+        """
+        if self.scan_complete() and not self.pending(retry_failed):
+            self.rescan()
+
+        def record_page(timeline, cursors, ids):
+            self.record_page(timeline, cursors, ids)
+            if on_page:
+                on_page(timeline, cursors, ids)
+
+        # ジャーナルにあるIDはすべて既知として、スキャナー側では重複して返さない
+        seen = set(self.status)
+        return chain(self.pending(retry_failed),
+                     scanner.iter_group_ids(seen=seen, on_page=record_page, start_cursors=self.cursors))
+
+    # --- 集計 ---
+
+    def counts(self):
+        counts = {DISCOVERED: 0, DELETED: 0, FAILED: 0}
+        for status in self.status.values():
+            counts[status] += 1
+        return counts
+
+    def report(self):
+        counts = self.counts()
+        lines = []
+        if self._run is not None:
+            run = self._run
+            elapsed = max(run.get('finished', time.time()) - run['started'], 1e-9)
+            lines.append(f"今回の実行: 退出 {run['deleted']}件 / 失敗 {run['failed']}件 / 新規発見 {run['discovered']}件 "
+                         f"/ 受信箱 {run['pages']}ページ / {elapsed:.1f}秒 "
+                         f"({run['deleted'] / elapsed * 60:.1f}件/分)")
+        lines.append(f"累計({self.runs}回実行): 発見 {len(self.status)}件 / 退出済み {counts[DELETED]}件 "
+                     f"/ 未処理 {counts[DISCOVERED]}件 / 失敗 {counts[FAILED]}件"
+                     + (' / 受信箱は最後まで取得済み' if self.scan_complete() else ''))
+        if self.errors:
+            by_status = {}
+            for status, _ in self.errors.values():
+                by_status[status] = by_status.get(status, 0) + 1
+            lines.append('失敗の内訳: ' + ', '.join(f"HTTP {k}: {v}件" for k, v in by_status.items()))
+            for cid, (status, error) in list(self.errors.items())[:10]:
+                lines.append(f"  {cid}: HTTP {status} {error}")
+        return '\n'.join(lines)
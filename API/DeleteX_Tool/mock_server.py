@@ -0,0 +1,199 @@
+# X DM API のローカルモックサーバー（動作確認・負荷試験用）
+# 使い方:
+#   python mock_server.py --port 8765 --limit 50 --window 15 --fail-rate 0.05
+#   DeleteEngine(session, base_url='http://127.0.0.1:8765') で接続する
+# - POST /i/api/1.1/dm/conversation/<id>/delete.json
+#   x-rate-limit-limit / remaining / reset ヘッダーを返し、枠を超えると429
+#   fail_rateの確率で503を返す。退出済みのIDには404
+# - GET /i/api/1.1/dm/inbox_initial_state.json と /i/api/1.1/dm/inbox_timeline/<name>.json?max_id=
+#   生成した会話をpage_size件ずつ返す（グループDM・1対1・承認済みグループが混在）
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+_DELETE_PATH = re.compile(r'^/i/api/1\.1/dm/conversation/([^/]+)/delete\.json$')
+_TIMELINE_PATH = re.compile(r'^/i/api/1\.1/dm/inbox_timeline/([a-z_]+)\.json$')
+_INITIAL_PATH = '/i/api/1.1/dm/inbox_initial_state.json'
+
+
+class MockXState:
+    def __init__(self, limit=50, window=15.0, fail_rate=0.0, latency=0.0,
+                 conversations=0, page_size=20):
+        self.limit = limit
+        self.window = window
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.page_size = page_size
+        self.deleted = set()
+        self.requests = 0
+        self.rate_limited = 0
+        self.conversations = [self._make_conversation(i) for i in range(conversations)]
+        # エンドポイントごとのレート制限枠 {名前: [ウィンドウ開始, 使用回数]}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_conversation(i):
+        cid = str(1500000000000000000 + i)
+        if i % 10 == 9:
+            conv_type, timeline = 'ONE_TO_ONE', 'untrusted'
+        elif i % 25 == 24:
+            conv_type, timeline = 'GROUP_DM', 'trusted'
+        else:
+            conv_type, timeline = 'GROUP_DM', 'untrusted' if i % 2 == 0 else 'untrusted_low_quality'
+        return {'conversation_id': cid, 'type': conv_type, 'trusted': timeline == 'trusted',
+                'timeline': timeline, 'sort_event_id': str(1000000 + i)}
+
+    def group_ids(self):
+        """リクエストとして届いているグループDMのID（期待値の確認用）"""
+        return [c['conversation_id'] for c in self.conversations if c['type'] == 'GROUP_DM' and not c['trusted']]
+
+    def take(self, bucket='default'):
+        """枠を1つ消費し、(許可されたか, 残り回数, リセット時刻) を返す"""
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            window = self._buckets.setdefault(bucket, [now, 0])
+            if now >= window[0] + self.window:
+                window[0], window[1] = now, 0
+            reset = int(window[0] + self.window) + 1
+            if window[1] >= self.limit:
+                self.rate_limited += 1
+                return False, 0, reset
+            window[1] += 1
+            return True, self.limit - window[1], reset
+
+    def page(self, timeline, max_id=None):
+        """新しい順にpage_size件を返す。max_idより前（古い）の会話のみ"""
+        with self._lock:
+            items = [c for c in self.conversations
+                     if c['timeline'] == timeline and c['conversation_id'] not in self.deleted
+                     and (max_id is None or int(c['sort_event_id']) < int(max_id))]
+        items.sort(key=lambda c: int(c['sort_event_id']), reverse=True)
+        page = items[:self.page_size]
+        status = 'HAS_MORE' if len(items) > len(page) else 'AT_END'
+        min_entry_id = page[-1]['sort_event_id'] if page else max_id
+        conversations = {c['conversation_id']: {k: v for k, v in c.items() if k != 'timeline'} for c in page}
+        return {'status': status, 'min_entry_id': min_entry_id, 'conversations': conversations}
+
+
+class MockXHandler(BaseHTTPRequestHandler):
+    state = None  # type: MockXState
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _rate_limit(self, bucket='default'):
+        allowed, remaining, reset = self.state.take(bucket)
+        headers = {'x-rate-limit-limit': self.state.limit,
+                   'x-rate-limit-remaining': remaining,
+                   'x-rate-limit-reset': reset}
+        if not allowed:
+            self._send(429, {'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]}, headers)
+            return None
+        return headers
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        m = _TIMELINE_PATH.match(parts.path)
+        if parts.path != _INITIAL_PATH and not m:
+            self._send(404, {'errors': [{'code': 34, 'message': 'Not found'}]})
+            return
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        headers = self._rate_limit('inbox')
+        if headers is None:
+            return
+        if m:
+            max_id = parse_qs(parts.query).get('max_id', [None])[0]
+            self._send(200, {'inbox_timeline': self.state.page(m.group(1), max_id)}, headers)
+            return
+        timelines = {}
+        conversations = {}
+        for name in ('trusted', 'untrusted', 'untrusted_low_quality'):
+            page = self.state.page(name)
+            conversations.update(page.pop('conversations'))
+            timelines[name] = page
+        self._send(200, {'inbox_initial_state': {'inbox_timelines': timelines,
+                                                 'conversations': conversations}}, headers)
+
+    def do_POST(self):
+        length = int(self.headers.get('content-length') or 0)
+        if length:
+            self.rfile.read(length)
+        m = _DELETE_PATH.match(self.path)
+        if not m:
+            self._send(404, {'errors': [{'code': 34, 'message': 'Not found'}]})
+            return
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        headers = self._rate_limit()
+        if headers is None:
+            return
+        if random.random() < self.state.fail_rate:
+            self._send(503, {'errors': [{'code': 130, 'message': 'Over capacity'}]}, headers)
+            return
+        cid = m.group(1)
+        with self.state._lock:
+            if cid in self.state.deleted:
+                gone = True
+            else:
+                gone = False
+                self.state.deleted.add(cid)
+        if gone:
+            self._send(404, {'errors': [{'code': 279, 'message': 'Conversation not found'}]}, headers)
+        else:
+            self._send(200, {}, headers)
+
+
+def start_mock_server(host='127.0.0.1', port=0, **state_kwargs):
+    """バックグラウンドスレッドでモックサーバーを起動し、(server, state) を返す"""
+    state = MockXState(**state_kwargs)
+    handler = type('Handler', (MockXHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description='X DM API モックサーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--limit', type=int, default=50, help='ウィンドウあたりの許可回数')
+    parser.add_argument('--window', type=float, default=15.0, help='レート制限ウィンドウ(秒)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='503を返す確率')
+    parser.add_argument('--latency', type=float, default=0.0, help='1リクエストあたりの遅延(秒)')
+    parser.add_argument('--conversations', type=int, default=200, help='受信箱に用意する会話数')
+    parser.add_argument('--page-size', type=int, default=20, help='受信箱1ページあたりの件数')
+    args = parser.parse_args()
+    server, state = start_mock_server(args.host, args.port, limit=args.limit, window=args.window,
+                                      fail_rate=args.fail_rate, latency=args.latency,
+                                      conversations=args.conversations, page_size=args.page_size)
+    print(f"モックサーバー起動: http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"requests={state.requests} deleted={len(state.deleted)} rate_limited={state.rate_limited}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
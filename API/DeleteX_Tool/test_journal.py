@@ -0,0 +1,113 @@
+# Journal.resume_ids の回帰テスト（mock_server.pyをローカルで起動して実行、外部への通信なし）
+#   python -m unittest test_journal
+# - 途中で止まった実行を再開すると、未処理分から続けて受信箱の残りを取得し、同じ会話を二重に退出しない
+# - 失敗した会話はretry_failed=Trueのときだけ再試行する
+# - 最後まで取得済みで未処理が無ければ受信箱を先頭から取り直す
+
+import os
+import tempfile
+import unittest
+from itertools import islice
+
+import requests
+
+from journal import DELETED, DISCOVERED, FAILED, Journal
+from mock_server import start_mock_server
+from x_api import DeleteEngine, DeleteResult, InboxScanner
+
+
+class JournalResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, 'journal.jsonl')
+        server, self.state = start_mock_server(limit=10000, conversations=60, page_size=5)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+
+    def journal(self):
+        journal = Journal(self.path)
+        self.addCleanup(journal.close)
+        return journal
+
+    def scanner(self, **kwargs):
+        return InboxScanner(self.session, self.base_url, **kwargs)
+
+    def test_resume_after_interruption(self):
+        engine = DeleteEngine(self.session, self.base_url, concurrency=2)
+        results = []
+
+        def record(journal):
+            def on_result(result):
+                journal.record_result(result)
+                results.append(result)
+            return on_result
+
+        # 1回目: 受信箱を2ページまで取得し、見つかった分の一部だけ退出して中断
+        first = self.journal()
+        first.start_run()
+        ids = first.resume_ids(self.scanner(max_pages=2))
+        engine.run(islice(ids, 4), on_result=record(first))
+        first.finish_run()
+        self.assertEqual(first.counts()[DELETED], 4)
+        self.assertGreater(first.counts()[DISCOVERED], 0)
+        first.close()
+
+        # 2回目: ファイルから読み直し、未処理分と受信箱の残りを退出する
+        second = self.journal()
+        self.assertEqual(second.runs, 1)
+        second.start_run()
+        engine.run(second.resume_ids(self.scanner()), on_result=record(second))
+        second.finish_run()
+
+        expected = sorted(self.state.group_ids())
+        self.assertEqual(sorted(self.state.deleted), expected)
+        # 退出済みの会話は再送しない（再送すればモックは404を返す）
+        self.assertEqual(sorted(r.conversation_id for r in results), expected)
+        self.assertTrue(all(r.status == 200 for r in results))
+        self.assertTrue(second.scan_complete())
+        self.assertEqual(second.counts(), {DISCOVERED: 0, DELETED: len(expected), FAILED: 0})
+
+    def test_failed_ids_are_retried_only_when_requested(self):
+        journal = self.journal()
+        journal.record_page(None, {'untrusted': ('AT_END', None), 'untrusted_low_quality': ('AT_END', None)},
+                            ['a', 'b', 'c'])
+        journal.record_result(DeleteResult('a', True, 200))
+        journal.record_result(DeleteResult('b', False, 503, error='Over capacity'))
+        # 前回の未処理分（発見順）を受信箱の新しい会話より先に返す
+        retried = list(journal.resume_ids(self.scanner(), retry_failed=True))
+        self.assertEqual(retried[:2], ['b', 'c'])
+        self.assertNotIn('a', retried)
+
+        reopened = Journal(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(list(islice(reopened.resume_ids(self.scanner(), retry_failed=False), 1)), ['c'])
+        self.assertEqual(reopened.errors, {'b': (503, 'Over capacity')})
+
+    def test_rescan_when_complete(self):
+        journal = self.journal()
+        journal.record_page(None, {'untrusted': ('AT_END', '1'), 'untrusted_low_quality': ('AT_END', '2')}, ['a'])
+        journal.record_result(DeleteResult('a', True, 200))
+        self.assertTrue(journal.scan_complete())
+        ids = list(journal.resume_ids(self.scanner()))
+        # 保存したカーソルを捨てて先頭から取り直すため、受信箱の全グループDMが返る
+        self.assertEqual(sorted(ids), sorted(self.state.group_ids()))
+        self.assertTrue(journal.scan_complete())
+
+    def test_truncated_last_line_is_ignored(self):
+        journal = self.journal()
+        journal.record_page(None, {}, ['a', 'b'])
+        journal.record_result(DeleteResult('a', True, 200))
+        journal.close()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"e":"result","id":"b","ok":tr')
+        reopened = self.journal()
+        self.assertEqual(reopened.status, {'a': DELETED, 'b': DISCOVERED})
+        self.assertEqual(reopened.pending(), ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
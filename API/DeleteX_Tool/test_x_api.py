@@ -0,0 +1,74 @@
+# DeleteEngine の回帰テスト（mock_server.pyをローカルで起動して実行、外部への通信なし）
+#   python -m unittest test_x_api
+# - 429: レート制限ヘッダーに従って待ち、全件を1回ずつ退出できる
+# - 5xx: 再試行で回復する / 再試行を使い切ったら失敗として返す
+# - ID取得側の例外で抜けても、送信済みの退出結果はon_resultに渡る
+
+import unittest
+
+import requests
+
+from mock_server import start_mock_server
+from x_api import DeleteEngine
+
+
+class DeleteEngineTest(unittest.TestCase):
+    def start(self, **state_kwargs):
+        server, state = start_mock_server(**state_kwargs)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        session = requests.Session()
+        self.addCleanup(session.close)
+        return f'http://127.0.0.1:{server.server_address[1]}', session, state
+
+    def test_rate_limited_requests_are_retried(self):
+        base_url, session, state = self.start(limit=2, window=1.0)
+        ids = [str(1500000000000000000 + i) for i in range(4)]
+        engine = DeleteEngine(session, base_url, concurrency=3, backoff_factor=0.01)
+        results = engine.run(ids)
+        self.assertTrue(all(r.ok and r.status == 200 for r in results), results)
+        self.assertEqual(sorted(r.conversation_id for r in results), ids)
+        self.assertEqual(sorted(state.deleted), ids)
+        # 最初の並列送信は残り回数が分からないため枠を超え、429から再試行した分がある
+        self.assertGreater(state.rate_limited, 0)
+        self.assertTrue(any(r.attempts > 1 for r in results))
+
+    def test_transient_server_errors_are_retried(self):
+        base_url, session, state = self.start(limit=1000, fail_rate=0.5)
+        ids = [str(1500000000000000000 + i) for i in range(20)]
+        engine = DeleteEngine(session, base_url, concurrency=4, max_retries=20, backoff_factor=0.001)
+        results = engine.run(ids)
+        self.assertTrue(all(r.ok for r in results), [r for r in results if not r.ok])
+        self.assertEqual(sorted(state.deleted), ids)
+
+    def test_gives_up_after_max_retries(self):
+        base_url, session, state = self.start(limit=1000, fail_rate=1.0)
+        engine = DeleteEngine(session, base_url, concurrency=2, max_retries=2, backoff_factor=0.001)
+        results = engine.run(['1', '2'])
+        self.assertEqual([(r.ok, r.status, r.attempts) for r in results], [(False, 503, 3)] * 2)
+        self.assertEqual(state.requests, 6)
+
+    def test_already_left_counts_as_success(self):
+        base_url, session, state = self.start(limit=1000)
+        state.deleted.add('1')
+        result = DeleteEngine(session, base_url).delete('1')
+        self.assertTrue(result.ok)
+        self.assertEqual(result.status, 404)
+
+    def test_submitted_deletes_are_reported_when_ids_fail(self):
+        base_url, session, state = self.start(limit=1000, latency=0.05)
+
+        def ids():
+            yield from ('1', '2', '3')
+            raise RuntimeError('inbox error')
+
+        reported = []
+        engine = DeleteEngine(session, base_url, concurrency=3)
+        with self.assertRaises(RuntimeError):
+            engine.run(ids(), on_result=reported.append)
+        self.assertEqual(sorted(r.conversation_id for r in reported), ['1', '2', '3'])
+        self.assertEqual(sorted(state.deleted), ['1', '2', '3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
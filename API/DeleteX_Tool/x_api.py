@@ -0,0 +1,381 @@
+# X（旧Twitter）DM API クライアント（Seleniumなしで動作する部分）
+# 必要パッケージ: requests
+# - 認証ヘッダーは最初に1回だけ組み立て、接続プール付きのrequests.Sessionで使い回す
+# - 退出(削除)リクエストは同時実行数を制限して並列に送る
+# - 固定sleepではなく x-rate-limit-remaining / x-rate-limit-reset に合わせて送信ペースを調整
+# - 429/5xx・通信エラーは指数バックオフで再試行
+# - DMリクエスト受信箱はカーソルをたどって全ページを取得し、会話IDをジェネレータで順次返す
+# - base_urlを差し替えればローカルのモックサーバー(mock_server.py)に対して動作確認できる
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = 'https://x.com'
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+INBOX_QUERY = "nsfw_filtering_enabled=false&filter_low_quality=true&include_quality=all&include_profile_interstitial_type=1&include_blocking=1&include_blocked_by=1&include_followed_by=1&include_want_retweets=1&include_mute_edge=1&include_can_dm=1&include_can_media_tag=1&include_ext_is_blue_verified=1&include_ext_verified_type=1&include_ext_profile_image_shape=1&skip_status=1&dm_secret_conversations_enabled=false&krs_registration_enabled=false&cards_platform=Web-12&include_cards=1&include_ext_alt_text=true&include_ext_limited_action_results=true&include_quote_count=true&include_reply_count=1&tweet_mode=extended&include_ext_views=true&dm_users=true&include_groups=true&include_inbox_timelines=true&include_ext_media_color=true&supports_reactions=true&supports_edit=true&include_ext_edit_control=true&include_ext_business_affiliations_label=true&include_ext_parody_commentary_fan_label=true&ext=mediaColor,altText,mediaStats,highlightedLabel,parodyCommentaryFanLabel,voiceInfo,birdwatchPivot,superFollowMetadata,unmentionInfo,editControl,article"
+# DMリクエスト（「リクエスト」タブと「その他のリクエスト」）のタイムライン名
+REQUEST_TIMELINES = ('untrusted', 'untrusted_low_quality')
+
+
+# API共通ヘッダー（User-Agentは呼び出し側で1回だけ取得して渡す）
+def build_headers(cookie_str, csrf_token, bearer_token, user_agent):
+    return {
+        "authorization": f"Bearer {bearer_token}",
+        "x-csrf-token": csrf_token,
+        "cookie": cookie_str,
+        "user-agent": user_agent,
+        "accept": "*/*",
+        "referer": "https://x.com/messages/requests/additional",
+        "x-twitter-auth-type": "OAuth2Session",
+        "x-twitter-active-user": "yes",
+        "accept-language": "ja,en-US;q=0.9,en;q=0.8",
+        "origin": "https://x.com",
+        "sec-fetch-site": "same-origin",
+        "sec-fetch-mode": "cors",
+        "sec-fetch-dest": "empty"
+    }
+
+
+class AuthBundle:
+    """
+    ブラウザから1回だけ取得した認証情報（Bearerトークン・ct0・Cookie・User-Agent）。
+    ファイルに保存しておけば、以降の実行はブラウザを起動せずAPIだけで動かせる
+    """
+
+    def __init__(self, bearer_token, csrf_token, cookie_str, user_agent, captured_at=None):
+        self.bearer_token = bearer_token
+        self.csrf_token = csrf_token
+        self.cookie_str = cookie_str
+        self.user_agent = user_agent
+        self.captured_at = captured_at or time.time()
+
+    def headers(self):
+        return build_headers(self.cookie_str, self.csrf_token, self.bearer_token, self.user_agent)
+
+    def session(self, pool_size=10):
+        return create_session(self.headers(), pool_size)
+
+    def to_dict(self):
+        return {'bearer_token': self.bearer_token, 'csrf_token': self.csrf_token, 'cookie_str': self.cookie_str,
+                'user_agent': self.user_agent, 'captured_at': self.captured_at}
+
+    def save(self, path):
+        # Cookieを含むため所有者のみ読み書きできる権限で作成する
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['bearer_token'], data['csrf_token'], data['cookie_str'], data['user_agent'],
+                   data.get('captured_at'))
+
+
+# 接続プール付きセッション（並列数ぶんの接続をkeep-aliveで使い回す）
+def create_session(headers, pool_size=10):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(headers)
+    return session
+
+
+class RateLimiter:
+    """
+    レスポンスの x-rate-limit-remaining / x-rate-limit-reset から残り回数とリセット時刻を追跡し、
+    リセットまでの残り時間を残り回数で割った間隔で送信する（全スレッド共通）
+    """
+
+    def __init__(self, reserve=1):
+        # reserve: 他の操作（一覧取得など）のために残しておく回数
+        self.reserve = reserve
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.time()
+            delay = max(self.blocked_until - now, self.next_slot - now, 0.0)
+            if self.remaining is not None and self.reset_at is not None and self.reset_at > now:
+                available = self.remaining - self.reserve
+                if available <= 0:
+                    # 枠を使い切ったのでリセットまで待つ
+                    self.blocked_until = max(self.blocked_until, self.reset_at + 0.5)
+                    delay = max(delay, self.blocked_until - now)
+                    self.remaining = None
+                else:
+                    self.next_slot = now + delay + (self.reset_at - now) / available
+                    # 応答を待たずに並列送信しても枠を超えないよう手元でも減らす
+                    self.remaining -= 1
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, headers):
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining, reset = int(remaining), float(reset)
+        except ValueError:
+            return
+        with self._lock:
+            # 新しいウィンドウ、または同じウィンドウでより少ない残数なら採用
+            if self.reset_at is None or reset > self.reset_at or self.remaining is None or remaining < self.remaining:
+                self.remaining = remaining
+                self.reset_at = reset
+
+    def block(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+
+class DeleteResult:
+    def __init__(self, conversation_id, ok, status=None, attempts=0, error=None, elapsed=0.0):
+        self.conversation_id = conversation_id
+        self.ok = ok
+        self.status = status
+        self.attempts = attempts
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        state = 'ok' if self.ok else f'failed: {self.error}'
+        return f"<DeleteResult {self.conversation_id} {self.status} {state} attempts={self.attempts}>"
+
+
+class XApiError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def auth_expired(self):
+        return self.status in (401, 403)
+
+
+class ApiClient:
+    """
+    再試行・レート制限追従つきのリクエスト送信（DeleteEngine / InboxScanner 共通）
+    session: 認証ヘッダー設定済みのrequests.Session
+    max_retries: 429/5xx・通信エラー時の再試行回数
+    """
+
+    def __init__(self, session, base_url=BASE_URL, max_retries=5, backoff_factor=1.0,
+                 max_backoff=60.0, timeout=15, limiter=None):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        # レート制限はエンドポイントごとに別枠のため、クライアントごとに持つ
+        self.limiter = limiter or RateLimiter()
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _retry_after(self, resp, attempt):
+        retry_after = resp.headers.get('retry-after')
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        reset = resp.headers.get('x-rate-limit-reset')
+        if resp.status_code == 429 and reset:
+            try:
+                return max(float(reset) - time.time(), 0.0) + 0.5
+            except ValueError:
+                pass
+        return self._backoff(attempt)
+
+    def request(self, method, path, **kwargs):
+        """(レスポンス, 試行回数, エラー) を返す。通信エラーで再試行を使い切った場合のみレスポンスはNone"""
+        url = self.base_url + path
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            attempt += 1
+            try:
+                resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                if attempt > self.max_retries:
+                    return None, attempt, str(e)
+                time.sleep(self._backoff(attempt - 1))
+                continue
+            self.limiter.update(resp.headers)
+            if resp.status_code in RETRY_STATUSES and attempt <= self.max_retries:
+                delay = self._retry_after(resp, attempt - 1)
+                if resp.status_code == 429:
+                    # レート制限は全スレッドで共有して待つ
+                    self.limiter.block(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            return resp, attempt, None
+
+
+class DeleteEngine(ApiClient):
+    """
+    concurrency: 同時に送る退出リクエスト数の上限
+    その他の引数はApiClientと同じ
+    """
+
+    def __init__(self, session, base_url=BASE_URL, concurrency=3, **kwargs):
+        super().__init__(session, base_url, **kwargs)
+        self.concurrency = concurrency
+
+    def delete(self, conversation_id):
+        started = time.perf_counter()
+        resp, attempts, error = self.request(
+            'POST', f"/i/api/1.1/dm/conversation/{conversation_id}/delete.json",
+            headers={"content-type": "application/json"})
+        elapsed = time.perf_counter() - started
+        if resp is None:
+            return DeleteResult(conversation_id, False, None, attempts, error, elapsed)
+        # 404は既に退出済み（会話が存在しない）として成功扱い
+        if resp.ok or resp.status_code == 404:
+            return DeleteResult(conversation_id, True, resp.status_code, attempts, None, elapsed)
+        return DeleteResult(conversation_id, False, resp.status_code, attempts, resp.text[:200], elapsed)
+
+    def run(self, conversation_ids, on_result=None):
+        """
+        conversation_ids（リストまたはジェネレータ）を最大concurrency並列で退出し、結果のリストを返す。
+        同時に抱える未完了タスクはconcurrency件までなので、ジェネレータを先読みしすぎない
+        """
+        results = []
+        pending = set()
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            try:
+                for cid in conversation_ids:
+                    if len(pending) >= self.concurrency:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        self._collect(done, pending, results, on_result)
+                    pending.add(pool.submit(self.delete, cid))
+                done, _ = wait(pending)
+                self._collect(done, pending, results, on_result)
+            finally:
+                # ID取得・on_resultの例外で抜ける場合も、送信済みの退出は結果を記録してから例外を伝える
+                # （記録しないと再開時に同じ退出を再送してしまう）
+                if pending:
+                    done, _ = wait(pending)
+                    self._collect(done, pending, results, on_result, suppress=True)
+        return results
+
+    @staticmethod
+    def _collect(done, pending, results, on_result, suppress=False):
+        for future in done:
+            pending.discard(future)
+            try:
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+            except Exception:
+                if not suppress:
+                    raise
+
+
+# 受信箱レスポンスからグループDMの会話IDを取り出す
+def extract_group_ids(payload, include_trusted=False):
+    root = payload.get('inbox_initial_state') or payload.get('inbox_timeline') or payload
+    ids = []
+    for key, conv in (root.get('conversations') or {}).items():
+        if conv.get('type') != 'GROUP_DM':
+            continue
+        # 承認済み（リクエストではない）グループは対象外
+        if conv.get('trusted') and not include_trusted:
+            continue
+        ids.append(conv.get('conversation_id') or key)
+    # 旧形式: inboxTimelines > entries > messageConversation
+    for timeline in (payload.get('inboxTimelines') or {}).values():
+        for entry in timeline.get('entries', []):
+            conv = entry.get('messageConversation', {})
+            if conv.get('conversationType') == 'Group' and conv.get('conversationId'):
+                ids.append(conv['conversationId'])
+    return ids
+
+
+# 各タイムラインの {名前: (status, min_entry_id)}
+def timeline_cursors(payload):
+    if 'inbox_timeline' in payload:
+        return {None: (payload['inbox_timeline'].get('status'), payload['inbox_timeline'].get('min_entry_id'))}
+    timelines = (payload.get('inbox_initial_state') or {}).get('inbox_timelines') or {}
+    return {name: (t.get('status'), t.get('min_entry_id')) for name, t in timelines.items()}
+
+
+class InboxScanner(ApiClient):
+    """
+    DMリクエスト受信箱を inbox_initial_state → inbox_timeline/<name>.json?max_id=<cursor> とたどり、
+    グループDMの会話IDを重複なくジェネレータで返す（1ページ目の分から順に削除を始められる）
+    """
+
+    def __init__(self, session, base_url=BASE_URL, timelines=REQUEST_TIMELINES,
+                 include_trusted=False, max_pages=None, **kwargs):
+        super().__init__(session, base_url, **kwargs)
+        self.timelines = timelines
+        self.include_trusted = include_trusted
+        self.max_pages = max_pages
+        self.pages = 0
+
+    def _get_json(self, path):
+        resp, _, error = self.request('GET', path, headers={"accept": "application/json, text/plain, */*"})
+        if resp is None:
+            raise XApiError(f"DMリストAPI通信エラー: {error}")
+        if resp.status_code != 200:
+            raise XApiError(f"DMリストAPI取得失敗: {resp.status_code} {resp.text[:200]}", resp.status_code)
+        self.pages += 1
+        return resp.json()
+
+    def iter_group_ids(self, seen=None, on_page=None, start_cursors=None):
+        """
+        seen: 処理済みの会話ID（set）。ここに含まれるIDは返さず、返したIDは追加される
+        on_page: ページ取得ごとに on_page(timeline名, {timeline名: (status, 次のカーソル)}, そのページの会話ID) を呼ぶ
+                 （初回のinbox_initial_stateはtimeline名None）。IDを返す前に呼ばれるため、ジャーナル記録に使える
+        start_cursors: 前回の続きから再開する場合の {timeline名: (status, カーソル)}。
+                       statusがAT_ENDのタイムラインは取得しない
+        """
+        seen = set() if seen is None else seen
+        payload = self._get_json(f"/i/api/1.1/dm/inbox_initial_state.json?{INBOX_QUERY}")
+        ids = extract_group_ids(payload, self.include_trusted)
+        cursors = timeline_cursors(payload)
+        cursors = {name: (start_cursors or {}).get(name) or cursors.get(name, (None, None))
+                   for name in self.timelines}
+        if on_page:
+            on_page(None, cursors, ids)
+        for cid in ids:
+            if cid not in seen:
+                seen.add(cid)
+                yield cid
+        for name in self.timelines:
+            status, cursor = cursors[name]
+            while status == 'HAS_MORE' and cursor:
+                if self.max_pages is not None and self.pages >= self.max_pages:
+                    return
+                payload = self._get_json(f"/i/api/1.1/dm/inbox_timeline/{name}.json?max_id={cursor}&{INBOX_QUERY}")
+                ids = extract_group_ids(payload, self.include_trusted)
+                status, next_cursor = timeline_cursors(payload)[None]
+                if on_page:
+                    on_page(name, {name: (status, next_cursor)}, ids)
+                for cid in ids:
+                    if cid not in seen:
+                        seen.add(cid)
+                        yield cid
+                # カーソルが進まない場合は打ち切る
+                if next_cursor == cursor:
+                    break
+                cursor = next_cursor
@@ -0,0 +1,613 @@
+"""
+YouTube RSS API Utility (Python asyncio版)
+
+index.pyのYoutubeRssApiと同じメソッドをコルーチンとして提供する。
+- HTTPはaiohttpのノンブロッキングクライアント（接続プール・keep-alive）
+- 解析処理・型(YoutubeVideoInfo / YoutubeVideoDetail 等)・フィードキャッシュはindex.pyと共通
+- 複数動画の詳細取得はSemaphoreで同時実行数を制限
+- タイムアウトはaiohttpのClientTimeoutで管理し、キャンセル(CancelledError)は握りつぶさない
+- hooks / add_hookによる計測もindex.pyと共通（connectはaiohttpのTraceConfigで計測）
+- 同じ(処理, ID)の同時取得はAsyncSingleFlightで1回にまとめる（inflight_stats()で相乗り数を確認）
+
+【インストール】
+- 必要パッケージ: aiohttp
+  pip install aiohttp
+
+【使い方例】
+import asyncio
+from async_index import AsyncYoutubeRssApi
+
+async def main():
+    async with AsyncYoutubeRssApi() as api:
+        channel_id = await api.extract_channel_id('https://www.youtube.com/@GoogleJapan')
+        videos = await api.get_latest_videos(channel_id)
+        details = await api.get_latest_videos_with_details(channel_id, concurrency=5)
+
+asyncio.run(main())
+"""
+
+import asyncio
+import copy
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+import aiohttp
+
+from index import (
+    FAILURE_TYPES,
+    ChannelPageScanner,
+    FeedCache,
+    FeedStreamParser,
+    LIVE_PROBE_MAX_BYTES,
+    LiveStatusProbe,
+    YoutubeApiError,
+    YoutubeChannelInfo,
+    YoutubeDetailFailure,
+    YoutubeFeed,
+    YoutubeLiveStatus,
+    YoutubeRssApi,
+    YoutubeVideoDetail,
+    YoutubeVideoInfo,
+    _OEMBED_MISSING,
+    _accept_encoding,
+    _current_span,
+    _fail,
+    _feed_until,
+    _stage,
+    feed_title,
+    feed_url,
+    feed_videos,
+    is_immutable_detail,
+    oembed_url,
+    paginate_videos,
+    parse_channel_url,
+    parse_feed,
+    parse_live_status,
+    parse_video_detail,
+)
+
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# aiohttpの例外も失敗分類に含める（Timeoutは組み込みのTimeoutErrorとして分類される）
+FAILURE_TYPES[:0] = [
+    (aiohttp.ServerTimeoutError, 'timeout'),
+    (aiohttp.ClientConnectionError, 'connection'),
+    (aiohttp.ClientPayloadError, 'connection'),
+]
+
+
+class AsyncSingleFlight:
+    """
+    index.SingleFlightのasyncio版。同じキーの取得は1つのTaskで実行し、呼び出し元はその完了を待つ。
+    呼び出し元がキャンセルされても共有中の取得は続行する（他の待機者に影響しない）。
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Any, asyncio.Task] = {}
+        self.flights = 0
+        self.coalesced = 0
+
+    async def do(self, key: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self.flights += 1
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Any, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 待機者が全員キャンセルされていても例外未取得の警告を出さない
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {'flights': self.flights, 'coalesced': self.coalesced, 'in_flight': len(self._tasks)}
+
+
+async def _on_connection_create_start(session, ctx, params) -> None:
+    ctx.connect_started = asyncio.get_running_loop().time()
+
+
+async def _on_connection_create_end(session, ctx, params) -> None:
+    # 新規接続（DNS解決・TCP接続・TLSハンドシェイク）の時間を現在のSpanのconnectに加算
+    span = _current_span.get()
+    if span is not None and hasattr(ctx, 'connect_started'):
+        span.add('connect', asyncio.get_running_loop().time() - ctx.connect_started)
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_start.append(_on_connection_create_start)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    return trace
+
+
+class AsyncResponse:
+    def __init__(self, status: int, headers: Mapping[str, str], content: bytes, charset: Optional[str]):
+        self.status_code = status
+        self.headers = headers
+        self.content = content
+        self._charset = charset or 'utf-8'
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self._charset, errors='replace')
+
+
+class AsyncYoutubeRssApi:
+    version = YoutubeRssApi.version
+
+    def __init__(self, debug_mode: bool = False, session: Optional[aiohttp.ClientSession] = None,
+                 pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                 timeout: float = 10, feed_cache_ttl: float = 60, feed_cache_size: int = 1024,
+                 cache: Optional[Any] = None, hooks: Optional[List[Callable[[Any], None]]] = None,
+                 coalesce: bool = True, history: Optional[Any] = None):
+        self.debug_mode = debug_mode
+        self.cache = cache
+        self.history = history
+        self.hooks = list(hooks or [])
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self._owns_session = session is None
+        # ClientSessionはイベントループ上で作る必要があるため初回リクエスト時に生成
+        self.session = session
+        self.feed_cache = FeedCache(feed_cache_ttl, feed_cache_size)
+        self.inflight = AsyncSingleFlight() if coalesce else None
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[_trace_config()],
+                headers={
+                    'Accept-Encoding': _accept_encoding(),
+                    'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8',
+                },
+            )
+            self._owns_session = True
+        return self.session
+
+    async def close(self) -> None:
+        if self._owns_session and self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncResponse:
+        session = self._ensure_session()
+        span = _current_span.get()
+        attempt = 0
+        while True:
+            try:
+                connect = span.stages.get('connect', 0.0) if span else 0.0
+                t0 = asyncio.get_running_loop().time()
+                async with session.get(url, headers=headers) as res:
+                    if span:
+                        self._record_response(span, res, t0, connect)
+                    if res.status in _RETRY_STATUSES and attempt < self.retries:
+                        delay = self._retry_delay(attempt, res.headers.get('Retry-After'))
+                    else:
+                        with _stage('body'):
+                            content = await res.read()
+                        if span:
+                            span.bytes += len(content)
+                        # 大文字小文字を区別しないヘッダー（CIMultiDict）のまま保持する（ETag / Etag など）
+                        return AsyncResponse(res.status, res.headers.copy(), content, res.charset)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= self.retries:
+                    raise
+                delay = self._retry_delay(attempt, None)
+            attempt += 1
+            if span:
+                span.retries = attempt
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _record_response(span, res: aiohttp.ClientResponse, t0: float, connect: float) -> None:
+        span.status = res.status
+        elapsed = asyncio.get_running_loop().time() - t0
+        span.add('first_byte', max(elapsed - (span.stages.get('connect', 0.0) - connect), 0.0))
+
+    async def _open(self, url: str, headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        """逐次読み込み用にレスポンスを開く（ヘッダー受信までを計測）"""
+        session = self._ensure_session()
+        span = _current_span.get()
+        connect = span.stages.get('connect', 0.0) if span else 0.0
+        t0 = asyncio.get_running_loop().time()
+        res = await session.get(url, headers=headers)
+        if span:
+            self._record_response(span, res, t0, connect)
+        return res
+
+    @staticmethod
+    async def _iter_body(res: aiohttp.ClientResponse, chunk_size: int) -> AsyncIterator[bytes]:
+        """受信待ち時間をbody、受信量をbytesとして計測しながらチャンクを返す"""
+        span = _current_span.get()
+        chunks = res.content.iter_chunked(chunk_size)
+        while True:
+            t0 = asyncio.get_running_loop().time()
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                if span:
+                    span.add('body', asyncio.get_running_loop().time() - t0)
+            if span:
+                span.bytes += len(chunk)
+            yield chunk
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    async def _coalesce(self, op: str, key: Any, fn: Callable[..., Awaitable[Any]], *args) -> Any:
+        if self.inflight is None:
+            return await fn(*args)
+        return await self.inflight.do((op, key), lambda: fn(*args))
+
+    def inflight_stats(self) -> Dict[str, int]:
+        if self.inflight is None:
+            return {'flights': 0, 'coalesced': 0, 'in_flight': 0}
+        return self.inflight.stats()
+
+    async def _fetch_feed(self, channel_id: str):
+        return await self._coalesce('feed', channel_id, self._load_feed, channel_id)
+
+    async def _load_feed(self, channel_id: str):
+        with self._span('feed', channel_id) as span:
+            cached = self.feed_cache.get(channel_id)
+            if cached is not None and self.feed_cache.is_fresh(cached):
+                self.feed_cache.record('hits')
+                if span:
+                    span.cache = 'hit'
+                return cached['feed']
+            url = feed_url(channel_id)
+            res = await self._get(url, headers=self.feed_cache.conditional_headers(cached))
+            if res.status_code == 304 and cached is not None:
+                self.feed_cache.record('not_modified')
+                self.feed_cache.touch(channel_id)
+                if span:
+                    span.cache = 'not_modified'
+                return cached['feed']
+            if not res.ok:
+                raise YoutubeApiError(f'HTTP {res.status_code}: {url}')
+            self.feed_cache.record('misses')
+            with _stage('parse'):
+                feed = parse_feed(res.content)
+            self.feed_cache.put(channel_id, feed, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+            self._record_history(channel_id, feed.videos)
+            return feed
+
+    async def _load_feed_until(self, channel_id: str, stop_at: str) -> YoutubeFeed:
+        """stop_atより新しい動画だけのYoutubeFeedを返す（index.pyと同じ。最後まで読んだ場合のみキャッシュ）"""
+        with self._span('feed', channel_id) as span:
+            cached = self.feed_cache.get(channel_id)
+            if cached is not None and self.feed_cache.is_fresh(cached):
+                self.feed_cache.record('hits')
+                if span:
+                    span.cache = 'hit'
+                return _feed_until(cached['feed'], stop_at)
+            url = feed_url(channel_id)
+            async with await self._open(url, self.feed_cache.conditional_headers(cached)) as res:
+                if res.status == 304 and cached is not None:
+                    self.feed_cache.record('not_modified')
+                    self.feed_cache.touch(channel_id)
+                    if span:
+                        span.cache = 'not_modified'
+                    return _feed_until(cached['feed'], stop_at)
+                if res.status >= 400:
+                    raise YoutubeApiError(f'HTTP {res.status}: {url}')
+                self.feed_cache.record('misses')
+                parser = FeedStreamParser()
+                videos: List[YoutubeVideoInfo] = []
+                async for chunk in self._iter_body(res, 8192):
+                    with _stage('parse'):
+                        batch = parser.feed(chunk)
+                    for video in batch:
+                        if video.video_id == stop_at:
+                            # 読み残しがあるため接続は再利用せず閉じる
+                            res.close()
+                            return YoutubeFeed(parser.title, parser.channel_id, videos)
+                        videos.append(video)
+                with _stage('parse'):
+                    batch = parser.close()
+                for video in batch:
+                    if video.video_id == stop_at:
+                        return YoutubeFeed(parser.title, parser.channel_id, videos)
+                    videos.append(video)
+                etag, last_modified = res.headers.get('ETag'), res.headers.get('Last-Modified')
+            feed = YoutubeFeed(parser.title, parser.channel_id, videos)
+            self.feed_cache.put(channel_id, feed, etag, last_modified)
+            self._record_history(channel_id, videos)
+            return feed
+
+    def feed_cache_stats(self) -> Dict[str, int]:
+        return self.feed_cache.stats()
+
+    # 永続キャッシュはローカルSQLiteへの短い同期アクセスのため、そのまま呼び出す
+    _cache_get = YoutubeRssApi._cache_get
+    _cache_set = YoutubeRssApi._cache_set
+    _record_history = YoutubeRssApi._record_history
+    _record_history_detail = YoutubeRssApi._record_history_detail
+    _known_live_status = YoutubeRssApi._known_live_status
+    add_hook = YoutubeRssApi.add_hook
+    _span = YoutubeRssApi._span
+
+    async def extract_channel_id(self, url: str) -> Optional[str]:
+        channel_id, lookup_key = parse_channel_url(url)
+        if lookup_key is None:
+            return channel_id
+        channel_id = self._cache_get('channel_id', lookup_key)
+        if channel_id:
+            return channel_id
+        channel_id = await self.extract_channel_id_from_html(url)
+        if channel_id:
+            self._cache_set('channel_id', lookup_key, channel_id)
+        return channel_id
+
+    async def extract_channel_id_from_html(self, url: str) -> Optional[str]:
+        try:
+            return (await self._coalesce('channel_id', url, self._scan_channel_page, url, ('channel_id',))).get('channel_id')
+        except Exception:
+            pass
+        return None
+
+    async def _scan_channel_page(self, url: str, fields: Iterable[str]) -> Dict[str, str]:
+        """チャンネルページを逐次読み、fieldsがそろった時点で接続を閉じる（index.pyと同じ抽出）"""
+        with self._span('channel_page', url):
+            scanner = ChannelPageScanner(fields)
+            async with await self._open(url) as res:
+                if res.status >= 400:
+                    return {}
+                async for chunk in self._iter_body(res, 16384):
+                    with _stage('extract'):
+                        done = scanner.feed(chunk)
+                    if done:
+                        # 読み残しがあるため接続は再利用せず閉じる
+                        res.close()
+                        break
+            if scanner.pending:
+                _fail('no_match', ','.join(scanner.pending))
+            return scanner.values
+
+    async def get_channel_info(self, url: str) -> Optional[YoutubeChannelInfo]:
+        channel_id, lookup_key = parse_channel_url(url)
+        if channel_id is None and lookup_key is None:
+            return None
+        if channel_id:
+            url = f'https://www.youtube.com/channel/{channel_id}'
+        try:
+            values = await self._scan_channel_page(url, ('channel_id', 'name', 'owner_image'))
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] get_channel_info error:', e)
+            return None
+        channel_id = channel_id or values.get('channel_id')
+        if not channel_id:
+            return None
+        if lookup_key:
+            self._cache_set('channel_id', lookup_key, channel_id)
+        if values.get('owner_image'):
+            self._cache_set('owner_image', channel_id, values['owner_image'])
+        return YoutubeChannelInfo(channel_id, values.get('name'), values.get('owner_image'))
+
+    async def get_channel_name(self, channel_id: str) -> Optional[str]:
+        try:
+            return feed_title(await self._fetch_feed(channel_id))
+        except Exception:
+            return None
+
+    async def fetch_latest_videos(self, channel_id: str) -> List[YoutubeVideoInfo]:
+        """get_latest_videosの失敗時に例外を送出する版（YoutubeApiError / 通信例外。分類はclassify_failure）"""
+        return feed_videos(await self._fetch_feed(channel_id))
+
+    async def get_latest_videos(self, channel_id: str) -> Optional[List[YoutubeVideoInfo]]:
+        try:
+            return await self.fetch_latest_videos(channel_id)
+        except Exception:
+            return None
+
+    async def iter_latest_videos(self, channel_id: str, stop_at: Optional[str] = None) -> AsyncIterator[YoutubeVideoInfo]:
+        """
+        最新動画を新しい順に返す非同期ジェネレータ（YoutubeRssApi.iter_latest_videosと同じ）。
+        stop_atに到達した時点でダウンロード・解析を打ち切る。取得失敗時は例外を送出する。
+        """
+        if stop_at is None:
+            feed = await self._fetch_feed(channel_id)
+        else:
+            feed = await self._coalesce('feed_until', (channel_id, stop_at), self._load_feed_until, channel_id, stop_at)
+        for video in feed_videos(feed):
+            yield video
+
+    async def get_live_status(self, video_id: str) -> YoutubeLiveStatus:
+        try:
+            return await self._probe_live_status(video_id)
+        except Exception:
+            return YoutubeLiveStatus.NONE
+
+    async def _probe_live_status(self, video_id: str, max_probe_bytes: Optional[int] = LIVE_PROBE_MAX_BYTES,
+                                 precheck: bool = True) -> YoutubeLiveStatus:
+        # 読み込み上限の異なる呼び出しは相乗りさせない（他の呼び出しの上限で判定されないように）
+        return await self._coalesce('live_status', (video_id, max_probe_bytes, precheck), self._load_live_status,
+                                    video_id, max_probe_bytes, precheck)
+
+    async def _load_live_status(self, video_id: str, max_probe_bytes: Optional[int] = LIVE_PROBE_MAX_BYTES,
+                                precheck: bool = True) -> YoutubeLiveStatus:
+        """確定済みの状態・oEmbedでの存在確認・watchページの逐次読みの順に判定する（index.pyと同じ判定）"""
+        with self._span('live_status', video_id) as span:
+            known = self._known_live_status(video_id)
+            if known is not None:
+                if span:
+                    span.cache = 'hit'
+                return known
+            if precheck and (await self._get(oembed_url(video_id))).status_code in _OEMBED_MISSING:
+                return YoutubeLiveStatus.NONE
+            video_url = f'https://www.youtube.com/watch?v={video_id}'
+            probe = LiveStatusProbe()
+            async with await self._open(video_url) as res:
+                if res.status >= 400:
+                    return YoutubeLiveStatus.NONE
+                async for chunk in self._iter_body(res, 16384):
+                    with _stage('extract'):
+                        status = probe.feed(chunk)
+                    if status is not None:
+                        # 読み残しがあるため接続は再利用せず閉じる
+                        res.close()
+                        return status
+                    if max_probe_bytes is not None and probe.bytes_read >= max_probe_bytes:
+                        res.close()
+                        break
+                else:
+                    return probe.close()
+            res = await self._get(video_url)
+            if not res.ok:
+                return YoutubeLiveStatus.NONE
+            with _stage('parse'):
+                return parse_live_status(res.text)
+
+    async def get_live_statuses(self, video_ids: List[str], concurrency: int = 8,
+                                max_probe_bytes: Optional[int] = LIVE_PROBE_MAX_BYTES,
+                                precheck: bool = True) -> List[YoutubeLiveStatus]:
+        """複数動画のライブ状態を最大concurrency並列で判定する（結果はvideo_idsと同じ順序）"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def probe(video_id: str) -> YoutubeLiveStatus:
+            async with semaphore:
+                try:
+                    return await self._probe_live_status(video_id, max_probe_bytes, precheck)
+                except Exception:
+                    return YoutubeLiveStatus.NONE
+
+        return list(await asyncio.gather(*(probe(vid) for vid in video_ids)))
+
+    async def get_latest_video_info(self, channel_id: str) -> Optional[YoutubeVideoInfo]:
+        videos = await self.get_latest_videos(channel_id)
+        if not videos:
+            return None
+        latest = videos[0]
+        latest.live_status = await self.get_live_status(latest.video_id)
+        return latest
+
+    async def get_videos_with_paging(self, channel_id: str, page: int = 1, page_size: int = 10) -> Optional[Dict[str, Any]]:
+        videos = await self.get_latest_videos(channel_id)
+        if self.history is not None:
+            try:
+                total = self.history.count(channel_id)
+                if total:
+                    return {'videos': self.history.slice(channel_id, (page - 1) * page_size, page_size),
+                            'page': page, 'page_size': page_size, 'total': total}
+            except Exception as e:
+                if self.debug_mode:
+                    print('[DEBUG] history read error:', e)
+        if not videos:
+            return None
+        return paginate_videos(videos, page, page_size)
+
+    async def get_video_history(self, channel_id: str, cursor: Optional[str] = None, limit: int = 20,
+                                type: Any = None, live_status: Any = None, refresh: bool = True) -> Optional[Dict[str, Any]]:
+        if self.history is None:
+            return None
+        if refresh:
+            await self.get_latest_videos(channel_id)
+        try:
+            return self.history.page(channel_id, cursor, limit, type, live_status)
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] history read error:', e)
+            return None
+
+    async def get_video_detail(self, video_id: str) -> Optional[YoutubeVideoDetail]:
+        try:
+            return await self._fetch_video_detail(video_id)
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] get_video_detail error:', e)
+            return None
+
+    async def _fetch_video_detail(self, video_id: str) -> YoutubeVideoDetail:
+        return copy.copy(await self._coalesce('video_detail', video_id, self._load_video_detail, video_id))
+
+    async def _load_video_detail(self, video_id: str) -> YoutubeVideoDetail:
+        with self._span('video_detail', video_id) as span:
+            cached = self._cache_get('video_detail', video_id)
+            if cached is not None:
+                if span:
+                    span.cache = 'hit'
+                return YoutubeVideoDetail.from_dict(cached)
+            url = f'https://www.youtube.com/watch?v={video_id}'
+            res = await self._get(url)
+            if not res.ok:
+                raise YoutubeApiError(f'HTTP {res.status_code}: {url}')
+            with _stage('parse'):
+                detail = parse_video_detail(res.text, video_id, url, self.debug_mode)
+            self._record_history_detail(detail)
+            if is_immutable_detail(detail):
+                self._cache_set('video_detail', video_id, detail.to_dict())
+            return detail
+
+    async def get_channel_owner_image(self, channel_id: str) -> Optional[str]:
+        cached = self._cache_get('owner_image', channel_id)
+        if cached:
+            return cached
+        url = f'https://www.youtube.com/channel/{channel_id}'
+        try:
+            image = (await self._coalesce('owner_image', channel_id, self._scan_channel_page,
+                                          url, ('owner_image',))).get('owner_image')
+            if image:
+                self._cache_set('owner_image', channel_id, image)
+            return image
+        except Exception:
+            pass
+        return None
+
+    async def get_video_details(self, video_ids: List[str], concurrency: int = 3,
+                                on_error: Optional[Callable[[YoutubeDetailFailure], None]] = None) -> List[Optional[YoutubeVideoDetail]]:
+        """
+        複数動画の詳細を最大concurrency並列で取得する（結果はvideo_idsと同じ順序）。
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(video_id: str) -> Optional[YoutubeVideoDetail]:
+            async with semaphore:
+                try:
+                    return await self._fetch_video_detail(video_id)
+                except Exception as e:
+                    failure = YoutubeDetailFailure(video_id, e)
+                    if self.debug_mode:
+                        print('[DEBUG] get_video_details failure:', failure)
+                    if on_error:
+                        on_error(failure)
+                    return None
+
+        return list(await asyncio.gather(*(fetch(vid) for vid in video_ids)))
+
+    async def get_latest_videos_with_details(self, channel_id: str, concurrency: int = 3,
+                                             on_error: Optional[Callable[[YoutubeDetailFailure], None]] = None) -> List[YoutubeVideoDetail]:
+        videos = await self.get_latest_videos(channel_id)
+        if not videos:
+            return []
+        details = await self.get_video_details([v.video_id for v in videos], concurrency, on_error)
+        results = []
+        for d in details:
+            if d:
+                results.append(d)
+                if self.debug_mode:
+                    print('[DETAIL]', d.video_id, d.title, d.type, d.live_status)
+        return results
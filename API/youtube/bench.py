@@ -0,0 +1,468 @@
+"""
+YouTube RSS API Utility ベンチマーク (Python)
+
+【使い方】
+  python bench.py extract [--fixtures DIR] [--repeat N]
+    watchページ解析のCPUコストを旧実装(正規表現の連続走査)と新実装(単一抽出)で比較
+  python bench.py feed [--fixtures DIR] [--repeat N]
+    RSSフィード解析を旧実装(feedparser)と逐次パーサーで比較（import時間を含む）
+  python bench.py live [--fixtures DIR] [--concurrency N] [--latency MS]
+    ライブ状態判定の読み込みバイト数を全文取得と逐次判定(LiveStatusProbe)で比較し、
+    スタブサーバー経由で全文取得+parse_live_statusとget_live_statuses（oEmbedでの事前確認の有無、
+    確定済みの状態をキャッシュから返す場合）を同じ並列数で実行して、リクエスト数・受信量・所要時間を計測
+  python bench.py memory [--count N]
+    動画レコードN件(既定100000)の保持メモリを旧クラス(__dict__あり)と__slots__版で比較
+    （文字列を共有した場合と、JSON Linesから読み込んで文字列がレコードごとに作られる場合）
+  python bench.py suite [--fixtures DIR] [--iterations N] [--concurrency N] [--latency MS] [--metrics]
+    スタブサーバー(replay.py)経由でAPI全体を計測し、レイテンシ百分位とreq/sを出力
+    （チャンネルID解決のcold/warm、フィード取得+解析、動画詳細、詳細付き一括取得）
+    --metrics で取得処理ごとの段階別内訳(connect/first_byte/body/parse/extract)も出力
+
+- --fixtures 配下の *.html を保存済みwatchページ、*.xml を保存済みRSSフィードとして使用
+- 該当ファイルが無い場合は実ページと同程度のサイズの合成ページで計測
+- フィクスチャは replay.py record / synth で作成できる
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from index import (
+    LiveStatusProbe,
+    YoutubeLiveStatus,
+    YoutubeRssApi,
+    YoutubeVideoDetail,
+    YoutubeVideoType,
+    YoutubeVideoInfo,
+    dump_jsonl,
+    load_jsonl,
+    parse_feed,
+    parse_live_status,
+    parse_video_detail,
+)
+from replay import FixtureServer, FixtureStore, server_session, synthesize_fixtures, synthetic_feed, synthetic_watch_page
+from metrics import MetricsCollector
+from store import PersistentCache
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_watch_pages(fixtures: str) -> List[Tuple[str, str]]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    if not pages:
+        print(f'[INFO] {fixtures} に *.html が無いため合成ページを使用します')
+        pages = [
+            ('synthetic-normal', synthetic_watch_page('synthNorm01')),
+            ('synthetic-live', synthetic_watch_page('synthLive01', live=True)),
+        ]
+    return pages
+
+
+def load_feeds(fixtures: str) -> List[Tuple[str, bytes]]:
+    feeds = []
+    for path in sorted(glob.glob(os.path.join(fixtures, '*.xml'))):
+        with open(path, 'rb') as f:
+            feeds.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    if not feeds:
+        print(f'[INFO] {fixtures} に *.xml が無いため合成フィードを使用します')
+        feeds = [('synthetic-15', synthetic_feed())]
+    return feeds
+
+
+def legacy_parse_feed(feedparser, content: bytes) -> List[YoutubeVideoInfo]:
+    """比較用: feedparser + 旧get_latest_videosのエントリ変換"""
+    feed = feedparser.parse(content)
+    videos = []
+    for entry in feed.entries:
+        values = []
+        for name in ('yt_videoid', 'title', 'author', 'published', 'link'):
+            value = getattr(entry, name, '')
+            if isinstance(value, list):
+                value = value[0] if value else ''
+            if not isinstance(value, str):
+                value = str(value)
+            values.append(value)
+        type_ = YoutubeVideoType.SHORTS if '/shorts/' in values[4] else YoutubeVideoType.NORMAL
+        videos.append(YoutubeVideoInfo(*values, type=type_))
+    return videos
+
+
+def import_time_ms(module: str, repeat: int = 5) -> float:
+    """新しいインタプリタでのimport所要時間(中央値ms、起動時間を差し引き)"""
+    def run(code: str) -> float:
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        return (time.perf_counter() - t0) * 1000
+    base = statistics.median(run('pass') for _ in range(repeat))
+    return statistics.median(run(f'import {module}') for _ in range(repeat)) - base
+
+
+def legacy_parse_video_detail(html: str, video_id: str) -> Dict[str, object]:
+    """比較用: 旧get_video_detailの正規表現カスケード(デバッグ出力を除き同一)"""
+    url = f'https://www.youtube.com/watch?v={video_id}'
+    title = re.search(r'<title>(.*?)</title>', html)
+    title = title.group(1).replace(' - YouTube', '') if title else ''
+    author = re.search(r'"author":"([^"]+)"', html)
+    author = author.group(1) if author else ''
+    description = re.search(r'"shortDescription":"([^"]+)"', html)
+    description = description.group(1).replace('\\n', '\n') if description else ''
+    thumbnails = [m.replace('\\/', '/') for m in re.findall(r'"thumbnailUrl":"(https://i\.ytimg\.com[^"]+)"', html)]
+    is_shorts = False
+    if '/shorts/' in url or re.search(r'"canonicalUrl":"https://www.youtube.com/shorts/', html):
+        is_shorts = True
+    if not is_shorts and re.search(r'"shortsUrl":"https://www.youtube.com/shorts/', html):
+        is_shorts = True
+    is_live_content = None
+    m_live_content = re.search(r'"isLiveContent"\s*:\s*(true|false)', html)
+    if m_live_content:
+        is_live_content = m_live_content.group(1) == 'true'
+    live_broadcast_details = {}
+    m_live_broadcast = re.search(r'"liveBroadcastDetails"\s*:\s*\{([^}]*)\}', html)
+    if m_live_broadcast:
+        fragment = '{' + m_live_broadcast.group(1) + '}'
+        is_live_now = re.search(r'"isLiveNow"\s*:\s*(true|false)', fragment)
+        end_timestamp = re.search(r'"endTimestamp"\s*:\s*"([^"]+)"', fragment)
+        live_broadcast_details = {
+            'isLiveNow': is_live_now.group(1) == 'true' if is_live_now else None,
+            'endTimestamp': end_timestamp.group(1) if end_timestamp else None,
+        }
+    type_ = YoutubeVideoType.UNKNOWN
+    if is_shorts:
+        type_ = YoutubeVideoType.SHORTS
+    elif is_live_content is True or (is_live_content is None and m_live_broadcast):
+        type_ = YoutubeVideoType.ISLIVE if live_broadcast_details.get('isLiveNow') is True else YoutubeVideoType.LIVECONTENTS
+    elif is_live_content is False:
+        type_ = YoutubeVideoType.NORMAL
+    elif re.search(r'ライブ|配信|生放送|live', title, re.I) or re.search(r'ライブ|配信|生放送|live', description, re.I):
+        type_ = YoutubeVideoType.LIVECONTENTS
+    else:
+        type_ = YoutubeVideoType.NORMAL
+    live_status = YoutubeLiveStatus.NONE
+    if live_broadcast_details.get('isLiveNow') is True:
+        live_status = YoutubeLiveStatus.LIVE
+    elif live_broadcast_details.get('isLiveNow') is False:
+        live_status = YoutubeLiveStatus.ENDED if live_broadcast_details.get('endTimestamp') else YoutubeLiveStatus.UPCOMING
+    elif type_ == YoutubeVideoType.LIVECONTENTS:
+        live_status = YoutubeLiveStatus.UPCOMING
+    return {'title': title, 'author': author, 'description': description, 'thumbnails': thumbnails,
+            'type': type_, 'live_status': live_status}
+
+
+def time_per_call(fn: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """(中央値ms, 最小ms) をCPU時間で返す"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.process_time()
+        fn()
+        samples.append((time.process_time() - t0) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def bench_extract(args: argparse.Namespace) -> None:
+    pages = load_watch_pages(args.fixtures)
+    print(f"{'page':<24}{'KB':>8}{'legacy ms':>12}{'single ms':>12}{'speedup':>10}")
+    for name, html in pages:
+        video_id = name
+        old_med, _ = time_per_call(lambda: legacy_parse_video_detail(html, video_id), args.repeat)
+        new_med, _ = time_per_call(lambda: parse_video_detail(html, video_id), args.repeat)
+        detail = parse_video_detail(html, video_id)
+        speedup = old_med / new_med if new_med else float('inf')
+        print(f'{name[:23]:<24}{len(html) / 1024:>8.0f}{old_med:>12.3f}{new_med:>12.3f}{speedup:>9.1f}x'
+              f'  [{detail.type.value}/{detail.live_status.value}]')
+
+
+class LegacyVideoInfo:
+    """比較用: __slots__導入前のYoutubeVideoInfo"""
+    def __init__(self, video_id, title, author, published, url, live_status=None, type=None):
+        self.video_id = video_id
+        self.title = title
+        self.author = author
+        self.published = published
+        self.url = url
+        self.live_status = live_status
+        self.type = type
+
+
+class LegacyVideoDetail(LegacyVideoInfo):
+    def __init__(self, video_id, title, author, published, url, description=None, thumbnails=None,
+                 image_url=None, live_status=None, type=None):
+        super().__init__(video_id, title, author, published, url, live_status, type)
+        self.description = description
+        self.thumbnails = thumbnails or []
+        self.image_url = image_url
+
+
+def measure_records(cls: type, count: int) -> Tuple[int, list]:
+    """count件生成したときの確保メモリ(バイト)。文字列は共有し、オブジェクト自体の差だけを測る"""
+    thumbnails = ['https://i.ytimg.com/vi/x/hqdefault.jpg']
+    ids = [f'vid{i:08d}' for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [cls(vid, 'title', 'author', '2026-10-01', 'https://www.youtube.com/watch?v=x',
+                   description='desc', thumbnails=thumbnails, image_url=thumbnails[0],
+                   live_status=YoutubeLiveStatus.NONE, type=YoutubeVideoType.NORMAL) for vid in ids]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, records
+
+
+def measure_loaded_records(cls: type, count: int, channels: int = 50) -> int:
+    """
+    JSON Linesから読み込んだcount件の確保メモリ(バイト)。各レコードの文字列は別々に作られるため、
+    チャンネル名(author)の共有（intern）の有無も含めて測る
+    """
+    lines = [json.dumps({'video_id': f'vid{i:08d}', 'title': f'title {i}', 'author': f'Channel {i % channels}',
+                         'published': '2026-10-01T10:00:00+00:00', 'url': f'https://www.youtube.com/watch?v=vid{i:08d}',
+                         'description': 'desc', 'image_url': None}, ensure_ascii=False) for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [cls(**json.loads(line)) for line in lines]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return used
+
+
+def bench_memory(args: argparse.Namespace) -> None:
+    legacy_bytes, _ = measure_records(LegacyVideoDetail, args.count)
+    slotted_bytes, records = measure_records(YoutubeVideoDetail, args.count)
+    print(f'{"class":<24}{"total MB":>10}{"bytes/record":>14}')
+    for name, used in (('legacy (__dict__)', legacy_bytes), ('YoutubeVideoDetail', slotted_bytes)):
+        print(f'{name:<24}{used / 1024 / 1024:>10.1f}{used / args.count:>14.0f}')
+    print(f'削減率: {(1 - slotted_bytes / legacy_bytes) * 100:.0f}%')
+    # 文字列もレコードごとに作られる場合（JSON Lines・フィードからの読み込み）
+    legacy_loaded = measure_loaded_records(LegacyVideoDetail, args.count)
+    slotted_loaded = measure_loaded_records(YoutubeVideoDetail, args.count)
+    print('JSON Linesから読み込んだ場合（50チャンネル。authorのinternを含む）:')
+    for name, used in (('legacy (__dict__)', legacy_loaded), ('YoutubeVideoDetail', slotted_loaded)):
+        print(f'{name:<24}{used / 1024 / 1024:>10.1f}{used / args.count:>14.0f}')
+    print(f'削減率: {(1 - slotted_loaded / legacy_loaded) * 100:.0f}%')
+    # JSON Lines往復
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    dump_jsonl(records, buf)
+    t1 = time.perf_counter()
+    buf.seek(0)
+    restored = list(load_jsonl(buf, YoutubeVideoDetail))
+    t2 = time.perf_counter()
+    assert restored == records
+    print(f'JSON Lines: dump {t1 - t0:.2f}s / load {t2 - t1:.2f}s ({len(buf.getvalue()) / 1024 / 1024:.1f} MB)')
+
+
+def bench_feed(args: argparse.Namespace) -> None:
+    try:
+        import feedparser
+    except ImportError:
+        feedparser = None
+        print('[INFO] feedparser未インストールのため旧実装の計測を省略します')
+    feeds = load_feeds(args.fixtures)
+    print(f"{'feed':<24}{'KB':>8}{'feedparser ms':>15}{'stream ms':>12}{'speedup':>10}")
+    for name, content in feeds:
+        new_med, _ = time_per_call(lambda: parse_feed(content), args.repeat)
+        if feedparser is not None:
+            old_med, _ = time_per_call(lambda: legacy_parse_feed(feedparser, content), args.repeat)
+            assert [v.to_dict() for v in legacy_parse_feed(feedparser, content)] == \
+                [v.to_dict() for v in parse_feed(content).videos]
+            print(f'{name[:23]:<24}{len(content) / 1024:>8.0f}{old_med:>15.3f}{new_med:>12.3f}{old_med / new_med:>9.1f}x')
+        else:
+            print(f'{name[:23]:<24}{len(content) / 1024:>8.0f}{"-":>15}{new_med:>12.3f}{"-":>10}')
+    print('import時間:')
+    modules = ['xml.etree.ElementTree'] + (['feedparser'] if feedparser is not None else [])
+    for module in modules:
+        print(f'  {module:<24}{import_time_ms(module):>8.1f} ms')
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'mean': statistics.fmean(ordered)}
+
+
+def run_scenario(name: str, fn: Callable[[int], object], iterations: int, concurrency: int) -> None:
+    """fn(i)をiterations回、concurrency並列で実行しレイテンシ(ms)とreq/sを表示"""
+    samples: List[float] = []
+
+    def timed(i: int) -> None:
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(iterations)))
+    wall = time.perf_counter() - t0
+    p = percentiles(samples)
+    print(f"{name:<22}{p['p50']:>9.2f}{p['p90']:>9.2f}{p['p99']:>9.2f}{p['mean']:>9.2f}{iterations / wall:>10.1f}")
+
+
+def bench_suite(args: argparse.Namespace) -> None:
+    fixtures = args.fixtures
+    if not os.path.exists(os.path.join(fixtures, 'index.json')):
+        fixtures = tempfile.mkdtemp(prefix='yt-fixtures-')
+        print(f'[INFO] {args.fixtures} にindex.jsonが無いため合成フィクスチャを使用します ({fixtures})')
+        synthesize_fixtures(fixtures)
+    keys = FixtureStore(fixtures).keys()
+    handles = ['https://' + k for k in keys if re.search(r'/(@|c/|user/)', k)]
+    channel_ids = [re.search(r'channel_id=([\w-]+)', k).group(1) for k in keys if 'videos.xml' in k]
+    video_ids = [m.group(1) for m in (re.match(r'[^/?]+/watch\?v=([\w-]+)', k) for k in keys) if m]
+    if not (handles and channel_ids and video_ids):
+        print('[ERROR] フィクスチャにチャンネルページ・フィード・watchページが揃っていません')
+        return
+    cache_dir = tempfile.mkdtemp(prefix='yt-cache-')
+    with FixtureServer(fixtures, latency=args.latency / 1000) as server:
+        session = server_session(server.url, pool_size=max(10, args.concurrency * 3))
+        metrics = MetricsCollector()
+        api = YoutubeRssApi(session=session, feed_cache_ttl=0, hooks=[metrics] if args.metrics else None)
+        warm = YoutubeRssApi(session=session, cache=PersistentCache(os.path.join(cache_dir, 'cache.db')))
+        for url in handles:
+            warm.extract_channel_id(url)
+        n, c = args.iterations, args.concurrency
+        print(f'server={server.url} latency={args.latency}ms iterations={n} concurrency={c}')
+        print(f"{'scenario (ms)':<22}{'p50':>9}{'p90':>9}{'p99':>9}{'mean':>9}{'req/s':>10}")
+        run_scenario('resolve-cold', lambda i: api.extract_channel_id(handles[i % len(handles)]), n, c)
+        run_scenario('resolve-warm', lambda i: warm.extract_channel_id(handles[i % len(handles)]), n, c)
+
+        def feed(i: int) -> None:
+            api.feed_cache.clear()
+            api.get_latest_videos(channel_ids[i % len(channel_ids)])
+        run_scenario('feed-fetch+parse', feed, n, c)
+        run_scenario('feed-304', lambda i: api.get_latest_videos(channel_ids[i % len(channel_ids)]), n, c)
+        run_scenario('video-detail', lambda i: api.get_video_detail(video_ids[i % len(video_ids)]), n, c)
+
+        def batch(i: int) -> None:
+            api.feed_cache.clear()
+            api.get_latest_videos_with_details(channel_ids[i % len(channel_ids)], concurrency=5)
+        run_scenario('batch-with-details', batch, max(1, n // 5), c)
+        print(f'stub server requests: {server.requests}')
+        if args.metrics:
+            print(metrics.summary())
+
+
+def probe_bytes(page: bytes, chunk_size: int = 16384) -> Tuple[YoutubeLiveStatus, int]:
+    """ページをchunk_sizeずつLiveStatusProbeに渡し、(判定結果, 確定までに読んだバイト数)を返す"""
+    probe = LiveStatusProbe()
+    for i in range(0, len(page), chunk_size):
+        if probe.feed(page[i:i + chunk_size]) is not None:
+            return probe.status, probe.bytes_read
+    return probe.close(), probe.bytes_read
+
+
+def bench_live(args: argparse.Namespace) -> None:
+    pages = load_watch_pages(args.fixtures)
+    pages += [
+        ('synthetic-live-small-head', synthetic_watch_page('synthLive02', live=True, padding_kb=100)),
+        ('synthetic-normal-small-head', synthetic_watch_page('synthNorm02', padding_kb=100)),
+    ]
+    print(f"{'page':<30}{'status':>10}{'full KB':>10}{'probe KB':>10}{'ratio':>8}")
+    total_full = total_probe = 0
+    for name, html in pages:
+        page = html.encode('utf-8')
+        status, read = probe_bytes(page)
+        expected = parse_live_status(html)
+        mark = '' if status == expected else f'  [MISMATCH full={expected.value}]'
+        total_full += len(page)
+        total_probe += read
+        print(f"{name:<30}{status.value:>10}{len(page) / 1024:>10.1f}{read / 1024:>10.1f}"
+              f"{len(page) / max(read, 1):>7.1f}x{mark}")
+    print(f"{'total':<30}{'':>10}{total_full / 1024:>10.1f}{total_probe / 1024:>10.1f}"
+          f"{total_full / max(total_probe, 1):>7.1f}x")
+
+    fixtures = tempfile.mkdtemp(prefix='yt-fixtures-')
+    synthesize_fixtures(fixtures)
+    video_ids = [m.group(1) for m in (re.match(r'[^/?]+/watch\?v=([\w-]+)', k) for k in FixtureStore(fixtures).keys()) if m]
+    with FixtureServer(fixtures, latency=args.latency / 1000) as server:
+        session = server_session(server.url, pool_size=max(10, args.concurrency))
+        received: List[int] = []
+        cache = PersistentCache(os.path.join(fixtures, 'cache.db'))
+        api = YoutubeRssApi(session=session, cache=cache, hooks=[lambda span: received.append(span.bytes)])
+
+        def full_status(video_id: str) -> YoutubeLiveStatus:
+            res = api._get(f'https://www.youtube.com/watch?v={video_id}')
+            received.append(len(res.content))
+            return parse_live_status(res.text)
+
+        def run_full() -> List[YoutubeLiveStatus]:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                return list(pool.map(full_status, video_ids))
+
+        def warm_cache() -> None:
+            # 動画詳細を一度取得すると、確定済み（配信中・予定以外）の動画は永続キャッシュに入る
+            api.get_video_details(video_ids, concurrency=args.concurrency)
+
+        # (名前, 計測前の準備, 計測対象)。いずれも同じ並列数で実行する
+        runs = [
+            ('full page + parse_live_status', None, run_full),
+            ('get_live_statuses(precheck=False)', None,
+             lambda: api.get_live_statuses(video_ids, args.concurrency, precheck=False)),
+            ('get_live_statuses(precheck=True)', None,
+             lambda: api.get_live_statuses(video_ids, args.concurrency, precheck=True)),
+            ('get_live_statuses(cached details)', warm_cache,
+             lambda: api.get_live_statuses(video_ids, args.concurrency)),
+        ]
+        print(f'\n{len(video_ids)} videos, concurrency={args.concurrency}, latency={args.latency}ms')
+        print(f"{'path':<36}{'requests':>9}{'KB':>10}{'ms':>9}  match")
+        expected = None
+        for name, prepare, run in runs:
+            if prepare is not None:
+                prepare()
+            received.clear()
+            before = server.requests
+            t0 = time.perf_counter()
+            statuses = run()
+            elapsed = time.perf_counter() - t0
+            requests_made = server.requests - before
+            if expected is None:
+                expected = statuses
+            print(f'{name:<36}{requests_made:>9}{sum(received) / 1024:>10.1f}{elapsed * 1000:>9.1f}  '
+                  f'{statuses == expected}')
+        api.close()
+        cache.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='YouTube RSS API benchmark')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_extract = sub.add_parser('extract', help='watchページ解析のCPUコスト比較')
+    p_extract.add_argument('--fixtures', default=FIXTURES_DIR)
+    p_extract.add_argument('--repeat', type=int, default=50)
+    p_extract.set_defaults(func=bench_extract)
+    p_feed = sub.add_parser('feed', help='RSSフィード解析の比較')
+    p_feed.add_argument('--fixtures', default=FIXTURES_DIR)
+    p_feed.add_argument('--repeat', type=int, default=200)
+    p_feed.set_defaults(func=bench_feed)
+    p_suite = sub.add_parser('suite', help='スタブサーバー経由のAPI全体ベンチマーク')
+    p_suite.add_argument('--fixtures', default=FIXTURES_DIR)
+    p_suite.add_argument('--iterations', type=int, default=100)
+    p_suite.add_argument('--concurrency', type=int, default=4)
+    p_suite.add_argument('--latency', type=float, default=0.0, help='スタブサーバーの応答遅延(ms)')
+    p_suite.add_argument('--metrics', action='store_true', help='段階別の内訳(MetricsCollector)も出力')
+    p_suite.set_defaults(func=bench_suite)
+    p_live = sub.add_parser('live', help='ライブ状態判定の読み込み量・一括判定の比較')
+    p_live.add_argument('--fixtures', default=FIXTURES_DIR)
+    p_live.add_argument('--concurrency', type=int, default=8)
+    p_live.add_argument('--latency', type=float, default=20.0, help='スタブサーバーの応答遅延(ms)')
+    p_live.set_defaults(func=bench_live)
+    p_memory = sub.add_parser('memory', help='動画レコードの保持メモリ比較')
+    p_memory.add_argument('--count', type=int, default=100000)
+    p_memory.set_defaults(func=bench_memory)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
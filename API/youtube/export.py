@@ -0,0 +1,255 @@
+"""
+YouTube RSS API Utility 一括エクスポート (Python)
+
+多数のチャンネルの最新動画をJSON Linesで書き出すCLI。
+- 入力: チャンネルURL・@handle・チャンネルID（UC...）を1行1件。ファイルまたは標準入力（-）、#以降はコメント
+- 入力をbatch件ずつのシャードに分けてプロセスプールで処理し、各プロセス内ではスレッドで並列に取得
+- 処理中のシャードは最大 processes×2 個（入力は必要な分だけ読むため、件数によらずメモリ使用量は一定）
+- 書き出しの単位はシャード: ワーカーは1シャード分の行をまとめて返し、親は完了したシャードから順に書き出す
+  （1チャンネルごとには出力されない。書き出しの粒度・シャードあたりのメモリは --batch で調整。
+  出力順は入力順と一致しない。各行のsourceが入力行）
+- requests等はワーカープロセスでのみ読み込む（--help・入力エラーは即座に終わる）
+- 終了時に標準エラーへ件数・スループット・失敗の内訳を出力（失敗したチャンネルがあれば終了コード1）
+
+【使い方】
+  python export.py channels.txt -o videos.jsonl
+  cat channels.txt | python export.py - --details --processes 4 --concurrency 8
+  python export.py channels.txt --errors failed.jsonl --cache youtube_cache.db
+
+出力レコード: {"source": 入力行, "channel_id": ..., "video_id": ..., "title": ..., ...}
+  --details で動画詳細（description / thumbnails / image_url / 種別・ライブ状態）を含める
+失敗レコード(--errors): {"source": 入力行, "channel_id": ..., "error": 分類, "detail": ...}
+  分類: resolve（チャンネルID解決失敗）/ timeout / connection / parse / other
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ワーカープロセスごとのYoutubeRssApi（_init_workerで生成）
+_api = None
+_options: Dict[str, Any] = {}
+
+_BARE_CHANNEL_ID_RE = re.compile(r'UC[a-zA-Z0-9_-]{22}')
+
+
+def iter_channels(fp: IO[str]) -> Iterator[str]:
+    """入力を1行ずつ読み、空行・コメントを除いたチャンネル指定を返す"""
+    for line in fp:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            yield line
+
+
+def channel_url(source: str) -> str:
+    """チャンネルID・@handle・スキーム省略のURLをextract_channel_idが扱えるURLにする"""
+    if _BARE_CHANNEL_ID_RE.fullmatch(source):
+        return f'https://www.youtube.com/channel/{source}'
+    if source.startswith('@'):
+        return f'https://www.youtube.com/{source}'
+    if '://' not in source:
+        return f'https://{source}'
+    return source
+
+
+def iter_shards(channels: Iterable[str], size: int) -> Iterator[List[str]]:
+    shard: List[str] = []
+    for channel in channels:
+        shard.append(channel)
+        if len(shard) >= size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    global _api
+    # Ctrl+Cは親プロセスだけで受け、ワーカーは実行中のシャードを終えてから終了する
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # 重い依存（requests/urllib3/sqlite）はワーカー側で1回だけ読み込む
+    from index import YoutubeRssApi
+
+    _options.update(options)
+    pool_size = options['concurrency'] * max(1, options['details_concurrency'] if options['details'] else 1)
+    session = None
+    if options.get('base_url'):
+        from replay import server_session
+        session = server_session(options['base_url'], pool_size)
+    cache = None
+    if options.get('cache'):
+        from store import PersistentCache
+        cache = PersistentCache(options['cache'])
+    _api = YoutubeRssApi(session=session, pool_size=pool_size, timeout=options['timeout'], cache=cache)
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+def _export_channel(source: str) -> Tuple[List[str], Optional[Dict[str, Any]], int]:
+    """1チャンネル分の出力行・失敗レコード・動画詳細の取得失敗数を返す"""
+    from index import classify_failure
+
+    channel_id = _api.extract_channel_id(channel_url(source))
+    if not channel_id:
+        return [], {'source': source, 'channel_id': None, 'error': 'resolve', 'detail': None}, 0
+    try:
+        videos = _api.fetch_latest_videos(channel_id)
+    except Exception as e:
+        return [], {'source': source, 'channel_id': channel_id, 'error': classify_failure(e), 'detail': str(e)}, 0
+    detail_failures = 0
+    if _options['details'] and videos:
+        details = _api.get_video_details([v.video_id for v in videos], _options['details_concurrency'])
+        detail_failures = sum(1 for d in details if d is None)
+        # 詳細が取れなかった動画はフィードの内容で出力する
+        videos = [d or v for d, v in zip(details, videos)]
+    head = {'source': source, 'channel_id': channel_id}
+    return [_dumps({**head, **v.to_dict()}) for v in videos], None, detail_failures
+
+
+def _export_shard(shard: List[str]) -> Dict[str, Any]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    lines: List[str] = []
+    failures: List[Dict[str, Any]] = []
+    detail_failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(_options['concurrency'], len(shard)))) as pool:
+        for channel_lines, failure, n in pool.map(_export_channel, shard):
+            lines += channel_lines
+            detail_failures += n
+            if failure is not None:
+                failures.append(failure)
+    return {'channels': len(shard), 'lines': lines, 'failures': failures, 'detail_failures': detail_failures}
+
+
+class ExportSummary:
+    __slots__ = ('started', 'finished', 'channels', 'videos', 'detail_failures', 'failures', 'by_reason')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.channels = 0
+        self.videos = 0
+        self.detail_failures = 0
+        # 先頭の数件だけ保持（件数によらずメモリ一定）
+        self.failures: List[Dict[str, Any]] = []
+        self.by_reason: Dict[str, int] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.channels += result['channels']
+        self.videos += len(result['lines'])
+        self.detail_failures += result['detail_failures']
+        for failure in result['failures']:
+            self.by_reason[failure['error']] = self.by_reason.get(failure['error'], 0) + 1
+            if len(self.failures) < 10:
+                self.failures.append(failure)
+
+    @property
+    def failed(self) -> int:
+        return sum(self.by_reason.values())
+
+    def report(self) -> str:
+        elapsed = max((self.finished or time.perf_counter()) - self.started, 1e-9)
+        lines = [
+            f'チャンネル: 成功 {self.channels - self.failed}件 / 失敗 {self.failed}件 (計 {self.channels}件) '
+            f'/ 動画 {self.videos}件' + (f' / 詳細取得失敗 {self.detail_failures}件' if self.detail_failures else ''),
+            f'経過 {elapsed:.1f}秒 / {self.channels / elapsed:.1f}チャンネル/秒 / {self.videos / elapsed:.1f}動画/秒',
+        ]
+        if self.by_reason:
+            lines.append('失敗の内訳: ' + ', '.join(f'{k}: {v}件' for k, v in
+                                               sorted(self.by_reason.items(), key=lambda kv: -kv[1])))
+            for failure in self.failures:
+                lines.append(f"  {failure['source']}: {failure['error']} {failure['detail'] or ''}".rstrip())
+        return '\n'.join(lines)
+
+
+def export(channels: Iterable[str], out: IO[str], processes: int = 4, batch: int = 16, concurrency: int = 8,
+           details: bool = False, details_concurrency: int = 3, timeout: float = 10,
+           cache: Optional[str] = None, base_url: Optional[str] = None,
+           errors: Optional[IO[str]] = None, summary: Optional[ExportSummary] = None) -> ExportSummary:
+    """
+    channelsをbatch件ずつprocessesプロセスで取得し、完了したシャードからoutへJSON Linesで書き出す
+    （シャード単位でまとめて書き出す。1チャンネルずつ出力したい場合はbatch=1）。
+    処理中のシャードは最大processes×2個まで（channelsはその分だけ先読みする）。
+    summaryを渡すと途中経過をそこへ集計する（中断時もそれまでに書き出した分を参照できる）。
+    """
+    options = {'concurrency': concurrency, 'details': details, 'details_concurrency': details_concurrency,
+               'timeout': timeout, 'cache': cache, 'base_url': base_url}
+    summary = summary if summary is not None else ExportSummary()
+    shards = iter_shards(channels, batch)
+    window = processes * 2
+    pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(options,))
+    pending = set()
+    try:
+        while True:
+            for shard in shards:
+                pending.add(pool.submit(_export_shard, shard))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                for line in result['lines']:
+                    out.write(line)
+                    out.write('\n')
+                out.flush()
+                if errors is not None and result['failures']:
+                    for failure in result['failures']:
+                        errors.write(_dumps(failure))
+                        errors.write('\n')
+                    errors.flush()
+                summary.add(result)
+    finally:
+        # 中断時は未着手のシャードを捨てる
+        pool.shutdown(wait=True, cancel_futures=True)
+        summary.finished = time.perf_counter()
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='YouTube RSS 一括エクスポート（JSON Lines）')
+    parser.add_argument('input', help='チャンネルURL・@handle・チャンネルIDを1行1件で書いたファイル（-で標準入力）')
+    parser.add_argument('-o', '--output', default='-', help='出力先（既定: 標準出力）')
+    parser.add_argument('--errors', help='失敗したチャンネルをJSON Linesで書き出すファイル')
+    parser.add_argument('--processes', type=int, default=min(4, os.cpu_count() or 1), help='ワーカープロセス数')
+    parser.add_argument('--batch', type=int, default=16, help='1シャードあたりのチャンネル数（書き出しの単位）')
+    parser.add_argument('--concurrency', type=int, default=8, help='プロセスごとに同時取得するチャンネル数')
+    parser.add_argument('--details', action='store_true', help='動画詳細（watchページ）も取得する')
+    parser.add_argument('--details-concurrency', type=int, default=3, help='チャンネルごとの動画詳細の同時取得数')
+    parser.add_argument('--timeout', type=float, default=10, help='リクエストのタイムアウト秒数')
+    parser.add_argument('--cache', help='永続キャッシュ(store.py)のSQLiteファイル（プロセス間で共有）')
+    parser.add_argument('--base-url', help='接続先の差し替え（replay.pyのスタブサーバーでの動作確認用）')
+    args = parser.parse_args()
+    if args.processes < 1 or args.batch < 1 or args.concurrency < 1:
+        parser.error('--processes / --batch / --concurrency は1以上を指定してください')
+
+    src = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    errors = open(args.errors, 'w', encoding='utf-8') if args.errors else None
+    summary = ExportSummary()
+    try:
+        export(iter_channels(src), out, args.processes, args.batch, args.concurrency, args.details,
+               args.details_concurrency, args.timeout, args.cache, args.base_url, errors, summary)
+    except KeyboardInterrupt:
+        print('中断しました（以下は中断までに書き出した分）', file=sys.stderr)
+        print(summary.report(), file=sys.stderr)
+        return 130
+    finally:
+        for fp in (src, out, errors):
+            if fp is not None and fp not in (sys.stdin, sys.stdout):
+                fp.close()
+    print(summary.report(), file=sys.stderr)
+    return 1 if summary.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
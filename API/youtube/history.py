@@ -0,0 +1,221 @@
+"""
+YouTube RSS API Utility 動画履歴インデックス (Python)
+
+RSSフィードは最新15件前後しか返さないため、取得したフィードをチャンネルごとにSQLiteへ蓄積し、
+15件より古い動画も含めて公開日時順にページングできるようにする。
+- video_idをキーにupsert（タイトル変更は上書き。種別・ライブ状態は動画詳細で判明した値をフィードで上書きしない）
+- ページングは(公開日時, video_id)のカーソルによるキーセット方式（ネットワーク・全件読み込みなし）
+- YoutubeVideoType / YoutubeLiveStatus での絞り込み（動画詳細を取得した動画のみ種別・状態が入る）
+- 1ページ分だけを読み込むため、数千件以上のチャンネルでもメモリ使用量は一定
+- WALモード+busy_timeoutで複数ワーカープロセスから同じファイルを共有可能（接続はスレッドごと）
+
+【使い方例】
+from index import YoutubeRssApi, YoutubeVideoType
+from history import VideoHistory
+
+api = YoutubeRssApi(history=VideoHistory('youtube_history.db'))
+api.get_latest_videos(channel_id)            # 取得したフィードは自動で履歴に追加される
+page = api.get_video_history(channel_id, limit=20)
+while page and page['next_cursor']:
+    page = api.get_video_history(channel_id, cursor=page['next_cursor'], refresh=False)
+shorts = api.get_video_history(channel_id, type=YoutubeVideoType.SHORTS)
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from index import YoutubeLiveStatus, YoutubeVideoInfo, YoutubeVideoType
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    published TEXT NOT NULL,
+    title TEXT,
+    author TEXT,
+    url TEXT,
+    live_status TEXT,
+    type TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS videos_channel ON videos (channel_id, published, video_id);
+"""
+
+_COLUMNS = 'video_id, title, author, published, url, live_status, type'
+
+_Filter = Union[None, str, Enum, Iterable[Union[str, Enum]]]
+
+
+def encode_cursor(published: str, video_id: str) -> str:
+    raw = json.dumps([published, video_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    published, video_id = json.loads(raw)
+    return published, video_id
+
+
+def _values(value: _Filter) -> Optional[List[str]]:
+    if value is None:
+        return None
+    if isinstance(value, (str, Enum)):
+        value = [value]
+    return [v.value if isinstance(v, Enum) else v for v in value]
+
+
+def _row_to_video(row: Tuple) -> YoutubeVideoInfo:
+    video_id, title, author, published, url, live_status, type_ = row
+    return YoutubeVideoInfo(video_id, title or '', author or '', published, url or '',
+                            YoutubeLiveStatus(live_status) if live_status else None,
+                            YoutubeVideoType(type_) if type_ else None)
+
+
+class VideoHistory:
+    """
+    path: SQLiteファイルのパス
+    busy_timeout: 他プロセスの書き込み中に待つ秒数
+    """
+
+    def __init__(self, path: str = 'youtube_history.db', busy_timeout: float = 30):
+        self.path = os.path.abspath(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # --- 書き込み ---
+
+    def merge(self, channel_id: str, videos: Iterable[YoutubeVideoInfo]) -> int:
+        """フィードの動画をチャンネルの履歴に追加・更新し、新たに追加した件数を返す"""
+        now = time.time()
+        rows = [(v.video_id, channel_id, v.published or '', v.title, v.author, v.url,
+                 v.live_status.value if v.live_status else None, v.type.value if v.type else None, now, now)
+                for v in videos if v.video_id]
+        if not rows:
+            return 0
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            placeholders = ','.join('?' * len(rows))
+            known = conn.execute(f'SELECT COUNT(*) FROM videos WHERE video_id IN ({placeholders})',
+                                 [r[0] for r in rows]).fetchone()[0]
+            conn.executemany(
+                'INSERT INTO videos (video_id, channel_id, published, title, author, url, live_status, type, '
+                'first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(video_id) DO UPDATE SET '
+                'published = CASE WHEN excluded.published != \'\' THEN excluded.published ELSE published END, '
+                'title = excluded.title, author = excluded.author, url = excluded.url, '
+                # 種別・ライブ状態はupdate_details（watchページ）で判明した値を優先し、フィードの値で上書きしない
+                'live_status = COALESCE(live_status, excluded.live_status), '
+                'type = COALESCE(type, excluded.type), last_seen = excluded.last_seen',
+                rows,
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return len(rows) - known
+
+    def update_details(self, videos: Iterable[YoutubeVideoInfo]) -> int:
+        """動画詳細で判明した種別・ライブ状態を反映する（履歴にない動画は無視）。更新件数を返す"""
+        rows = [(v.live_status.value if v.live_status else None, v.type.value if v.type else None,
+                 time.time(), v.video_id) for v in videos]
+        if not rows:
+            return 0
+        conn = self._conn()
+        before = conn.total_changes
+        conn.executemany(
+            'UPDATE videos SET live_status = COALESCE(?, live_status), type = COALESCE(?, type), '
+            'last_seen = ? WHERE video_id = ?', rows)
+        return conn.total_changes - before
+
+    # --- 読み込み ---
+
+    def _where(self, channel_id: str, type: _Filter, live_status: _Filter) -> Tuple[str, List[Any]]:
+        clauses, params = ['channel_id = ?'], [channel_id]
+        for column, value in (('type', _values(type)), ('live_status', _values(live_status))):
+            if value is not None:
+                clauses.append(f"{column} IN ({','.join('?' * len(value))})")
+                params += value
+        return ' AND '.join(clauses), params
+
+    def page(self, channel_id: str, cursor: Optional[str] = None, limit: int = 20,
+             type: _Filter = None, live_status: _Filter = None) -> Dict[str, Any]:
+        """
+        新しい順にlimit件を返す。次ページはnext_cursorを渡して取得（最後のページではNone）。
+        type / live_statusは値1つまたは複数の指定で絞り込む。
+        """
+        where, params = self._where(channel_id, type, live_status)
+        if cursor:
+            where += ' AND (published, video_id) < (?, ?)'
+            params += list(decode_cursor(cursor))
+        rows = self._conn().execute(
+            f'SELECT {_COLUMNS} FROM videos WHERE {where} ORDER BY published DESC, video_id DESC LIMIT ?',
+            params + [limit + 1],
+        ).fetchall()
+        videos = [_row_to_video(r) for r in rows[:limit]]
+        next_cursor = encode_cursor(videos[-1].published, videos[-1].video_id) if len(rows) > limit else None
+        return {'videos': videos, 'next_cursor': next_cursor, 'limit': limit}
+
+    def slice(self, channel_id: str, offset: int, limit: int,
+              type: _Filter = None, live_status: _Filter = None) -> List[YoutubeVideoInfo]:
+        """ページ番号指定用（get_videos_with_paging）。深いページはカーソル指定のpageを使う"""
+        where, params = self._where(channel_id, type, live_status)
+        rows = self._conn().execute(
+            f'SELECT {_COLUMNS} FROM videos WHERE {where} ORDER BY published DESC, video_id DESC LIMIT ? OFFSET ?',
+            params + [limit, max(offset, 0)],
+        ).fetchall()
+        return [_row_to_video(r) for r in rows]
+
+    def iter_videos(self, channel_id: str, batch: int = 500,
+                    type: _Filter = None, live_status: _Filter = None) -> Iterator[YoutubeVideoInfo]:
+        """履歴全体を新しい順にbatch件ずつ読み込みながら返す"""
+        cursor = None
+        while True:
+            page = self.page(channel_id, cursor, batch, type, live_status)
+            yield from page['videos']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    def get(self, video_id: str) -> Optional[YoutubeVideoInfo]:
+        row = self._conn().execute(f'SELECT {_COLUMNS} FROM videos WHERE video_id = ?', (video_id,)).fetchone()
+        return _row_to_video(row) if row else None
+
+    def count(self, channel_id: str, type: _Filter = None, live_status: _Filter = None) -> int:
+        where, params = self._where(channel_id, type, live_status)
+        return self._conn().execute(f'SELECT COUNT(*) FROM videos WHERE {where}', params).fetchone()[0]
+
+    def channels(self) -> Dict[str, int]:
+        """チャンネルID -> 蓄積した動画数"""
+        return dict(self._conn().execute('SELECT channel_id, COUNT(*) FROM videos GROUP BY channel_id'))
+
+    def clear(self, channel_id: Optional[str] = None) -> None:
+        if channel_id is None:
+            self._conn().execute('DELETE FROM videos')
+        else:
+            self._conn().execute('DELETE FROM videos WHERE channel_id = ?', (channel_id,))
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
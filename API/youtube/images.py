@@ -0,0 +1,422 @@
+"""
+YouTube RSS API Utility 画像パイプライン (Python)
+
+動画サムネイル（thumbnails / image_url）とチャンネルのオーナー画像（og:image）を並列にダウンロードし、
+ローカルのコンテンツアドレス型キャッシュに保存する。利用側はi.ytimg.comではなくローカルファイルを配信できる。
+- 保存先は内容のSHA-256で決まる（URLが違っても同じ画像は1ファイルのみ）
+- 合計サイズがmax_bytesを超えたら最終アクセスが古い画像から削除（LRU）。1枚でmax_bytesを超える画像は保存せずFAILED
+- revalidate_after秒を過ぎた画像はIf-None-Match / If-Modified-Sinceで再検証（304なら再ダウンロードなし）
+- 本文は一時ファイルへ逐次書き込みながらハッシュを計算する（画像全体をメモリに持たない）
+- 同じURLの同時取得は1回にまとめる（index.SingleFlight）
+- sizes=(120, 320) のように指定すると長辺を縮小した版（JPEG）も作成（要 pip install Pillow、任意）
+
+【使い方例】
+from index import YoutubeRssApi
+from images import ImagePipeline
+
+api = YoutubeRssApi()
+with ImagePipeline('image_cache', max_bytes=512 << 20, sizes=(120, 320)) as images:
+    results = images.fetch_video_images(api, ['dQw4w9WgXcQ', ...])
+    for r in results:
+        print(r.url, r.status, r.path, images.path_for(r.url, 320))
+    owners = images.fetch_channel_images(api, [channel_id, ...])
+    print(images.stats())
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from index import SingleFlight, YoutubeVideoDetail, create_session
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    checked_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS urls_hash ON urls (hash);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    variants TEXT NOT NULL DEFAULT '',
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS blobs_accessed ON blobs (accessed_at);
+"""
+
+DOWNLOADED = 'downloaded'
+NOT_MODIFIED = 'not_modified'
+CACHED = 'cached'
+FAILED = 'failed'
+
+
+class ImageResult:
+    __slots__ = ('url', 'status', 'hash', 'path', 'size', 'content_type', 'error')
+
+    def __init__(self, url: str, status: str, hash: Optional[str] = None, path: Optional[str] = None,
+                 size: int = 0, content_type: Optional[str] = None, error: Optional[str] = None):
+        self.url = url
+        self.status = status
+        self.hash = hash
+        self.path = path
+        self.size = size
+        self.content_type = content_type
+        self.error = error
+
+    def __repr__(self):
+        return f"<ImageResult {self.status} {self.url} {self.hash and self.hash[:12]} {self.size} {self.error or ''}>"
+
+    @property
+    def ok(self) -> bool:
+        return self.status != FAILED
+
+
+def video_image_urls(detail: YoutubeVideoDetail) -> List[str]:
+    """動画詳細のimage_urlとthumbnailsを重複なしで返す"""
+    urls = []
+    for url in [detail.image_url] + list(detail.thumbnails or []):
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+class ImageCache:
+    """
+    directory: 画像ファイルとインデックス(index.db)の保存先
+    max_bytes: 縮小版を含む合計サイズの上限（超過分はLRUで削除）
+    """
+
+    def __init__(self, directory: str = 'image_cache', max_bytes: int = 256 << 20, busy_timeout: float = 30):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        os.makedirs(os.path.join(self.directory, 'tmp'), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # 参照中の画像（hash -> 参照数）。evictはこれらを削除しない
+        self._pins: Dict[str, int] = {}
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=self.busy_timeout,
+                                   isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def blob_path(self, digest: str, size: Optional[int] = None) -> str:
+        name = digest if size is None else f'{digest}_{size}.jpg'
+        return os.path.join(self.directory, digest[:2], name)
+
+    def lookup(self, url: str, pin: bool = False) -> Optional[Dict[str, Any]]:
+        """pin=Trueなら見つかった画像をunpinまでevictの対象から外す（存在確認と同時に行う）"""
+        if not pin:
+            return self._lookup(url)
+        with self._lock:
+            entry = self._lookup(url)
+            if entry is not None:
+                self._pins[entry['hash']] = self._pins.get(entry['hash'], 0) + 1
+            return entry
+
+    def unpin(self, digest: str) -> None:
+        with self._lock:
+            n = self._pins.get(digest, 0) - 1
+            if n > 0:
+                self._pins[digest] = n
+            else:
+                self._pins.pop(digest, None)
+
+    def _lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            'SELECT u.hash, u.etag, u.last_modified, u.content_type, u.checked_at, b.size, b.variants '
+            'FROM urls u JOIN blobs b ON b.hash = u.hash WHERE u.url = ?', (url,)).fetchone()
+        if row is None or not os.path.exists(self.blob_path(row[0])):
+            return None
+        keys = ('hash', 'etag', 'last_modified', 'content_type', 'checked_at', 'size', 'variants')
+        entry = dict(zip(keys, row))
+        entry['variants'] = [int(v) for v in entry['variants'].split(',') if v]
+        return entry
+
+    def touch(self, digest: str) -> None:
+        self._conn().execute('UPDATE blobs SET accessed_at = ? WHERE hash = ?', (time.time(), digest))
+
+    def revalidated(self, url: str) -> None:
+        self._conn().execute('UPDATE urls SET checked_at = ? WHERE url = ?', (time.time(), url))
+
+    def temp_file(self):
+        return tempfile.NamedTemporaryFile(dir=os.path.join(self.directory, 'tmp'), delete=False)
+
+    def store(self, url: str, temp_path: str, digest: str, size: int, etag: Optional[str],
+              last_modified: Optional[str], content_type: Optional[str], pin: bool = False) -> Tuple[str, bool]:
+        """
+        一時ファイルをハッシュ名で保存し (保存先, 新規ファイルか) を返す。同じ内容が既にあれば一時ファイルは捨てる。
+        pin=Trueなら保存と同時にunpinまでevictの対象から外す
+        """
+        path = self.blob_path(digest)
+        now = time.time()
+        with self._lock:
+            created = not os.path.exists(path)
+            if created:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+            else:
+                os.unlink(temp_path)
+            conn = self._conn()
+            conn.execute('INSERT INTO blobs (hash, size, accessed_at) VALUES (?, ?, ?) '
+                         'ON CONFLICT(hash) DO UPDATE SET accessed_at = excluded.accessed_at', (digest, size, now))
+            conn.execute('INSERT OR REPLACE INTO urls (url, hash, etag, last_modified, content_type, checked_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', (url, digest, etag, last_modified, content_type, now))
+            if pin:
+                self._pins[digest] = self._pins.get(digest, 0) + 1
+        return path, created
+
+    def add_variants(self, digest: str, sizes: Dict[int, int]) -> None:
+        """縮小版 {長辺: バイト数} を記録し、合計サイズに加算する"""
+        if not sizes:
+            return
+        with self._lock:
+            conn = self._conn()
+            row = conn.execute('SELECT size, variants FROM blobs WHERE hash = ?', (digest,)).fetchone()
+            if row is None:
+                return
+            known = {int(v) for v in row[1].split(',') if v}
+            added = {k: v for k, v in sizes.items() if k not in known}
+            conn.execute('UPDATE blobs SET size = ?, variants = ? WHERE hash = ?',
+                         (row[0] + sum(added.values()), ','.join(str(v) for v in sorted(known | set(added))), digest))
+
+    def total_bytes(self) -> int:
+        return self._conn().execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """合計サイズがmax_bytes以下になるまで最終アクセスの古い画像（と縮小版・URL対応）を削除し、削除件数を返す"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            conn = self._conn()
+            excess = self.total_bytes() - limit
+            if excess <= 0:
+                return 0
+            victims = []
+            for digest, size, variants in conn.execute('SELECT hash, size, variants FROM blobs ORDER BY accessed_at'):
+                if excess <= 0:
+                    break
+                if digest in self._pins:
+                    continue
+                victims.append((digest, variants))
+                excess -= size
+            for digest, variants in victims:
+                for path in [self.blob_path(digest)] + [self.blob_path(digest, int(v)) for v in variants.split(',') if v]:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                conn.execute('DELETE FROM urls WHERE hash = ?', (digest,))
+                conn.execute('DELETE FROM blobs WHERE hash = ?', (digest,))
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        urls = conn.execute('SELECT COUNT(*) FROM urls').fetchone()[0]
+        blobs = conn.execute('SELECT COUNT(*) FROM blobs').fetchone()[0]
+        return {'urls': urls, 'blobs': blobs, 'bytes': self.total_bytes(), 'max_bytes': self.max_bytes}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _resize_variants(path: str, digest: str, cache: ImageCache, sizes: Sequence[int]) -> Dict[int, int]:
+    """長辺をsizesに縮小したJPEGを作成し {長辺: バイト数} を返す（Pillowが無ければ何もしない）"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return {}
+    created = {}
+    for size in sorted(sizes, reverse=True):
+        out = cache.blob_path(digest, size)
+        if os.path.exists(out):
+            continue
+        with Image.open(path) as img:
+            # JPEGはデコード時に1/2・1/4・1/8で縮小できるため、全画素を展開せずに済む
+            img.draft('RGB', (size, size))
+            img = img.convert('RGB')
+            img.thumbnail((size, size))
+            img.save(out, 'JPEG', quality=85, optimize=True)
+        created[size] = os.path.getsize(out)
+    return created
+
+
+class ImagePipeline:
+    """
+    directory / max_bytes: ImageCacheの設定
+    concurrency: 同時ダウンロード数（接続プールの大きさも同じ）
+    revalidate_after: この秒数以内に確認した画像は通信せずキャッシュを返す
+    sizes: 作成する縮小版の長辺ピクセル（要Pillow）
+    """
+
+    def __init__(self, directory: str = 'image_cache', max_bytes: int = 256 << 20, concurrency: int = 8,
+                 revalidate_after: float = 24 * 3600, sizes: Sequence[int] = (), session: Optional[Any] = None,
+                 timeout: float = 10, debug_mode: bool = False):
+        self.cache = ImageCache(directory, max_bytes)
+        self.concurrency = concurrency
+        self.revalidate_after = revalidate_after
+        self.sizes = tuple(sizes)
+        self.timeout = timeout
+        self.debug_mode = debug_mode
+        self._owns_session = session is None
+        self.session = session or create_session(pool_size=concurrency)
+        self.inflight = SingleFlight()
+        self._lock = threading.Lock()
+        self.counts = {DOWNLOADED: 0, NOT_MODIFIED: 0, CACHED: 0, FAILED: 0, 'deduplicated': 0, 'bytes': 0}
+        if self.sizes:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                warnings.warn('Pillowが見つからないため縮小版は作成しません（pip install Pillow）',
+                              RuntimeWarning, stacklevel=2)
+
+    def close(self) -> None:
+        self.cache.close()
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += n
+
+    def path_for(self, url: str, size: Optional[int] = None) -> Optional[str]:
+        """キャッシュ済み画像のパス（sizeを指定すると縮小版、無ければNone）"""
+        entry = self.cache.lookup(url)
+        if entry is None or (size is not None and size not in entry['variants']):
+            return None
+        return self.cache.blob_path(entry['hash'], size)
+
+    def fetch(self, url: str) -> ImageResult:
+        try:
+            return self.inflight.do(url, lambda: self._fetch(url))
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] image fetch error:', url, e)
+            self._count(FAILED)
+            return ImageResult(url, FAILED, error=repr(e))
+
+    def _fetch(self, url: str) -> ImageResult:
+        # 結果を返すまでの間に他スレッドのevictで削除されないよう参照中にしておく（新しく保存した画像も同様）
+        entry = self.cache.lookup(url, pin=True)
+        pinned = [entry['hash']] if entry is not None else []
+        try:
+            return self._fetch_entry(url, entry, pinned)
+        finally:
+            for digest in pinned:
+                self.cache.unpin(digest)
+
+    def _fetch_entry(self, url: str, entry: Optional[Dict[str, Any]], pinned: List[str]) -> ImageResult:
+        if entry is not None and time.time() - entry['checked_at'] < self.revalidate_after:
+            self.cache.touch(entry['hash'])
+            self._count(CACHED)
+            return self._result(url, CACHED, entry)
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as res:
+            if res.status_code == 304 and entry is not None:
+                self.cache.revalidated(url)
+                self.cache.touch(entry['hash'])
+                self._count(NOT_MODIFIED)
+                return self._result(url, NOT_MODIFIED, entry)
+            if not res.ok:
+                self._count(FAILED)
+                return ImageResult(url, FAILED, error=f'HTTP {res.status_code}')
+            digest = hashlib.sha256()
+            size = 0
+            tmp = self.cache.temp_file()
+            try:
+                with tmp:
+                    for chunk in res.iter_content(65536):
+                        digest.update(chunk)
+                        tmp.write(chunk)
+                        size += len(chunk)
+                        if size > self.cache.max_bytes:
+                            break
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+            if size > self.cache.max_bytes:
+                # キャッシュの上限を超える画像は保存しても直後のevictで消えるため保存しない
+                os.unlink(tmp.name)
+                self._count(FAILED)
+                return ImageResult(url, FAILED, error=f'too large: over max_bytes={self.cache.max_bytes}')
+            path, created = self.cache.store(url, tmp.name, digest.hexdigest(), size, res.headers.get('ETag'),
+                                             res.headers.get('Last-Modified'), res.headers.get('Content-Type'),
+                                             pin=True)
+            pinned.append(digest.hexdigest())
+        self._count(DOWNLOADED)
+        self._count('bytes', size)
+        if not created:
+            self._count('deduplicated')
+        if self.sizes:
+            try:
+                self.cache.add_variants(digest.hexdigest(), _resize_variants(path, digest.hexdigest(), self.cache, self.sizes))
+            except Exception as e:
+                if self.debug_mode:
+                    print('[DEBUG] image resize error:', url, e)
+        self.cache.evict()
+        return ImageResult(url, DOWNLOADED, digest.hexdigest(), path, size, res.headers.get('Content-Type'))
+
+    def _result(self, url: str, status: str, entry: Dict[str, Any]) -> ImageResult:
+        path = self.cache.blob_path(entry['hash'])
+        return ImageResult(url, status, entry['hash'], path, os.path.getsize(path), entry['content_type'])
+
+    def fetch_many(self, urls: Iterable[str]) -> List[ImageResult]:
+        """複数の画像を最大concurrency並列で取得する（結果はurlsと同じ順序）"""
+        urls = list(urls)
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(urls)))) as pool:
+            return list(pool.map(self.fetch, urls))
+
+    def fetch_video_images(self, api: Any, video_ids: List[str], detail_concurrency: int = 3) -> List[ImageResult]:
+        """動画詳細を取得し、各動画のimage_urlとthumbnailsをまとめて取得する"""
+        urls = []
+        for detail in api.get_video_details(video_ids, detail_concurrency):
+            if detail:
+                urls += [u for u in video_image_urls(detail) if u not in urls]
+        return self.fetch_many(urls)
+
+    def fetch_channel_images(self, api: Any, channel_ids: List[str]) -> List[ImageResult]:
+        """チャンネルのオーナー画像を取得する（画像URLが取れなかったチャンネルは含まない）"""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(channel_ids) or 1))) as pool:
+            urls = [u for u in pool.map(api.get_channel_owner_image, channel_ids) if u]
+        return self.fetch_many(urls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self.counts)
+        counts.update({f'cache_{k}': v for k, v in self.cache.stats().items()})
+        return counts
@@ -9,8 +9,49 @@ TypeScript版(index.ts)と完全にAPI・仕様・使い方を統一したPython
 - サムネイル・チャンネル画像取得、デバッグ出力も完全再現
 
 【インストール】
-- 必要パッケージ: requests, feedparser, beautifulsoup4
-  pip install requests feedparser beautifulsoup4
+- 必要パッケージ: requests
+  pip install requests
+- requests/urllib3は通信を行うとき（YoutubeRssApi・create_sessionの初回呼び出し）に読み込む。
+  parse_feed / parse_video_detail などの解析関数だけを使う場合は読み込まれない
+- RSS(Atom)フィードは標準ライブラリのXMLPullParserで逐次解析（feedparser不要）
+- 任意: brotli（インストールされていればbrotli圧縮を要求）
+
+【接続】
+- 全リクエストはインスタンスが持つ1つのrequests.Session（keep-alive・接続プール）を共有
+- YoutubeRssApi(pool_size=10, retries=3, backoff_factor=0.5, timeout=10) で調整可能
+- 既存のSessionを渡す場合: YoutubeRssApi(session=my_session)
+- 使い終わったら api.close()、または with YoutubeRssApi() as api: で利用
+
+【永続キャッシュ】
+- YoutubeRssApi(cache=PersistentCache('youtube_cache.db'))  ※store.py
+- @handle等→チャンネルID、チャンネル画像、内容が確定した動画詳細を保存し、再起動後も再利用
+- TTLは CACHE_TTL で名前空間ごとに設定（配信中・配信予定の動画は保存しない）
+
+【フィードキャッシュ】
+- RSSフィードはチャンネルごとにキャッシュされ、get_channel_name / get_latest_videos /
+  get_videos_with_paging / get_latest_video_info で共有される
+- feed_cache_ttl秒（既定60）以内は再取得せず、期限切れ後はIf-None-Match/If-Modified-Sinceで再検証
+- api.feed_cache_stats() で hits / misses / not_modified / entries を取得
+- feed_cache_ttl=0 で常に再検証（304なら再パースなし）
+
+【計測】
+- hooks=[callable] / api.add_hook(callable) で取得処理（feed / video_detail / live_status / channel_page）ごとの
+  Spanを受け取れる: 段階別の秒数(connect / first_byte / body / parse / extract)、受信バイト数、HTTPステータス、
+  リトライ回数、キャッシュ利用(hit / not_modified)、失敗分類(timeout / connection / http_4xx / http_5xx / parse / no_match / other)
+- connectは create_session（InstrumentedAdapter）のSessionのみ計測（独自Sessionではfirst_byteに含まれる）
+- metrics.MetricsCollector をフックに渡すとメモリ上でPrometheus形式に集計できる
+- フック未登録時は計測を行わない
+
+【同時リクエストの集約】
+- フィード・動画詳細・ライブ状態・オーナー画像・チャンネルID解決は、同じ(処理, ID)の取得が実行中なら
+  新たに通信せず実行中の結果を共有する（スレッド・asyncioの両方。プロセス内のみ）
+- api.inflight_stats() で flights / coalesced（相乗りした呼び出し数）/ in_flight を取得、coalesce=Falseで無効
+
+【動画履歴】
+- history=history.VideoHistory('youtube_history.db') を渡すと、取得したフィード（最新15件前後）を
+  チャンネルごとに蓄積し、動画詳細で判明した種別・ライブ状態も反映する
+- get_video_history(channel_id, cursor, limit, type, live_status): 蓄積した履歴をカーソルでページング
+- get_videos_with_paging も履歴がある場合は履歴からページングする（15件を超える範囲も取得できる）
 
 【使い方例】
 from youtube.index import YoutubeRssApi, YoutubeLiveStatus, YoutubeVideoType
@@ -32,6 +73,10 @@ print(video_detail)
 owner_img = api.get_channel_owner_image(channel_id)
 print(owner_img)
 
+# チャンネルID・名前・画像をまとめて（チャンネルページ1回の部分取得）
+info = api.get_channel_info('https://www.youtube.com/@GoogleJapan')
+print(info.channel_id, info.name, info.owner_image)
+
 # バージョン
 print(YoutubeRssApi.version)
 
@@ -40,15 +85,40 @@ print(YoutubeRssApi.version)
 - YoutubeVideoType: Enum('normal', 'shorts', 'liveContents', 'isLive', 'unknown')
 - YoutubeVideoInfo: video_id, title, author, published, url, live_status, type
 - YoutubeVideoDetail: (上記+description, thumbnails, image_url)
-- YoutubeRssApi: extract_channel_id, get_channel_name, get_latest_videos, get_video_detail, get_channel_owner_image, get_latest_videos_with_details, version
+  - __slots__で軽量化、==はフィールド値で比較、hashはvideo_id
+  - to_dict / from_dict / to_json / from_json、dump_jsonl / load_jsonl
+- YoutubeRssApi: extract_channel_id, get_channel_info, get_channel_name, get_latest_videos, fetch_latest_videos, iter_latest_videos, get_video_history, get_live_status, get_live_statuses, get_video_detail, get_video_details, get_channel_owner_image, get_latest_videos_with_details, version
+- parse_video_detail(html, video_id) / parse_live_status(html): watchページHTMLの解析のみ（通信なし）
+- get_live_status / get_live_statuses: 確定済みの状態（永続キャッシュ・履歴）は通信せず返し、それ以外はoEmbedで存在を確認してから
+  watchページを逐次読み、ライブ状態が確定した時点で打ち切る（LiveStatusProbe。上限 LIVE_PROBE_MAX_BYTES）
+- get_channel_info(url): チャンネルページ1回の部分取得でYoutubeChannelInfo(channel_id, name, owner_image)を返す
+  （extract_channel_id / get_channel_owner_imageも目的の項目が見つかった時点で読み込みを打ち切る）
+- AsyncYoutubeRssApi (async_index.py): 上記YoutubeRssApiと同じメソッドをasyncioコルーチンで提供
+- ChannelMonitor (monitor.py): 多チャンネルの定期監視と新着・配信開始・配信終了イベント通知
+- export.py: チャンネル一覧（ファイル/標準入力）の最新動画をプロセスプールで並列取得しJSON Linesで書き出すCLI
+- YoutubeDetailFailure: video_id, error（get_video_details / get_latest_videos_with_details の on_error に渡される）
 
 """
 
+from __future__ import annotations
+
+import json
 import re
-import requests
-import feedparser
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+import copy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import ContextVar
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from html import unescape
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
 
 class YoutubeLiveStatus(str, Enum):
     NONE = 'none'
@@ -63,21 +133,64 @@ class YoutubeVideoType(str, Enum):
     ISLIVE = 'isLive'
     UNKNOWN = 'unknown'
 
+def _enum_value(value: Optional[Enum]) -> Optional[str]:
+    return value.value if value is not None else None
+
 class YoutubeVideoInfo:
+    # __slots__で__dict__を持たない（大量保持時のメモリ削減）。等価性はフィールド値、ハッシュはvideo_id
+    # authorは同じチャンネルの動画で同じ値が繰り返されるためinternして1つの文字列を共有する
+    __slots__ = ('video_id', 'title', 'author', 'published', 'url', 'live_status', 'type')
+    _fields: Tuple[str, ...] = __slots__
+
     def __init__(self, video_id: str, title: str, author: str, published: str, url: str,
                  live_status: Optional[YoutubeLiveStatus] = None,
                  type: Optional[YoutubeVideoType] = None):
         self.video_id = video_id
         self.title = title
-        self.author = author
+        self.author = sys.intern(author) if author.__class__ is str else author
         self.published = published
         self.url = url
         self.live_status = live_status
         self.type = type
     def __repr__(self):
         return f"<YoutubeVideoInfo {self.video_id} {self.title} {self.type} {self.live_status}>"
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._fields)
+    def __hash__(self):
+        return hash(self.video_id)
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'video_id': self.video_id,
+            'title': self.title,
+            'author': self.author,
+            'published': self.published,
+            'url': self.url,
+            'live_status': _enum_value(self.live_status),
+            'type': _enum_value(self.type),
+        }
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'YoutubeVideoInfo':
+        kwargs = {f: d.get(f) for f in cls._fields}
+        for f in ('video_id', 'title', 'author', 'published', 'url'):
+            if kwargs[f] is None:
+                kwargs[f] = ''
+        if kwargs['live_status']:
+            kwargs['live_status'] = YoutubeLiveStatus(kwargs['live_status'])
+        if kwargs['type']:
+            kwargs['type'] = YoutubeVideoType(kwargs['type'])
+        return cls(**kwargs)
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+    @classmethod
+    def from_json(cls, s: str) -> 'YoutubeVideoInfo':
+        return cls.from_dict(json.loads(s))
 
 class YoutubeVideoDetail(YoutubeVideoInfo):
+    __slots__ = ('description', 'thumbnails', 'image_url')
+    _fields = YoutubeVideoInfo._fields + __slots__
+
     def __init__(self, video_id: str, title: str, author: str, published: str, url: str,
                  description: Optional[str] = None, thumbnails: Optional[List[str]] = None,
                  image_url: Optional[str] = None, live_status: Optional[YoutubeLiveStatus] = None,
@@ -88,117 +201,1272 @@ class YoutubeVideoDetail(YoutubeVideoInfo):
         self.image_url = image_url
     def __repr__(self):
         return f"<YoutubeVideoDetail {self.video_id} {self.title} {self.type} {self.live_status} {self.image_url}>"
+    def __copy__(self):
+        # thumbnailsも複製する（copy.copyした結果同士でリストを共有しない）
+        other = object.__new__(type(self))
+        for f in self._fields:
+            setattr(other, f, getattr(self, f))
+        other.thumbnails = list(self.thumbnails)
+        return other
+    def to_dict(self) -> Dict[str, Any]:
+        d = super().to_dict()
+        d['description'] = self.description
+        d['thumbnails'] = list(self.thumbnails)
+        d['image_url'] = self.image_url
+        return d
+
+def dump_jsonl(records: Iterable[YoutubeVideoInfo], fp: IO[str]) -> int:
+    """レコードをJSON Lines形式で書き出し、件数を返す"""
+    count = 0
+    for record in records:
+        fp.write(record.to_json())
+        fp.write('\n')
+        count += 1
+    return count
+
+def load_jsonl(fp: IO[str], cls: Optional[type] = None) -> Iterator[YoutubeVideoInfo]:
+    """JSON Linesを1行ずつ読み込む。clsを省略した場合はdescriptionの有無で型を判定"""
+    for line in fp:
+        if not line.strip():
+            continue
+        d = json.loads(line)
+        record_cls = cls or (YoutubeVideoDetail if 'description' in d else YoutubeVideoInfo)
+        yield record_cls.from_dict(d)
+
+class YoutubeApiError(Exception):
+    pass
+
+class YoutubeDetailFailure:
+    def __init__(self, video_id: str, error: Exception):
+        self.video_id = video_id
+        self.error = error
+    def __repr__(self):
+        return f"<YoutubeDetailFailure {self.video_id} {self.error!r}>"
+
+_PLAYER_RESPONSE_MARKERS = ('ytInitialPlayerResponse = {', 'ytInitialPlayerResponse={')
+_PLAYER_RESPONSE_RE = re.compile(r'ytInitialPlayerResponse"?\]?\s*=\s*\{')
+_SHORTS_RE = re.compile(r'"(?:canonicalUrl|shortsUrl)":"https://www\.youtube\.com/shorts/')
+_TITLE_RE = re.compile(r'<title>(.*?)</title>')
+_LIVE_KEYWORD_RE = re.compile(r'ライブ|配信|生放送|live', re.I)
+_json_decoder = json.JSONDecoder()
+
+def extract_player_response(html: str) -> Optional[Dict[str, Any]]:
+    """
+    watchページからytInitialPlayerResponseのJSONだけを切り出してパースする。
+    raw_decodeでオブジェクトの終端までしか読まないため、ページ全体はパースしない。
+    """
+    start = -1
+    for marker in _PLAYER_RESPONSE_MARKERS:
+        pos = html.find(marker)
+        if pos != -1:
+            start = pos + len(marker) - 1
+            break
+    if start == -1:
+        m = _PLAYER_RESPONSE_RE.search(html)
+        if not m:
+            return None
+        start = m.end() - 1
+    try:
+        data, _ = _json_decoder.raw_decode(html, start)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def extract_watch_fields(html: str, url: str = '') -> Dict[str, Any]:
+    """
+    watchページから動画情報の各フィールドを1回の抽出で取り出す。
+    ytInitialPlayerResponseが見つからない場合は<title>のみのフォールバック。
+    """
+    player = extract_player_response(html)
+    if player is None:
+        m = _TITLE_RE.search(html)
+        return {
+            'found': False,
+            'title': m.group(1).replace(' - YouTube', '') if m else '',
+            'author': '',
+            'description': '',
+            'published': '',
+            'thumbnails': [],
+            'is_shorts': '/shorts/' in url,
+            'is_live_content': None,
+            'is_live': None,
+            'is_upcoming': None,
+            'live_broadcast_details': None,
+        }
+    details = player.get('videoDetails') or {}
+    micro = (player.get('microformat') or {}).get('playerMicroformatRenderer') or {}
+    thumbnails: List[str] = []
+    for source in (micro.get('thumbnail'), details.get('thumbnail')):
+        for t in (source or {}).get('thumbnails') or []:
+            t_url = t.get('url')
+            if t_url and t_url not in thumbnails:
+                thumbnails.append(t_url)
+    canonical = micro.get('canonicalUrl') or ''
+    is_shorts = '/shorts/' in url or '/shorts/' in canonical
+    if not is_shorts:
+        # Shortsの目印はplayer response外にあるため、ここだけはページを走査する
+        is_shorts = _SHORTS_RE.search(html) is not None
+    lbd = micro.get('liveBroadcastDetails')
+    live_broadcast_details = None
+    if isinstance(lbd, dict):
+        live_broadcast_details = {
+            'isLiveNow': lbd.get('isLiveNow'),
+            'startTimestamp': lbd.get('startTimestamp'),
+            'endTimestamp': lbd.get('endTimestamp'),
+        }
+    is_live_content = details.get('isLiveContent')
+    if is_live_content is None:
+        is_live_content = micro.get('isLiveContent')
+    return {
+        'found': True,
+        'title': details.get('title') or (micro.get('title') or {}).get('simpleText') or '',
+        'author': details.get('author') or micro.get('ownerChannelName') or '',
+        'description': details.get('shortDescription') or (micro.get('description') or {}).get('simpleText') or '',
+        'published': micro.get('publishDate') or micro.get('uploadDate') or '',
+        'thumbnails': thumbnails,
+        'is_shorts': is_shorts,
+        'is_live_content': is_live_content if isinstance(is_live_content, bool) else None,
+        'is_live': details.get('isLive'),
+        'is_upcoming': details.get('isUpcoming'),
+        'live_broadcast_details': live_broadcast_details,
+    }
+
+def classify_video(fields: Dict[str, Any]) -> Tuple[YoutubeVideoType, YoutubeLiveStatus]:
+    live_broadcast_details = fields['live_broadcast_details'] or {}
+    is_live_content = fields['is_live_content']
+    # type判定
+    if fields['is_shorts']:
+        type_ = YoutubeVideoType.SHORTS
+    elif is_live_content is True or (is_live_content is None and fields['live_broadcast_details'] is not None):
+        if live_broadcast_details.get('isLiveNow') is True:
+            type_ = YoutubeVideoType.ISLIVE
+        else:
+            type_ = YoutubeVideoType.LIVECONTENTS
+    elif is_live_content is False:
+        type_ = YoutubeVideoType.NORMAL
+    elif _LIVE_KEYWORD_RE.search(fields['title']) or _LIVE_KEYWORD_RE.search(fields['description']):
+        type_ = YoutubeVideoType.LIVECONTENTS
+    else:
+        type_ = YoutubeVideoType.NORMAL
+    # liveStatus
+    if live_broadcast_details.get('isLiveNow') is True:
+        live_status = YoutubeLiveStatus.LIVE
+    elif live_broadcast_details.get('isLiveNow') is False:
+        if live_broadcast_details.get('endTimestamp'):
+            live_status = YoutubeLiveStatus.ENDED
+        else:
+            live_status = YoutubeLiveStatus.UPCOMING
+    elif type_ == YoutubeVideoType.LIVECONTENTS:
+        live_status = YoutubeLiveStatus.UPCOMING
+    else:
+        live_status = YoutubeLiveStatus.NONE
+    return type_, live_status
+
+def parse_video_detail(html: str, video_id: str, url: Optional[str] = None, debug_mode: bool = False) -> YoutubeVideoDetail:
+    url = url or f'https://www.youtube.com/watch?v={video_id}'
+    fields = extract_watch_fields(html, url)
+    type_, live_status = classify_video(fields)
+    if debug_mode:
+        print('[DEBUG] isLiveContent:', fields['is_live_content'])
+        print('[DEBUG] liveBroadcastDetails:', fields['live_broadcast_details'] or {})
+        print('[DEBUG] type:', type_)
+        print('[DEBUG] liveStatus:', live_status)
+    thumbnails = fields['thumbnails']
+    return YoutubeVideoDetail(
+        video_id=video_id,
+        title=fields['title'],
+        author=fields['author'],
+        published=fields['published'],
+        url=url,
+        description=fields['description'],
+        thumbnails=thumbnails,
+        image_url=thumbnails[0] if thumbnails else f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg',
+        type=type_,
+        live_status=live_status,
+    )
+
+def parse_live_status(html: str) -> YoutubeLiveStatus:
+    player = extract_player_response(html)
+    if player is None:
+        # player responseが無いページは従来どおり文字列の有無で判定
+        if '"isLive":true' in html or '"liveBroadcastContent":"live"' in html:
+            return YoutubeLiveStatus.LIVE
+        if '"liveBroadcastContent":"upcoming"' in html or '"isUpcoming":true' in html:
+            return YoutubeLiveStatus.UPCOMING
+        if '"ended":true' in html:
+            return YoutubeLiveStatus.ENDED
+        return YoutubeLiveStatus.NONE
+    details = player.get('videoDetails') or {}
+    micro = (player.get('microformat') or {}).get('playerMicroformatRenderer') or {}
+    lbd = micro.get('liveBroadcastDetails') or {}
+    if details.get('isLive') is True or lbd.get('isLiveNow') is True:
+        return YoutubeLiveStatus.LIVE
+    if details.get('isUpcoming') is True:
+        return YoutubeLiveStatus.UPCOMING
+    if lbd.get('endTimestamp'):
+        return YoutubeLiveStatus.ENDED
+    return YoutubeLiveStatus.NONE
+
+_PROBE_PLAYER_RE = re.compile(rb'ytInitialPlayerResponse"?\]?\s*=\s*\{')
+_PROBE_INITIAL_DATA_RE = re.compile(rb'ytInitialData"?\]?\s*=\s*\{')
+_PROBE_LIVE_RE = re.compile(rb'"(?:isLive|isLiveNow)"\s*:\s*true')
+_PROBE_UPCOMING_RE = re.compile(rb'"isUpcoming"\s*:\s*true')
+_PROBE_ENDED_RE = re.compile(rb'"endTimestamp"\s*:\s*"')
+_PROBE_LIVE_CONTENT_RE = re.compile(rb'"isLiveContent"\s*:\s*(true|false)')
+_PROBE_DETAILS_RE = re.compile(rb'"videoDetails"\s*:')
+# player response内でvideoDetailsの後に続くトップレベルのキー（videoDetailsを読み終えた目印）
+_PROBE_AFTER_DETAILS_RE = re.compile(rb'"(?:annotations|playerConfig|storyboards|microformat)"\s*:')
+# チャンク境界をまたぐ目印を見落とさないよう、前チャンクの末尾をこのバイト数だけ持ち越す
+_PROBE_OVERLAP = 64
+# get_live_status(es)で逐次読みする上限バイト数の既定値（超えても確定しないページのみ全体を取得し直す）
+LIVE_PROBE_MAX_BYTES = 1 << 20
+# oEmbedがこれらを返す動画は存在しない（削除済み・不正なID）ため、watchページを取得しない
+_OEMBED_MISSING = (400, 404)
+
+class LiveStatusProbe:
+    """
+    watchページを先頭からチャンク単位で受け取り、ライブ状態が確定した時点で結果を返す。
+    ytInitialPlayerResponse内の isLive / isUpcoming / isLiveNow / endTimestamp / isLiveContent を順に探し、
+    isLiveContent:false のvideoDetailsを読み終えた段階で通常の動画と判断する（ページの残りは読まない）。
+    判定はparse_live_statusと同じ優先順位（live > upcoming > ended > none）。
+    ※ player responseより前（head内のスクリプト等）は逐次取得では飛ばせないため、
+      読み込み量の削減はページ後半（ytInitialData以降）を読まない分が上限になる。
+    """
+    def __init__(self):
+        self._tail = b''
+        self._head: Optional[List[bytes]] = []
+        self._live_content: Optional[bool] = None
+        self._details = False
+        self._details_done = False
+        self.bytes_read = 0
+        self.status: Optional[YoutubeLiveStatus] = None
+
+    @property
+    def in_player(self) -> bool:
+        return self._head is None
+
+    def feed(self, chunk: bytes) -> Optional[YoutubeLiveStatus]:
+        if self.status is not None:
+            return self.status
+        self.bytes_read += len(chunk)
+        window = self._tail + chunk
+        if self._head is not None:
+            m = _PROBE_PLAYER_RE.search(window)
+            if not m:
+                # player responseが無いページに備えて、見つかるまでは本文を保持する
+                self._head.append(chunk)
+                self._tail = window[-_PROBE_OVERLAP:]
+                return None
+            self._head = None
+            window = window[m.start():]
+        m = _PROBE_INITIAL_DATA_RE.search(window)
+        if m:
+            # player responseの後ろ（関連動画など）の目印は対象外
+            window = window[:m.start()]
+        self.status = self._classify(window)
+        if self.status is None and m:
+            self.status = YoutubeLiveStatus.NONE
+        self._tail = window[-_PROBE_OVERLAP:]
+        return self.status
+
+    def _classify(self, window: bytes) -> Optional[YoutubeLiveStatus]:
+        if _PROBE_LIVE_RE.search(window):
+            return YoutubeLiveStatus.LIVE
+        if _PROBE_UPCOMING_RE.search(window):
+            return YoutubeLiveStatus.UPCOMING
+        if _PROBE_ENDED_RE.search(window):
+            return YoutubeLiveStatus.ENDED
+        m = _PROBE_LIVE_CONTENT_RE.search(window)
+        if m:
+            self._live_content = m.group(1) == b'true'
+        after = window
+        if not self._details:
+            d = _PROBE_DETAILS_RE.search(window)
+            self._details = d is not None
+            after = window[d.end():] if d else b''
+        if not self._details_done and _PROBE_AFTER_DETAILS_RE.search(after):
+            self._details_done = True
+        # isLive・isUpcomingはvideoDetails内、isLiveNow・endTimestampはライブ作品のみにあるため、
+        # videoDetailsを読み終えてライブ作品でなければ確定（microformat以降は読まない）
+        if self._details_done and self._live_content is False:
+            return YoutubeLiveStatus.NONE
+        return None
+
+    def close(self) -> Optional[YoutubeLiveStatus]:
+        """ページ末尾まで読んでも確定しなかった場合の判定"""
+        if self.status is None:
+            if self._head is not None:
+                # player responseが無いページは全文の文字列判定にフォールバック
+                self.status = parse_live_status(b''.join(self._head).decode('utf-8', errors='replace'))
+            else:
+                self.status = YoutubeLiveStatus.NONE
+        return self.status
+
+_CHANNEL_URL_PATTERNS = [
+    ('channel/', re.compile(r"youtube\.com\/channel\/([a-zA-Z0-9_-]+)")),
+    ('c/', re.compile(r"youtube\.com\/c\/([a-zA-Z0-9_-]+)")),
+    ('user/', re.compile(r"youtube\.com\/user\/([a-zA-Z0-9_-]+)")),
+    ('@', re.compile(r"youtube\.com\/@([a-zA-Z0-9_-]+)")),
+]
+_CHANNEL_ID_RE = re.compile(r'"channelId":"(UC[^"]+)"')
+_OG_URL_RE = re.compile(r'<meta property="og:url" content="https://www.youtube.com/channel/(UC[^"]+)">')
+_OG_IMAGE_RE = re.compile(r'<meta property="og:image" content="([^"]+)"')
+
+def feed_url(channel_id: str) -> str:
+    return f'https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}'
+
+def oembed_url(video_id: str) -> str:
+    # url=はエスケープしない（aiohttpがクエリを正規化して送るため、requestsと同じURLになるように）
+    return f'https://www.youtube.com/oembed?format=json&url=https://www.youtube.com/watch?v={video_id}'
+
+def parse_channel_url(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    チャンネルURLを解析し (channel_id, HTMLでの解決に使うキー) を返す。
+    /channel/UC... はそのままID、@handle・/c/・/user/ は '@handle' のようなキーを返す。
+    """
+    for prefix, pat in _CHANNEL_URL_PATTERNS:
+        m = pat.search(url)
+        if m:
+            if m.group(1).startswith('UC'):
+                return m.group(1), None
+            return None, prefix + m.group(1)
+    return None, None
+
+def parse_channel_id_html(html: str) -> Optional[str]:
+    m = _CHANNEL_ID_RE.search(html) or _OG_URL_RE.search(html)
+    return m.group(1) if m else None
+
+def parse_owner_image(html: str) -> Optional[str]:
+    m = _OG_IMAGE_RE.search(html)
+    return m.group(1) if m else None
+
+class YoutubeChannelInfo:
+    __slots__ = ('channel_id', 'name', 'owner_image')
+
+    def __init__(self, channel_id: Optional[str], name: Optional[str] = None, owner_image: Optional[str] = None):
+        self.channel_id = channel_id
+        self.name = name
+        self.owner_image = owner_image
+    def __repr__(self):
+        return f"<YoutubeChannelInfo {self.channel_id} {self.name} {self.owner_image}>"
+    def to_dict(self) -> Dict[str, Any]:
+        return {'channel_id': self.channel_id, 'name': self.name, 'owner_image': self.owner_image}
+
+# チャンネルページの項目ごとの目印（先に現れた方を採用）。いずれも実ページでは先頭数KBに現れる
+_CHANNEL_PAGE_PATTERNS: Dict[str, List[Any]] = {
+    'channel_id': [re.compile(_CHANNEL_ID_RE.pattern.encode()), re.compile(_OG_URL_RE.pattern.encode())],
+    'name': [re.compile(rb'<meta property="og:title" content="([^"]*)"'),
+             re.compile(rb'"channelMetadataRenderer":\{"title":"((?:[^"\\]|\\.)*)"')],
+    'owner_image': [re.compile(_OG_IMAGE_RE.pattern.encode())],
+}
+# チャンク境界をまたぐ一致を拾うため前チャンクの末尾を持ち越すバイト数（最長の一致より長くする）
+_SCAN_OVERLAP = 2048
+
+def _decode_channel_field(name: str, raw: bytes, pattern_index: int) -> str:
+    text = raw.decode('utf-8', errors='replace')
+    if name == 'name' and pattern_index == 1:
+        # ytInitialData内のJSON文字列
+        return json.loads('"' + text + '"')
+    return unescape(text)
+
+class ChannelPageScanner:
+    """
+    チャンネルページを先頭からチャンク単位で受け取り、指定した項目（channel_id / name / owner_image）が
+    すべて見つかった時点で完了する。一致がチャンク境界をまたいでも見落とさないよう末尾を持ち越して探す。
+    """
+    def __init__(self, fields: Iterable[str] = ('channel_id', 'name', 'owner_image')):
+        self.pending = [f for f in fields if f in _CHANNEL_PAGE_PATTERNS]
+        self.values: Dict[str, str] = {}
+        self.bytes_read = 0
+        self._tail = b''
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def feed(self, chunk: bytes) -> bool:
+        if not self.pending:
+            return True
+        self.bytes_read += len(chunk)
+        window = self._tail + chunk
+        for name in list(self.pending):
+            best = None
+            for i, pat in enumerate(_CHANNEL_PAGE_PATTERNS[name]):
+                m = pat.search(window)
+                if m and (best is None or m.start() < best[0].start()):
+                    best = (m, i)
+            if best:
+                self.values[name] = _decode_channel_field(name, best[0].group(1), best[1])
+                self.pending.remove(name)
+        self._tail = window[-_SCAN_OVERLAP:]
+        return not self.pending
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_YT = '{http://www.youtube.com/xml/schemas/2015}'
+
+class YoutubeFeed:
+    __slots__ = ('title', 'channel_id', 'videos')
+
+    def __init__(self, title: Optional[str] = None, channel_id: Optional[str] = None,
+                 videos: Optional[List[YoutubeVideoInfo]] = None):
+        self.title = title
+        self.channel_id = channel_id
+        self.videos = videos or []
+    def __repr__(self):
+        return f"<YoutubeFeed {self.channel_id} {self.title} {len(self.videos)} videos>"
+
+class FeedStreamParser:
+    """
+    YouTubeのAtomフィード(yt:videoId形式)専用の逐次パーサー。
+    feed()にバイト列を渡すたびに、完成した<entry>をYoutubeVideoInfoとして返す。
+    解析済みのentry要素は都度破棄するため、メモリはフィードの長さに依存しない。
+    """
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._depth = 0
+        self._root: Optional[ET.Element] = None
+        self.title: Optional[str] = None
+        self.channel_id: Optional[str] = None
+
+    def feed(self, data: bytes) -> List[YoutubeVideoInfo]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> List[YoutubeVideoInfo]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[YoutubeVideoInfo]:
+        videos = []
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._depth == 0:
+                    self._root = elem
+                self._depth += 1
+                continue
+            self._depth -= 1
+            if self._depth != 1:
+                continue
+            # <feed>直下の要素
+            tag = elem.tag
+            if tag == _ATOM + 'entry':
+                videos.append(self._entry(elem))
+                self._root.remove(elem)
+            elif tag == _ATOM + 'title':
+                self.title = elem.text or ''
+            elif tag == _YT + 'channelId':
+                self.channel_id = elem.text
+        return videos
+
+    @staticmethod
+    def _entry(elem: ET.Element) -> YoutubeVideoInfo:
+        url = ''
+        for link in elem.iter(_ATOM + 'link'):
+            if link.get('rel', 'alternate') == 'alternate':
+                url = link.get('href', '')
+                break
+        return YoutubeVideoInfo(
+            video_id=elem.findtext(_YT + 'videoId', ''),
+            title=elem.findtext(_ATOM + 'title', ''),
+            author=elem.findtext(_ATOM + 'author/' + _ATOM + 'name', ''),
+            published=elem.findtext(_ATOM + 'published', ''),
+            url=url,
+            type=YoutubeVideoType.SHORTS if '/shorts/' in url else YoutubeVideoType.NORMAL,
+        )
+
+def iter_feed_videos(chunks: Iterable[bytes], stop_at: Optional[str] = None,
+                     parser: Optional[FeedStreamParser] = None) -> Iterator[YoutubeVideoInfo]:
+    """
+    バイト列のチャンクを逐次解析して動画を順に返す。
+    stop_atのvideo_idに到達したら（その動画は返さずに）読み込みを打ち切る。
+    """
+    parser = parser or FeedStreamParser()
+    for chunk in chunks:
+        for video in parser.feed(chunk):
+            if stop_at is not None and video.video_id == stop_at:
+                return
+            yield video
+    yield from _take_until(parser.close(), stop_at)
+
+def _take_until(videos: Iterable[YoutubeVideoInfo], stop_at: Optional[str]) -> Iterator[YoutubeVideoInfo]:
+    for video in videos:
+        if stop_at is not None and video.video_id == stop_at:
+            return
+        yield video
+
+def _feed_until(feed: YoutubeFeed, stop_at: str) -> YoutubeFeed:
+    return YoutubeFeed(feed.title, feed.channel_id, list(_take_until(feed.videos, stop_at)))
+
+def parse_feed(content: bytes) -> YoutubeFeed:
+    parser = FeedStreamParser()
+    videos = list(iter_feed_videos((content,), parser=parser))
+    return YoutubeFeed(parser.title, parser.channel_id, videos)
+
+def feed_title(feed: YoutubeFeed) -> Optional[str]:
+    return feed.title
+
+def feed_videos(feed: YoutubeFeed) -> List[YoutubeVideoInfo]:
+    # キャッシュ上の結果を呼び出し側の変更（live_status設定等）から守るため複製して返す
+    return [copy.copy(v) for v in feed.videos]
+
+# 永続キャッシュ(store.PersistentCache等)の名前空間ごとのTTL秒（Noneは無期限）
+CACHE_TTL: Dict[str, Optional[float]] = {
+    'channel_id': None,
+    'owner_image': 7 * 24 * 3600,
+    'video_detail': 30 * 24 * 3600,
+}
+
+def is_immutable_detail(detail: YoutubeVideoDetail) -> bool:
+    """配信中・配信予定ではなく、今後内容が変わらない動画か"""
+    return detail.live_status in (YoutubeLiveStatus.NONE, YoutubeLiveStatus.ENDED) and \
+        detail.type in (YoutubeVideoType.NORMAL, YoutubeVideoType.SHORTS, YoutubeVideoType.LIVECONTENTS)
+
+def paginate_videos(videos: List[YoutubeVideoInfo], page: int, page_size: int) -> Dict[str, Any]:
+    start = (page - 1) * page_size
+    return {
+        'videos': videos[start:start + page_size],
+        'page': page,
+        'page_size': page_size,
+        'total': len(videos),
+    }
+
+class Span:
+    """
+    1回の取得処理（feed / video_detail / live_status / channel_page）の計測結果。
+    stagesは段階ごとの秒数: connect（DNS+TCP+TLS、新規接続時のみ）/ first_byte / body / parse / extract
+    errorは失敗分類（timeout / connection / http_4xx / http_5xx / parse / no_match / other）、成功時はNone
+    """
+    __slots__ = ('op', 'key', 'started', 'duration', 'stages', 'bytes', 'status', 'retries', 'cache',
+                 'error', 'error_detail', '_responses', '_token')
+
+    def __init__(self, op: str, key: Optional[str] = None):
+        self.op = op
+        self.key = key
+        self.started = time.time()
+        self.duration = 0.0
+        self.stages: Dict[str, float] = {}
+        self.bytes = 0
+        self.status: Optional[int] = None
+        self.retries = 0
+        self.cache: Optional[str] = None
+        self.error: Optional[str] = None
+        self.error_detail: Optional[str] = None
+        self._responses: List[Any] = []
+        self._token = None
+
+    def __repr__(self):
+        stages = ' '.join(f'{k}={v * 1000:.1f}ms' for k, v in self.stages.items())
+        return (f"<Span {self.op} {self.key} {self.duration * 1000:.1f}ms {stages} bytes={self.bytes} "
+                f"status={self.status} retries={self.retries} cache={self.cache} error={self.error}>")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def timed(self, stage: str) -> '_StageTimer':
+        return _StageTimer(self, stage)
+
+    def fail(self, reason: str, detail: Any = None) -> None:
+        if self.error is None:
+            self.error = reason
+            self.error_detail = None if detail is None else str(detail)
+
+    def record_response(self, res: Any, seconds: float, connect: float = 0.0) -> None:
+        """ヘッダー受信までの時間を記録する（新規接続時はconnectを差し引いてfirst_byteとする）"""
+        self.status = res.status_code
+        self.add('first_byte', max(seconds - connect, 0.0))
+        retries = getattr(res.raw, 'retries', None)
+        if retries is not None:
+            self.retries += len(retries.history)
+        self._responses.append(res)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'op': self.op, 'key': self.key, 'started': self.started, 'duration': self.duration,
+                'stages': dict(self.stages), 'bytes': self.bytes, 'status': self.status,
+                'retries': self.retries, 'cache': self.cache, 'error': self.error,
+                'error_detail': self.error_detail}
+
+    def _finish(self, duration: float) -> None:
+        self.duration = duration
+        for res in self._responses:
+            # 圧縮されたまま受信したバイト数（取得できないアダプタでは展開後の長さ）
+            tell = getattr(res.raw, 'tell', None)
+            try:
+                self.bytes += tell() if tell else len(res.content)
+            except Exception:
+                pass
+        self._responses = []
+        if self.error is None and self.status is not None and self.status >= 400:
+            self.error = f'http_{self.status // 100}xx'
+
+class _StageTimer:
+    __slots__ = ('span', 'stage', 't0')
+
+    def __init__(self, span: Span, stage: str):
+        self.span = span
+        self.stage = stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self.span
+
+    def __exit__(self, *exc):
+        self.span.add(self.stage, time.perf_counter() - self.t0)
+        return False
+
+# 実行中のSpan（スレッド・asyncioタスクごとに独立）。フック未登録時はNoneのまま
+_current_span: ContextVar[Optional[Span]] = ContextVar('youtube_span', default=None)
+
+# 例外 -> 失敗分類。requestsの例外は_requests()が、aiohttpの例外はasync_index.pyが先頭に追加する
+FAILURE_TYPES: List[Tuple[type, str]] = [
+    (TimeoutError, 'timeout'),
+    (ConnectionError, 'connection'),
+    (ValueError, 'parse'),
+    (ET.ParseError, 'parse'),
+]
+
+def classify_failure(error: BaseException, status: Optional[int] = None) -> str:
+    for cls, reason in FAILURE_TYPES:
+        if isinstance(error, cls):
+            return reason
+    if status is not None and status >= 400:
+        return f'http_{status // 100}xx'
+    return 'other'
+
+def _stage(name: str):
+    span = _current_span.get()
+    return span.timed(name) if span is not None else nullcontext()
+
+def _fail(reason: str, detail: Any = None) -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.fail(reason, detail)
+
+class _SpanScope:
+    """with文の間だけSpanを現在のSpanにし、終了時に失敗を分類してフックへ渡す"""
+    __slots__ = ('span', 'hooks', 't0', 'debug_mode')
+
+    def __init__(self, span: Span, hooks: List[Callable[[Span], None]], debug_mode: bool = False):
+        self.span = span
+        self.hooks = hooks
+        self.debug_mode = debug_mode
+
+    def __enter__(self) -> Span:
+        self.span._token = _current_span.set(self.span)
+        self.t0 = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        if exc is not None:
+            span.fail(classify_failure(exc, span.status), repr(exc))
+        span._finish(time.perf_counter() - self.t0)
+        _current_span.reset(span._token)
+        for hook in self.hooks:
+            try:
+                hook(span)
+            except Exception as e:
+                if self.debug_mode:
+                    print('[DEBUG] metrics hook error:', e)
+        return False
+
+_requests_module = None
+_instrumented_adapter = None
+_lazy_import_lock = threading.Lock()
+
+def _requests():
+    """requestsを初回の通信時に読み込み、例外を失敗分類に登録する"""
+    global _requests_module
+    if _requests_module is None:
+        with _lazy_import_lock:
+            if _requests_module is None:
+                import requests
+                FAILURE_TYPES[:0] = [(requests.Timeout, 'timeout'), (requests.ConnectionError, 'connection')]
+                _requests_module = requests
+    return _requests_module
+
+def _instrumented_adapter_class() -> type:
+    global _instrumented_adapter
+    if _instrumented_adapter is not None:
+        return _instrumented_adapter
+    _requests()
+    with _lazy_import_lock:
+        if _instrumented_adapter is None:
+            _instrumented_adapter = _build_instrumented_adapter()
+    return _instrumented_adapter
+
+def _build_instrumented_adapter() -> type:
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _TimedConnectMixin:
+        # 新規接続（DNS解決・TCP接続・TLSハンドシェイク）の時間を現在のSpanのconnectに加算
+        def connect(self):
+            span = _current_span.get()
+            if span is None:
+                return super().connect()
+            t0 = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                span.add('connect', time.perf_counter() - t0)
+
+    class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+        pass
+
+    class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+        pass
+
+    class _TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = _TimedHTTPConnection
+
+    class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = _TimedHTTPSConnection
+
+    class InstrumentedAdapter(HTTPAdapter):
+        """接続確立の時間をSpanに記録するHTTPAdapter（Spanが無いときは通常のHTTPAdapterと同じ）"""
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                       'https': _TimedHTTPSConnectionPool}
+
+    InstrumentedAdapter.__module__ = __name__
+    InstrumentedAdapter.__qualname__ = 'InstrumentedAdapter'
+    return InstrumentedAdapter
+
+def __getattr__(name: str) -> Any:
+    # from index import InstrumentedAdapter はここで初めてrequests/urllib3を読み込む
+    if name == 'InstrumentedAdapter':
+        return _instrumented_adapter_class()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+def _accept_encoding() -> str:
+    # brotliはデコーダが入っている場合のみ要求する（urllib3が展開できないため）
+    for mod in ('brotli', 'brotlicffi'):
+        try:
+            __import__(mod)
+            return 'gzip, deflate, br'
+        except ImportError:
+            pass
+    return 'gzip, deflate'
+
+def create_session(pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    keep-aliveで接続を再利用するSessionを生成する。
+    接続エラー・429・5xxはbackoff_factorによる指数バックオフで最大retries回リトライ。
+    """
+    from urllib3.util.retry import Retry
+    session = _requests().Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = _instrumented_adapter_class()(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': _accept_encoding(),
+        'Accept-Language': 'ja,en-US;q=0.9,en;q=0.8',
+    })
+    return session
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    同じキーの取得が同時に走った場合、最初の呼び出しだけが実行し、後続はその完了を待って同じ結果（例外）を受け取る。
+    結果は保持しない（完了後の呼び出しは新たに実行する）。キャッシュではなく同時多発リクエストの重複排除用。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Any, _Flight] = {}
+        self.flights = 0
+        self.coalesced = 0
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.flights += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'flights': self.flights, 'coalesced': self.coalesced, 'in_flight': len(self._flights)}
+
+class FeedCache:
+    """
+    チャンネルごとのRSSフィードキャッシュ。
+    ttl秒以内はネットワークに出ず、期限切れ後はETag/Last-Modifiedで条件付きGETし、
+    304なら保存済みのパース結果をそのまま返す。max_entriesを超えると古い順に破棄。
+    """
+    def __init__(self, ttl: float = 60, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.monotonic() - entry['fetched_at'] < self.ttl
+
+    def put(self, key: str, feed: Any, etag: Optional[str], last_modified: Optional[str]) -> None:
+        with self._lock:
+            self._entries[key] = {
+                'feed': feed,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['fetched_at'] = time.monotonic()
+
+    def record(self, kind: str) -> None:
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'entries': len(self._entries),
+            }
 
 class YoutubeRssApi:
     version = '1.0.0'
-    def __init__(self, debug_mode: bool = False):
+    def __init__(self, debug_mode: bool = False, session: Optional[requests.Session] = None,
+                 pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                 timeout: float = 10, feed_cache_ttl: float = 60, feed_cache_size: int = 1024,
+                 cache: Optional[Any] = None, hooks: Optional[List[Callable[[Span], None]]] = None,
+                 coalesce: bool = True, history: Optional[Any] = None):
         self.debug_mode = debug_mode
+        # 永続キャッシュ（get/setを持つオブジェクト。store.PersistentCacheを想定）
+        self.cache = cache
+        # 動画履歴インデックス（merge/update_details/page/slice/countを持つオブジェクト。history.VideoHistoryを想定）
+        self.history = history
+        # 取得処理ごとのSpanを受け取るフック（metrics.MetricsCollectorなど）
+        self.hooks: List[Callable[[Span], None]] = list(hooks or [])
+        self.timeout = timeout
+        # feed・HTMLの全リクエストはこのSessionを共有する（requestsはここで初めて読み込む）
+        _requests()
+        self._owns_session = session is None
+        self.session = session or create_session(pool_size, retries, backoff_factor)
+        self.feed_cache = FeedCache(feed_cache_ttl, feed_cache_size)
+        # 同じ(処理, ID)の同時取得を1回にまとめる（coalesce=Falseで無効）
+        self.inflight = SingleFlight() if coalesce else None
+
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_hook(self, hook: Callable[[Span], None]) -> None:
+        self.hooks.append(hook)
+
+    def _span(self, op: str, key: Optional[str] = None):
+        """フック登録時のみSpanを計測する（未登録なら何もしない）"""
+        if not self.hooks:
+            return nullcontext()
+        return _SpanScope(Span(op, key), self.hooks, self.debug_mode)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        span = _current_span.get()
+        if span is None:
+            return self.session.get(url, **kwargs)
+        # ヘッダー受信(first_byte)と本文受信(body)を分けて計測するため常にstreamで受け取る
+        stream = kwargs.pop('stream', False)
+        connect = span.stages.get('connect', 0.0)
+        t0 = time.perf_counter()
+        res = self.session.get(url, stream=True, **kwargs)
+        span.record_response(res, time.perf_counter() - t0, span.stages.get('connect', 0.0) - connect)
+        if not stream:
+            with span.timed('body'):
+                res.content
+        return res
+
+    def _iter_body(self, res: requests.Response, chunk_size: int) -> Iterator[bytes]:
+        """iter_contentの受信待ち時間だけをbodyとして計測する（呼び出し側の解析時間は含めない）"""
+        span = _current_span.get()
+        if span is None:
+            yield from res.iter_content(chunk_size)
+            return
+        chunks = res.iter_content(chunk_size)
+        while True:
+            t0 = time.perf_counter()
+            chunk = next(chunks, None)
+            span.add('body', time.perf_counter() - t0)
+            if chunk is None:
+                return
+            yield chunk
+
+    def _coalesce(self, op: str, key: Any, fn: Callable[..., Any], *args) -> Any:
+        if self.inflight is None:
+            return fn(*args)
+        return self.inflight.do((op, key), lambda: fn(*args))
+
+    def inflight_stats(self) -> Dict[str, int]:
+        """flights: 実行した取得数 / coalesced: 実行中の取得に相乗りした呼び出し数 / in_flight: 実行中の数"""
+        if self.inflight is None:
+            return {'flights': 0, 'coalesced': 0, 'in_flight': 0}
+        return self.inflight.stats()
+
+    def _fetch_feed(self, channel_id: str):
+        return self._coalesce('feed', channel_id, self._load_feed, channel_id)
+
+    def _load_feed(self, channel_id: str):
+        with self._span('feed', channel_id) as span:
+            cached = self.feed_cache.get(channel_id)
+            if cached is not None and self.feed_cache.is_fresh(cached):
+                self.feed_cache.record('hits')
+                if span:
+                    span.cache = 'hit'
+                return cached['feed']
+            url = feed_url(channel_id)
+            res = self._get(url, headers=self.feed_cache.conditional_headers(cached))
+            if res.status_code == 304 and cached is not None:
+                # 変更なし: パースせずに保存済みの結果を再利用
+                self.feed_cache.record('not_modified')
+                self.feed_cache.touch(channel_id)
+                if span:
+                    span.cache = 'not_modified'
+                return cached['feed']
+            if not res.ok:
+                raise YoutubeApiError(f'HTTP {res.status_code}: {url}')
+            self.feed_cache.record('misses')
+            with _stage('parse'):
+                feed = parse_feed(res.content)
+            self.feed_cache.put(channel_id, feed, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+            self._record_history(channel_id, feed.videos)
+            return feed
+
+    def feed_cache_stats(self) -> Dict[str, int]:
+        return self.feed_cache.stats()
+
+    def _cache_get(self, namespace: str, key: str) -> Optional[Any]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(namespace, key)
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] cache get error:', e)
+            return None
+
+    def _cache_set(self, namespace: str, key: str, value: Any) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.set(namespace, key, value, CACHE_TTL.get(namespace))
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] cache set error:', e)
+
+    def _record_history(self, channel_id: str, videos: List[YoutubeVideoInfo]) -> None:
+        if self.history is None:
+            return
+        try:
+            self.history.merge(channel_id, videos)
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] history merge error:', e)
+
+    def _record_history_detail(self, detail: YoutubeVideoDetail) -> None:
+        if self.history is None:
+            return
+        try:
+            self.history.update_details([detail])
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] history update error:', e)
 
     def extract_channel_id(self, url: str) -> Optional[str]:
-        patterns = [
-            r"youtube\.com\/channel\/([a-zA-Z0-9_-]+)",
-            r"youtube\.com\/c\/([a-zA-Z0-9_-]+)",
-            r"youtube\.com\/user\/([a-zA-Z0-9_-]+)",
-            r"youtube\.com\/@([a-zA-Z0-9_-]+)",
-        ]
-        for pat in patterns:
-            m = re.search(pat, url)
-            if m:
-                if m.group(1).startswith('UC'):
-                    return m.group(1)
-                return self.extract_channel_id_from_html(url)
-        return None
+        channel_id, lookup_key = parse_channel_url(url)
+        if lookup_key is None:
+            return channel_id
+        channel_id = self._cache_get('channel_id', lookup_key)
+        if channel_id:
+            return channel_id
+        channel_id = self.extract_channel_id_from_html(url)
+        if channel_id:
+            self._cache_set('channel_id', lookup_key, channel_id)
+        return channel_id
 
     def extract_channel_id_from_html(self, url: str) -> Optional[str]:
         try:
-            res = requests.get(url, timeout=10)
-            if not res.ok:
-                return None
-            html = res.text
-            m1 = re.search(r'"channelId":"(UC[^"]+)"', html)
-            if m1:
-                return m1.group(1)
-            m2 = re.search(r'<meta property="og:url" content="https://www.youtube.com/channel/(UC[^"]+)">', html)
-            if m2:
-                return m2.group(1)
+            return self._coalesce('channel_id', url, self._scan_channel_page, url, ('channel_id',)).get('channel_id')
         except Exception:
             pass
         return None
 
+    def _scan_channel_page(self, url: str, fields: Iterable[str]) -> Dict[str, str]:
+        """チャンネルページを逐次読み、fieldsがそろった時点で接続を閉じる（見つかった項目のみ返す）"""
+        with self._span('channel_page', url):
+            scanner = ChannelPageScanner(fields)
+            with self._get(url, stream=True) as res:
+                if not res.ok:
+                    return {}
+                for chunk in self._iter_body(res, 16384):
+                    with _stage('extract'):
+                        done = scanner.feed(chunk)
+                    if done:
+                        break
+            if scanner.pending:
+                _fail('no_match', ','.join(scanner.pending))
+            return scanner.values
+
+    def get_channel_info(self, url: str) -> Optional[YoutubeChannelInfo]:
+        """
+        チャンネルURL（/channel/・@handle・/c/・/user/）からチャンネルID・チャンネル名・オーナー画像を
+        1回のチャンネルページ取得（必要な部分まで）でまとめて取得する。
+        """
+        channel_id, lookup_key = parse_channel_url(url)
+        if channel_id is None and lookup_key is None:
+            return None
+        if channel_id:
+            url = f'https://www.youtube.com/channel/{channel_id}'
+        try:
+            values = self._scan_channel_page(url, ('channel_id', 'name', 'owner_image'))
+        except Exception as e:
+            if self.debug_mode:
+                print('[DEBUG] get_channel_info error:', e)
+            return None
+        channel_id = channel_id or values.get('channel_id')
+        if not channel_id:
+            return None
+        if lookup_key:
+            self._cache_set('channel_id', lookup_key, channel_id)
+        if values.get('owner_image'):
+            self._cache_set('owner_image', channel_id, values['owner_image'])
+        return YoutubeChannelInfo(channel_id, values.get('name'), values.get('owner_image'))
+
     def get_channel_name(self, channel_id: str) -> Optional[str]:
-        feed_url = f'https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}'
         try:
-            feed = feedparser.parse(feed_url)
-            title = getattr(feed.feed, 'title', None)
-            if isinstance(title, list):
-                title = title[0] if title else None
-            if title is not None and not isinstance(title, str):
-                title = str(title)
-            return title
+            return feed_title(self._fetch_feed(channel_id))
         except Exception:
             return None
 
+    def fetch_latest_videos(self, channel_id: str) -> List[YoutubeVideoInfo]:
+        """get_latest_videosの失敗時に例外を送出する版（YoutubeApiError / 通信例外。分類はclassify_failure）"""
+        return feed_videos(self._fetch_feed(channel_id))
+
     def get_latest_videos(self, channel_id: str) -> Optional[List[YoutubeVideoInfo]]:
-        feed_url = f'https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}'
         try:
-            feed = feedparser.parse(feed_url)
-            videos = []
-            for entry in feed.entries:
-                video_id = getattr(entry, 'yt_videoid', '')
-                if isinstance(video_id, list):
-                    video_id = video_id[0] if video_id else ''
-                if not isinstance(video_id, str):
-                    video_id = str(video_id)
-                title = getattr(entry, 'title', '')
-                if isinstance(title, list):
-                    title = title[0] if title else ''
-                if not isinstance(title, str):
-                    title = str(title)
-                author = getattr(entry, 'author', '')
-                if isinstance(author, list):
-                    author = author[0] if author else ''
-                if not isinstance(author, str):
-                    author = str(author)
-                published = getattr(entry, 'published', '')
-                if isinstance(published, list):
-                    published = published[0] if published else ''
-                if not isinstance(published, str):
-                    published = str(published)
-                url = getattr(entry, 'link', '')
-                if isinstance(url, list):
-                    url = url[0] if url else ''
-                if not isinstance(url, str):
-                    url = str(url)
-                type_ = YoutubeVideoType.SHORTS if '/shorts/' in url else YoutubeVideoType.NORMAL
-                videos.append(YoutubeVideoInfo(
-                    video_id=video_id,
-                    title=title,
-                    author=author,
-                    published=published,
-                    url=url,
-                    type=type_,
-                ))
-            return videos
+            return self.fetch_latest_videos(channel_id)
         except Exception:
             return None
 
+    def iter_latest_videos(self, channel_id: str, stop_at: Optional[str] = None) -> Iterator[YoutubeVideoInfo]:
+        """
+        最新動画を新しい順に返すジェネレータ。
+        stop_at（既知のvideo_id）に到達した時点でダウンロード・解析を打ち切る（それより古い動画は返さない）。
+        フィードキャッシュ・同時リクエストの集約・計測はget_latest_videosと共通。
+        取得に失敗した場合は例外を送出する（YoutubeApiError / 通信例外。分類はclassify_failure）。
+        """
+        if stop_at is None:
+            feed = self._fetch_feed(channel_id)
+        else:
+            feed = self._coalesce('feed_until', (channel_id, stop_at), self._load_feed_until, channel_id, stop_at)
+        yield from feed_videos(feed)
+
+    def _parse_feed_stream(self, res: requests.Response, parser: FeedStreamParser) -> Iterator[List[YoutubeVideoInfo]]:
+        for chunk in self._iter_body(res, 8192):
+            with _stage('parse'):
+                batch = parser.feed(chunk)
+            yield batch
+        with _stage('parse'):
+            batch = parser.close()
+        yield batch
+
+    def _load_feed_until(self, channel_id: str, stop_at: str) -> YoutubeFeed:
+        """stop_atより新しい動画だけのYoutubeFeedを返す。最後まで読んだ場合のみキャッシュ・履歴に保存する"""
+        with self._span('feed', channel_id) as span:
+            cached = self.feed_cache.get(channel_id)
+            if cached is not None and self.feed_cache.is_fresh(cached):
+                self.feed_cache.record('hits')
+                if span:
+                    span.cache = 'hit'
+                return _feed_until(cached['feed'], stop_at)
+            url = feed_url(channel_id)
+            with self._get(url, headers=self.feed_cache.conditional_headers(cached), stream=True) as res:
+                if res.status_code == 304 and cached is not None:
+                    self.feed_cache.record('not_modified')
+                    self.feed_cache.touch(channel_id)
+                    if span:
+                        span.cache = 'not_modified'
+                    return _feed_until(cached['feed'], stop_at)
+                if not res.ok:
+                    raise YoutubeApiError(f'HTTP {res.status_code}: {url}')
+                self.feed_cache.record('misses')
+                parser = FeedStreamParser()
+                videos: List[YoutubeVideoInfo] = []
+                for batch in self._parse_feed_stream(res, parser):
+                    for video in batch:
+                        if video.video_id == stop_at:
+                            # 既知の動画に到達: 残りは読まない（途中までの結果はキャッシュしない）
+                            return YoutubeFeed(parser.title, parser.channel_id, videos)
+                        videos.append(video)
+            feed = YoutubeFeed(parser.title, parser.channel_id, videos)
+            self.feed_cache.put(channel_id, feed, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+            self._record_history(channel_id, videos)
+            return feed
+
     def get_live_status(self, video_id: str) -> YoutubeLiveStatus:
-        video_url = f'https://www.youtube.com/watch?v={video_id}'
         try:
-            res = requests.get(video_url, timeout=10)
-            if not res.ok:
-                return YoutubeLiveStatus.NONE
-            content = res.text
-            if '"isLive":true' in content or '"liveBroadcastContent":"live"' in content:
-                return YoutubeLiveStatus.LIVE
-            if '"liveBroadcastContent":"upcoming"' in content or '"isUpcoming":true' in content:
-                return YoutubeLiveStatus.UPCOMING
-            if '"ended":true' in content:
-                return YoutubeLiveStatus.ENDED
-            return YoutubeLiveStatus.NONE
+            return self._probe_live_status(video_id)
         except Exception:
             return YoutubeLiveStatus.NONE
 
+    def _probe_live_status(self, video_id: str, max_probe_bytes: Optional[int] = LIVE_PROBE_MAX_BYTES,
+                           precheck: bool = True) -> YoutubeLiveStatus:
+        # 読み込み上限の異なる呼び出しは相乗りさせない（他の呼び出しの上限で判定されないように）
+        return self._coalesce('live_status', (video_id, max_probe_bytes, precheck), self._load_live_status,
+                              video_id, max_probe_bytes, precheck)
+
+    def _known_live_status(self, video_id: str) -> Optional[YoutubeLiveStatus]:
+        """永続キャッシュ・履歴にある、今後変わらない（配信終了・通常動画等の）ライブ状態。無ければNone"""
+        cached = self._cache_get('video_detail', video_id)
+        if cached is not None:
+            detail = YoutubeVideoDetail.from_dict(cached)
+            if is_immutable_detail(detail):
+                return detail.live_status
+        if self.history is not None:
+            try:
+                video = self.history.get(video_id)
+            except Exception as e:
+                if self.debug_mode:
+                    print('[DEBUG] history read error:', e)
+                video = None
+            # 履歴の種別・ライブ状態は動画詳細で判明した値のみ（フィード由来はNone）
+            if video is not None and is_immutable_detail(video):
+                return video.live_status
+        return None
+
+    def _load_live_status(self, video_id: str, max_probe_bytes: Optional[int] = LIVE_PROBE_MAX_BYTES,
+                          precheck: bool = True) -> YoutubeLiveStatus:
+        """
+        1. 永続キャッシュ・履歴に確定済みの状態があれば通信せずに返す
+        2. precheck=TrueならoEmbed（1KB未満）で存在を確認し、存在しない動画はwatchページを取得しない
+        3. watchページを逐次読み、ライブ状態が確定した時点で接続を閉じる（ページの大半は読まない）。
+           max_probe_bytes（Noneで無制限）まで読んでも確定しない場合のみ、ページ全体を取得して判定する。
+        """
+        with self._span('live_status', video_id) as span:
+            known = self._known_live_status(video_id)
+            if known is not None:
+                if span:
+                    span.cache = 'hit'
+                return known
+            if precheck and self._get(oembed_url(video_id)).status_code in _OEMBED_MISSING:
+                return YoutubeLiveStatus.NONE
+            video_url = f'https://www.youtube.com/watch?v={video_id}'
+            probe = LiveStatusProbe()
+            with self._get(video_url, stream=True) as res:
+                if not res.ok:
+                    return YoutubeLiveStatus.NONE
+                for chunk in self._iter_body(res, 16384):
+                    with _stage('extract'):
+                        status = probe.feed(chunk)
+                    if status is not None:
+                        return status
+                    if max_probe_bytes is not None and probe.bytes_read >= max_probe_bytes:
+                        break
+                else:
+                    return probe.close()
+            res = self._get(video_url)
+            if not res.ok:
+                return YoutubeLiveStatus.NONE
+            with _stage('parse'):
+                return parse_live_status(res.text)
+
+    def get_live_statuses(self, video_ids: List[str], concurrency: int = 8,
+                          max_probe_bytes: Optional[int] = LIVE_PROBE_MAX_BYTES,
+                          precheck: bool = True) -> List[YoutubeLiveStatus]:
+        """
+        複数動画のライブ状態を最大concurrency並列で判定する（結果はvideo_idsと同じ順序）。
+        状態が確定済みの動画は通信せず、各watchページは状態が確定した時点で読み込みを打ち切る。失敗した動画はNONE。
+        precheck: watchページの前にoEmbedで存在を確認する（削除済みの動画が多い場合に有効。1往復増える）
+        """
+        if not video_ids:
+            return []
+
+        def probe(video_id: str) -> YoutubeLiveStatus:
+            try:
+                return self._probe_live_status(video_id, max_probe_bytes, precheck)
+            except Exception:
+                return YoutubeLiveStatus.NONE
+
+        workers = max(1, min(concurrency, len(video_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(probe, video_ids))
+
     def get_latest_video_info(self, channel_id: str) -> Optional[YoutubeVideoInfo]:
         videos = self.get_latest_videos(channel_id)
         if not videos:
@@ -209,144 +1477,119 @@ class YoutubeRssApi:
         return latest
 
     def get_videos_with_paging(self, channel_id: str, page: int = 1, page_size: int = 10) -> Optional[Dict[str, Any]]:
+        """履歴インデックスがあればフィードを反映した上で履歴から、なければ最新フィードの範囲でページングする"""
         videos = self.get_latest_videos(channel_id)
+        if self.history is not None:
+            try:
+                total = self.history.count(channel_id)
+                if total:
+                    return {'videos': self.history.slice(channel_id, (page - 1) * page_size, page_size),
+                            'page': page, 'page_size': page_size, 'total': total}
+            except Exception as e:
+                if self.debug_mode:
+                    print('[DEBUG] history read error:', e)
         if not videos:
             return None
-        total = len(videos)
-        start = (page - 1) * page_size
-        end = start + page_size
-        return {
-            'videos': videos[start:end],
-            'page': page,
-            'page_size': page_size,
-            'total': total,
-        }
+        return paginate_videos(videos, page, page_size)
 
-    def get_video_detail(self, video_id: str) -> Optional[YoutubeVideoDetail]:
-        url = f'https://www.youtube.com/watch?v={video_id}'
+    def get_video_history(self, channel_id: str, cursor: Optional[str] = None, limit: int = 20,
+                          type: Any = None, live_status: Any = None, refresh: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        履歴インデックスから新しい順にlimit件を返す（{'videos', 'next_cursor', 'limit'}）。
+        refresh=Trueなら先にフィードを取得して履歴へ反映する（フィードキャッシュが有効な間は通信しない）。
+        2ページ目以降はnext_cursorを渡し、refresh=Falseで通信なしに読める。
+        type / live_status: YoutubeVideoType / YoutubeLiveStatus（複数指定可）で絞り込み
+        """
+        if self.history is None:
+            return None
+        if refresh:
+            self.get_latest_videos(channel_id)
         try:
-            res = requests.get(url, timeout=10)
-            if not res.ok:
-                return None
-            html = res.text
-            title = re.search(r'<title>(.*?)</title>', html)
-            title = title.group(1).replace(' - YouTube', '') if title else ''
-            author = re.search(r'"author":"([^"]+)"', html)
-            author = author.group(1) if author else ''
-            description = re.search(r'"shortDescription":"([^"]+)"', html)
-            description = description.group(1).replace('\\n', '\n') if description else ''
-            thumbnails = [m.replace('\\/', '/') for m in re.findall(r'"thumbnailUrl":"(https://i\.ytimg\.com[^"]+)"', html)]
-            image_url = thumbnails[0] if thumbnails else f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
-            # Shorts判定
-            is_shorts = False
-            if '/shorts/' in url or re.search(r'"canonicalUrl":"https://www.youtube.com/shorts/', html):
-                is_shorts = True
-            if not is_shorts and re.search(r'"shortsUrl":"https://www.youtube.com/shorts/', html):
-                is_shorts = True
-            # ライブ判定
-            is_live_content = None
-            m_live_content = re.search(r'"isLiveContent"\s*:\s*(true|false)', html)
-            if m_live_content:
-                is_live_content = m_live_content.group(1) == 'true'
-            if self.debug_mode:
-                print('[DEBUG] isLiveContent:', is_live_content)
-            live_broadcast_details = {}
-            m_live_broadcast = re.search(r'"liveBroadcastDetails"\s*:\s*\{([^}]*)\}', html)
-            if m_live_broadcast:
-                fragment = '{' + m_live_broadcast.group(1) + '}'
-                try:
-                    is_live_now = re.search(r'"isLiveNow"\s*:\s*(true|false)', fragment)
-                    start_timestamp = re.search(r'"startTimestamp"\s*:\s*"([^"]+)"', fragment)
-                    end_timestamp = re.search(r'"endTimestamp"\s*:\s*"([^"]+)"', fragment)
-                    live_broadcast_details = {
-                        'isLiveNow': is_live_now.group(1) == 'true' if is_live_now else None,
-                        'startTimestamp': start_timestamp.group(1) if start_timestamp else None,
-                        'endTimestamp': end_timestamp.group(1) if end_timestamp else None,
-                    }
-                except Exception:
-                    pass
-            if self.debug_mode:
-                print('[DEBUG] liveBroadcastDetails:', live_broadcast_details)
-            # type判定
-            type_ = YoutubeVideoType.UNKNOWN
-            if is_shorts:
-                type_ = YoutubeVideoType.SHORTS
-            elif is_live_content is True:
-                if live_broadcast_details.get('isLiveNow') is True:
-                    type_ = YoutubeVideoType.ISLIVE
-                else:
-                    type_ = YoutubeVideoType.LIVECONTENTS
-            elif is_live_content is False:
-                type_ = YoutubeVideoType.NORMAL
-            elif m_live_broadcast:
-                if live_broadcast_details.get('isLiveNow') is True:
-                    type_ = YoutubeVideoType.ISLIVE
-                else:
-                    type_ = YoutubeVideoType.LIVECONTENTS
-            else:
-                if (title and re.search(r'ライブ|配信|生放送|live', title, re.I)) or (description and re.search(r'ライブ|配信|生放送|live', description, re.I)):
-                    type_ = YoutubeVideoType.LIVECONTENTS
-                else:
-                    type_ = YoutubeVideoType.NORMAL
-            if self.debug_mode:
-                print('[DEBUG] type:', type_)
-            # liveStatus
-            live_status = None
-            if live_broadcast_details.get('isLiveNow') is True:
-                live_status = YoutubeLiveStatus.LIVE
-            elif live_broadcast_details.get('isLiveNow') is False:
-                if live_broadcast_details.get('endTimestamp'):
-                    live_status = YoutubeLiveStatus.ENDED
-                else:
-                    live_status = YoutubeLiveStatus.UPCOMING
-            elif type_ == YoutubeVideoType.LIVECONTENTS:
-                live_status = YoutubeLiveStatus.UPCOMING
-            if live_status is None:
-                live_status = YoutubeLiveStatus.NONE
+            return self.history.page(channel_id, cursor, limit, type, live_status)
+        except Exception as e:
             if self.debug_mode:
-                print('[DEBUG] liveStatus:', live_status)
-            return YoutubeVideoDetail(
-                video_id=video_id,
-                title=title,
-                author=author,
-                published='',
-                url=url,
-                description=description,
-                thumbnails=thumbnails,
-                image_url=image_url,
-                type=type_,
-                live_status=live_status,
-            )
+                print('[DEBUG] history read error:', e)
+            return None
+
+    def get_video_detail(self, video_id: str) -> Optional[YoutubeVideoDetail]:
+        try:
+            return self._fetch_video_detail(video_id)
         except Exception as e:
             if self.debug_mode:
                 print('[DEBUG] get_video_detail error:', e)
             return None
 
+    # 失敗時は例外を送出する版（バッチ取得で失敗理由を報告するため）
+    def _fetch_video_detail(self, video_id: str) -> YoutubeVideoDetail:
+        # 相乗りした呼び出し同士で同じオブジェクト・thumbnailsリストを共有しないよう複製して返す
+        return copy.copy(self._coalesce('video_detail', video_id, self._load_video_detail, video_id))
+
+    def _load_video_detail(self, video_id: str) -> YoutubeVideoDetail:
+        with self._span('video_detail', video_id) as span:
+            cached = self._cache_get('video_detail', video_id)
+            if cached is not None:
+                if span:
+                    span.cache = 'hit'
+                return YoutubeVideoDetail.from_dict(cached)
+            url = f'https://www.youtube.com/watch?v={video_id}'
+            res = self._get(url)
+            if not res.ok:
+                raise YoutubeApiError(f'HTTP {res.status_code}: {url}')
+            with _stage('parse'):
+                detail = parse_video_detail(res.text, video_id, url, self.debug_mode)
+            self._record_history_detail(detail)
+            # 配信中・配信予定は状態が変わるため保存しない
+            if is_immutable_detail(detail):
+                self._cache_set('video_detail', video_id, detail.to_dict())
+            return detail
+
     def get_channel_owner_image(self, channel_id: str) -> Optional[str]:
+        cached = self._cache_get('owner_image', channel_id)
+        if cached:
+            return cached
         url = f'https://www.youtube.com/channel/{channel_id}'
         try:
-            res = requests.get(url, timeout=10)
-            if not res.ok:
-                return None
-            html = res.text
-            m = re.search(r'<meta property="og:image" content="([^"]+)"', html)
-            if m:
-                return m.group(1)
+            image = self._coalesce('owner_image', channel_id, self._scan_channel_page, url, ('owner_image',)).get('owner_image')
+            if image:
+                self._cache_set('owner_image', channel_id, image)
+            return image
         except Exception:
             pass
         return None
 
-    def get_latest_videos_with_details(self, channel_id: str, concurrency: int = 3) -> List[YoutubeVideoDetail]:
+    def get_video_details(self, video_ids: List[str], concurrency: int = 3,
+                          on_error: Optional[Callable[[YoutubeDetailFailure], None]] = None) -> List[Optional[YoutubeVideoDetail]]:
+        """
+        複数動画の詳細を最大concurrency並列で取得する。
+        戻り値はvideo_idsと同じ順序で、失敗した動画はNone（失敗理由はon_errorに通知）。
+        """
+        if not video_ids:
+            return []
+        workers = max(1, min(concurrency, len(video_ids)))
+        results: List[Optional[YoutubeVideoDetail]] = [None] * len(video_ids)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._fetch_video_detail, vid) for vid in video_ids]
+            for i, future in enumerate(futures):
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    failure = YoutubeDetailFailure(video_ids[i], e)
+                    if self.debug_mode:
+                        print('[DEBUG] get_video_details failure:', failure)
+                    if on_error:
+                        on_error(failure)
+        return results
+
+    def get_latest_videos_with_details(self, channel_id: str, concurrency: int = 3,
+                                       on_error: Optional[Callable[[YoutubeDetailFailure], None]] = None) -> List[YoutubeVideoDetail]:
         videos = self.get_latest_videos(channel_id)
         if not videos:
             return []
+        details = self.get_video_details([v.video_id for v in videos], concurrency, on_error)
         results = []
-        for i in range(0, len(videos), concurrency):
-            chunk = videos[i:i+concurrency]
-            details = [self.get_video_detail(v.video_id) for v in chunk]
-            for d in details:
-                if d:
-                    results.append(d)
-                    if self.debug_mode:
-                        print('[DETAIL]', d.video_id, d.title, d.type, d.live_status)
+        for d in details:
+            if d:
+                results.append(d)
+                if self.debug_mode:
+                    print('[DETAIL]', d.video_id, d.title, d.type, d.live_status)
         return results
@@ -0,0 +1,154 @@
+"""
+YouTube RSS API Utility メトリクス集計 (Python)
+
+YoutubeRssApi / AsyncYoutubeRssApi のフックとしてSpanを受け取り、メモリ上でPrometheus形式の
+カウンター・ヒストグラムに集計する（外部ライブラリ不要・スレッドセーフ）。
+- youtube_api_requests_total{op,outcome}      取得処理の件数（outcome: ok / error / cache_hit / not_modified）
+- youtube_api_failures_total{op,reason}       失敗分類ごとの件数（timeout / connection / http_4xx / http_5xx / parse / no_match / other）
+- youtube_api_bytes_total{op}                 受信バイト数（圧縮されたまま受信した量）
+- youtube_api_retries_total{op}               リトライ回数
+- youtube_api_duration_seconds{op}            処理全体のレイテンシ（ヒストグラム）
+- youtube_api_stage_seconds{op,stage}         段階ごとのレイテンシ（connect / first_byte / body / parse / extract）
+
+【使い方例】
+from index import YoutubeRssApi
+from metrics import MetricsCollector
+
+metrics = MetricsCollector()
+api = YoutubeRssApi(hooks=[metrics])
+api.get_latest_videos_with_details(channel_id)
+print(metrics.render())            # Prometheus text exposition
+print(metrics.summary())           # op・段階ごとの件数とp50/p99(ms)
+
+# 任意のコールバックも登録できる（Spanの内容は index.Span を参照）
+api.add_hook(lambda span: print(span) if not span.ok else None)
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Prometheusクライアントの既定値に近いバケット境界（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """累積バケット形式のヒストグラム（件数に関わらずメモリ一定）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """バケット内を線形補間した近似値（最上位バケットを超える値は最大境界を返す）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                if i >= len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (target - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _labels(**labels: str) -> str:
+    return ','.join(f'{k}="{v}"' for k, v in labels.items())
+
+
+class MetricsCollector:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[Tuple[str, str], int] = {}
+            self.failures: Dict[Tuple[str, str], int] = {}
+            self.bytes: Dict[str, int] = {}
+            self.retries: Dict[str, int] = {}
+            self.durations: Dict[str, Histogram] = {}
+            self.stages: Dict[Tuple[str, str], Histogram] = {}
+
+    def __call__(self, span) -> None:
+        if span.error:
+            outcome = 'error'
+        elif span.cache:
+            outcome = 'cache_hit' if span.cache == 'hit' else span.cache
+        else:
+            outcome = 'ok'
+        with self._lock:
+            key = (span.op, outcome)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if span.error:
+                key = (span.op, span.error)
+                self.failures[key] = self.failures.get(key, 0) + 1
+            self.bytes[span.op] = self.bytes.get(span.op, 0) + span.bytes
+            self.retries[span.op] = self.retries.get(span.op, 0) + span.retries
+            if span.op not in self.durations:
+                self.durations[span.op] = Histogram(self.buckets)
+            self.durations[span.op].observe(span.duration)
+            for stage, seconds in span.stages.items():
+                key = (span.op, stage)
+                if key not in self.stages:
+                    self.stages[key] = Histogram(self.buckets)
+                self.stages[key].observe(seconds)
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式で出力する"""
+        lines: List[str] = []
+        with self._lock:
+            lines += ['# TYPE youtube_api_requests_total counter']
+            lines += [f'youtube_api_requests_total{{{_labels(op=op, outcome=o)}}} {n}'
+                      for (op, o), n in sorted(self.requests.items())]
+            lines += ['# TYPE youtube_api_failures_total counter']
+            lines += [f'youtube_api_failures_total{{{_labels(op=op, reason=r)}}} {n}'
+                      for (op, r), n in sorted(self.failures.items())]
+            lines += ['# TYPE youtube_api_bytes_total counter']
+            lines += [f'youtube_api_bytes_total{{{_labels(op=op)}}} {n}' for op, n in sorted(self.bytes.items())]
+            lines += ['# TYPE youtube_api_retries_total counter']
+            lines += [f'youtube_api_retries_total{{{_labels(op=op)}}} {n}' for op, n in sorted(self.retries.items())]
+            lines += ['# TYPE youtube_api_duration_seconds histogram']
+            for op, h in sorted(self.durations.items()):
+                lines += self._render_histogram('youtube_api_duration_seconds', h, op=op)
+            lines += ['# TYPE youtube_api_stage_seconds histogram']
+            for (op, stage), h in sorted(self.stages.items()):
+                lines += self._render_histogram('youtube_api_stage_seconds', h, op=op, stage=stage)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histogram(name: str, h: Histogram, **labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, n in zip(h.buckets + (float('inf'),), h.counts):
+            cumulative += n
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{name}_bucket{{{_labels(**labels, le=le)}}} {cumulative}')
+        lines.append(f'{name}_sum{{{_labels(**labels)}}} {h.sum:.6f}')
+        lines.append(f'{name}_count{{{_labels(**labels)}}} {h.count}')
+        return lines
+
+    def summary(self, op: Optional[str] = None) -> str:
+        """op・段階ごとの件数とp50/p99(ms)の表"""
+        lines = [f"{'op':<14}{'stage':<12}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}"]
+        with self._lock:
+            rows = [((o, 'total'), h) for o, h in self.durations.items()] + list(self.stages.items())
+            for (o, stage), h in sorted(rows):
+                if op is None or o == op:
+                    lines.append(f"{o:<14}{stage:<12}{h.count:>8}{h.quantile(0.5) * 1000:>10.2f}"
+                                 f"{h.quantile(0.99) * 1000:>10.2f}")
+            failures = sorted(self.failures.items())
+        if failures:
+            lines.append('failures: ' + ', '.join(f'{o}/{r}={n}' for (o, r), n in failures))
+        return '\n'.join(lines)
@@ -0,0 +1,266 @@
+"""
+YouTube チャンネル一括監視 (Python)
+
+YoutubeRssApiの上に構築した多チャンネル監視。
+- 数千チャンネルをヒープで管理し、次回ポーリング時刻が来たチャンネルだけを並列取得
+- ライブ中・配信予定のチャンネルは短い間隔、取得失敗時は指数的に間隔を延ばす
+- フィードを前回までの既知video_idと比較し、新着動画と状態監視中の動画だけwatchページを取得
+- 新着・配信開始・配信終了などのイベントをコールバックまたはジェネレータで通知
+
+【使い方例】
+from monitor import ChannelMonitor
+
+monitor = ChannelMonitor(on_event=print)
+monitor.add_channels(['UCxxxx', 'UCyyyy'])
+monitor.run_forever()
+
+# ジェネレータで受け取る場合
+for event in monitor.events():
+    print(event.type, event.channel_id, event.video)
+"""
+
+import heapq
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from index import YoutubeLiveStatus, YoutubeRssApi, YoutubeVideoDetail, YoutubeVideoInfo
+
+
+class MonitorEventType(str, Enum):
+    NEW_VIDEO = 'new_video'
+    UPCOMING = 'upcoming'
+    WENT_LIVE = 'went_live'
+    STREAM_ENDED = 'stream_ended'
+
+
+class MonitorEvent:
+    def __init__(self, type: MonitorEventType, channel_id: str, video: YoutubeVideoInfo,
+                 previous_status: Optional[YoutubeLiveStatus] = None):
+        self.type = type
+        self.channel_id = channel_id
+        self.video = video
+        self.previous_status = previous_status
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        return f"<MonitorEvent {self.type.value} {self.channel_id} {self.video.video_id} {self.video.title}>"
+
+
+class ChannelState:
+    def __init__(self, channel_id: str, max_seen: int):
+        self.channel_id = channel_id
+        self.max_seen = max_seen
+        self.seen: 'OrderedDict[str, None]' = OrderedDict()
+        # ライブ中・配信予定として追跡中の動画 (video_id -> 直近の状態)
+        self.tracked: Dict[str, YoutubeLiveStatus] = {}
+        # 追跡中の動画ごとの詳細取得の連続失敗回数（削除・非公開になった動画を追跡から外すため）
+        self.tracked_failures: Dict[str, int] = {}
+        self.primed = False
+        self.failures = 0
+        self.next_poll = 0.0
+        self.last_polled: Optional[float] = None
+
+    def mark_seen(self, video_id: str) -> None:
+        self.seen[video_id] = None
+        self.seen.move_to_end(video_id)
+        while len(self.seen) > self.max_seen:
+            self.seen.popitem(last=False)
+
+
+class ChannelMonitor:
+    """
+    interval: 通常時のポーリング間隔(秒)
+    live_interval / upcoming_interval: ライブ中 / 配信予定の動画があるチャンネルの間隔
+    max_interval: 取得失敗が続いた場合の上限
+    prime_depth: 初回ポーリング時に状態確認する最新動画の件数（イベントは出さず、配信中・配信予定を追跡対象にするだけ）
+    max_tracked_failures: 追跡中の動画の詳細取得がこの回数続けて失敗したら追跡をやめる（削除・非公開など）
+    """
+
+    def __init__(self, api: Optional[YoutubeRssApi] = None, interval: float = 900,
+                 live_interval: float = 60, upcoming_interval: float = 180, max_interval: float = 3600,
+                 concurrency: int = 8, detail_concurrency: int = 3, prime_depth: int = 1,
+                 max_seen: int = 200, jitter: float = 0.1, max_tracked_failures: int = 5,
+                 on_event: Optional[Callable[[MonitorEvent], None]] = None):
+        # フィードは毎回条件付きGETで再検証し、変更がなければ304のみで済ませる
+        self.api = api or YoutubeRssApi(pool_size=max(10, concurrency * detail_concurrency),
+                                        feed_cache_ttl=0, feed_cache_size=100000)
+        self.interval = interval
+        self.live_interval = live_interval
+        self.upcoming_interval = upcoming_interval
+        self.max_interval = max_interval
+        self.concurrency = concurrency
+        self.detail_concurrency = detail_concurrency
+        self.prime_depth = prime_depth
+        self.max_seen = max_seen
+        self.jitter = jitter
+        self.max_tracked_failures = max_tracked_failures
+        self.on_event = on_event
+        self._states: Dict[str, ChannelState] = {}
+        self._schedule: List = []
+        self._lock = threading.Lock()
+
+    @property
+    def channels(self) -> List[str]:
+        with self._lock:
+            return list(self._states)
+
+    def add_channel(self, channel_id: str) -> None:
+        with self._lock:
+            if channel_id in self._states:
+                return
+            state = ChannelState(channel_id, self.max_seen)
+            # 初回は即時（同時実行数はconcurrencyで制限される）
+            state.next_poll = time.monotonic()
+            self._states[channel_id] = state
+            heapq.heappush(self._schedule, (state.next_poll, channel_id))
+
+    def add_channels(self, channel_ids: Iterable[str]) -> None:
+        for channel_id in channel_ids:
+            self.add_channel(channel_id)
+
+    def remove_channel(self, channel_id: str) -> None:
+        # ヒープ上のエントリは取り出し時に無視される
+        with self._lock:
+            self._states.pop(channel_id, None)
+
+    def state(self, channel_id: str) -> Optional[ChannelState]:
+        return self._states.get(channel_id)
+
+    def _due_channels(self, now: float) -> List[ChannelState]:
+        due = []
+        with self._lock:
+            while self._schedule and self._schedule[0][0] <= now:
+                next_poll, channel_id = heapq.heappop(self._schedule)
+                state = self._states.get(channel_id)
+                # 削除済み・再スケジュール済みの古いエントリは捨てる
+                if state is None or state.next_poll != next_poll:
+                    continue
+                due.append(state)
+        return due
+
+    def _reschedule(self, state: ChannelState) -> None:
+        if state.failures:
+            base = min(self.interval * (2 ** (state.failures - 1)), self.max_interval)
+        elif YoutubeLiveStatus.LIVE in state.tracked.values():
+            base = self.live_interval
+        elif YoutubeLiveStatus.UPCOMING in state.tracked.values():
+            base = self.upcoming_interval
+        else:
+            base = self.interval
+        delay = base * (1 + random.uniform(-self.jitter, self.jitter))
+        with self._lock:
+            if state.channel_id not in self._states:
+                return
+            state.next_poll = time.monotonic() + delay
+            heapq.heappush(self._schedule, (state.next_poll, state.channel_id))
+
+    def seconds_until_next_poll(self) -> Optional[float]:
+        with self._lock:
+            if not self._schedule:
+                return None
+            return max(0.0, self._schedule[0][0] - time.monotonic())
+
+    def poll_channel(self, state: ChannelState) -> List[MonitorEvent]:
+        events: List[MonitorEvent] = []
+        videos = self.api.get_latest_videos(state.channel_id)
+        state.last_polled = time.time()
+        if videos is None:
+            state.failures += 1
+            return events
+        state.failures = 0
+        priming = not state.primed
+        if priming:
+            targets = [v.video_id for v in videos[:self.prime_depth]]
+            new_ids = set()
+            for v in videos:
+                state.mark_seen(v.video_id)
+        else:
+            new_ids = {v.video_id for v in videos if v.video_id not in state.seen}
+            targets = [v.video_id for v in videos if v.video_id in new_ids]
+        # 新着と追跡中の動画だけ詳細を取得
+        targets += [vid for vid in state.tracked if vid not in targets]
+        details = self.api.get_video_details(targets, self.detail_concurrency) if targets else []
+        for video_id, detail in zip(targets, details):
+            if detail is None:
+                self._tracked_failure(state, video_id)
+                continue
+            state.tracked_failures.pop(video_id, None)
+            if priming:
+                # 監視開始前からの配信・予定は通知せず、以降の状態変化（開始・終了）だけを通知する
+                if detail.live_status in (YoutubeLiveStatus.LIVE, YoutubeLiveStatus.UPCOMING):
+                    state.tracked[video_id] = detail.live_status
+                continue
+            if video_id in new_ids:
+                state.mark_seen(video_id)
+                events.append(MonitorEvent(MonitorEventType.NEW_VIDEO, state.channel_id, detail))
+            events.extend(self._status_events(state, detail))
+        state.primed = True
+        return events
+
+    def _tracked_failure(self, state: ChannelState, video_id: str) -> None:
+        if video_id not in state.tracked:
+            return
+        failures = state.tracked_failures.get(video_id, 0) + 1
+        if failures >= self.max_tracked_failures:
+            del state.tracked[video_id]
+            state.tracked_failures.pop(video_id, None)
+        else:
+            state.tracked_failures[video_id] = failures
+
+    def _status_events(self, state: ChannelState, detail: YoutubeVideoDetail) -> List[MonitorEvent]:
+        previous = state.tracked.get(detail.video_id)
+        current = detail.live_status
+        events = []
+        if current == YoutubeLiveStatus.LIVE:
+            if previous != YoutubeLiveStatus.LIVE:
+                events.append(MonitorEvent(MonitorEventType.WENT_LIVE, state.channel_id, detail, previous))
+            state.tracked[detail.video_id] = current
+        elif current == YoutubeLiveStatus.UPCOMING:
+            if previous is None:
+                events.append(MonitorEvent(MonitorEventType.UPCOMING, state.channel_id, detail, previous))
+            state.tracked[detail.video_id] = current
+        elif previous is not None:
+            # 追跡中だった配信が終了（または配信予定が取り消し）
+            if previous == YoutubeLiveStatus.LIVE or current == YoutubeLiveStatus.ENDED:
+                events.append(MonitorEvent(MonitorEventType.STREAM_ENDED, state.channel_id, detail, previous))
+            del state.tracked[detail.video_id]
+        return events
+
+    def poll_due(self, now: Optional[float] = None) -> List[MonitorEvent]:
+        """次回ポーリング時刻を過ぎたチャンネルを並列に取得し、発生したイベントを返す"""
+        due = self._due_channels(time.monotonic() if now is None else now)
+        if not due:
+            return []
+        events: List[MonitorEvent] = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(due)))) as pool:
+            futures = [pool.submit(self.poll_channel, state) for state in due]
+            for state, future in zip(due, futures):
+                try:
+                    events.extend(future.result())
+                except Exception as e:
+                    state.failures += 1
+                    if self.api.debug_mode:
+                        print('[DEBUG] poll_channel error:', state.channel_id, e)
+                self._reschedule(state)
+        if self.on_event:
+            for event in events:
+                self.on_event(event)
+        return events
+
+    def events(self, stop: Optional[threading.Event] = None) -> Iterator[MonitorEvent]:
+        """stopがセットされるまでポーリングを続け、イベントを順に返すジェネレータ"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for event in self.poll_due():
+                yield event
+            wait = self.seconds_until_next_poll()
+            stop.wait(self.interval if wait is None else min(wait, self.interval))
+
+    def run_forever(self, stop: Optional[threading.Event] = None) -> None:
+        for _ in self.events(stop):
+            pass
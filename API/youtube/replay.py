@@ -0,0 +1,449 @@
+"""
+YouTube RSS API Utility 記録/再生ハーネス (Python)
+
+YoutubeRssApiの通信層(requests.Session)に差し込む記録・再生アダプタと、
+保存したフィクスチャを配信するローカルスタブHTTPサーバー。ネットワーク無しで計測・回帰確認ができる。
+
+【使い方】
+  python replay.py record --fixtures DIR CHANNEL_URL ...
+    実際のYouTubeにアクセスし、フィード・watchページ・チャンネルページをDIRに保存
+  python replay.py synth --fixtures DIR [--channels N]
+    実ページと同じ構造の合成フィクスチャを生成（オフライン環境用）
+  python replay.py serve --fixtures DIR [--port 8080] [--latency MS]
+    フィクスチャを配信するスタブサーバーを起動
+
+【コードから使う場合】
+from index import YoutubeRssApi
+from replay import recording_session, replay_session, server_session
+
+api = YoutubeRssApi(session=recording_session('fixtures'))   # 実通信しつつ保存
+api = YoutubeRssApi(session=replay_session('fixtures'))      # 保存済みレスポンスのみで動作
+api = YoutubeRssApi(session=server_session('http://127.0.0.1:8080'))  # スタブサーバーへ転送
+
+【フィクスチャ形式】
+- DIR/index.json: URL(ホスト+パス+クエリ) → status・headers・ファイル名
+- watchページは watch-<video_id>.html、フィードは feed-<channel_id>.xml、その他は page-<hash>.txt
+  （bench.pyは *.html / *.xml をそのまま計測対象として読み込む）
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+from index import InstrumentedAdapter, YoutubeRssApi, create_session, oembed_url
+
+# 本文は展開済みで保存するため、転送時の符号化に関するヘッダーは記録しない
+_SKIP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'set-cookie'}
+_DEFAULT_HOST = 'www.youtube.com'
+_HOST_HEADER = 'X-Fixture-Host'
+
+
+def fixture_key(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.netloc + parts.path + ('?' + parts.query if parts.query else '')
+
+
+def _fixture_filename(url: str, content_type: str) -> str:
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    safe = re.compile(r'[^A-Za-z0-9_-]')
+    if parts.path == '/watch' and 'v' in query:
+        return f"watch-{safe.sub('_', query['v'][0])}.html"
+    if parts.path.endswith('/videos.xml') and 'channel_id' in query:
+        return f"feed-{safe.sub('_', query['channel_id'][0])}.xml"
+    ext = '.bin' if content_type.startswith('image/') else '.txt'
+    return 'page-' + hashlib.sha1(fixture_key(url).encode('utf-8')).hexdigest()[:16] + ext
+
+
+class FixtureStore:
+    """フィクスチャディレクトリの読み書き（スレッドセーフ）"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict] = {}
+        path = os.path.join(directory, 'index.json')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self._index = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self) -> List[str]:
+        return list(self._index)
+
+    def save(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        headers = {k: v for k, v in headers.items() if k.lower() not in _SKIP_HEADERS}
+        filename = _fixture_filename(url, headers.get('Content-Type', headers.get('content-type', '')))
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, filename), 'wb') as f:
+                f.write(body)
+            self._index[fixture_key(url)] = {'status': status, 'headers': headers, 'file': filename}
+            tmp = os.path.join(self.directory, 'index.json.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, os.path.join(self.directory, 'index.json'))
+
+    def lookup(self, key: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        with open(os.path.join(self.directory, entry['file']), 'rb') as f:
+            return entry['status'], dict(entry['headers']), f.read()
+
+
+def _not_modified(request_headers, headers: Dict[str, str]) -> bool:
+    etag = headers.get('ETag') or headers.get('etag')
+    return bool(etag) and request_headers.get('If-None-Match') == etag
+
+
+class RecordingAdapter(InstrumentedAdapter):
+    """実通信のレスポンスをそのまま返しつつ、FixtureStoreに保存する"""
+
+    def __init__(self, store: FixtureStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code != 304:
+            # contentを読み切ってから保存（stream=Trueの呼び出し側もcontentから再読込される）
+            self.store.save(request.url, response.status_code, dict(response.headers), response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """保存済みのレスポンスだけで応答する。未記録のURLは404"""
+
+    def __init__(self, store: FixtureStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        found = self.store.lookup(fixture_key(request.url))
+        if found is None:
+            status, headers, body = 404, {'Content-Type': 'text/plain'}, b'fixture not found'
+        else:
+            status, headers, body = found
+            if _not_modified(request.headers, headers):
+                status, body = 304, b''
+        raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status,
+                           preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
+
+
+class ServerRedirectAdapter(InstrumentedAdapter):
+    """全リクエストをスタブサーバーへ転送する（元のホストはX-Fixture-Hostで伝える）"""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.headers[_HOST_HEADER] = parts.netloc
+        request.url = self.base_url + parts.path + ('?' + parts.query if parts.query else '')
+        return super().send(request, **kwargs)
+
+
+def _mount(session: requests.Session, adapter: HTTPAdapter) -> requests.Session:
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def recording_session(fixtures: str, pool_size: int = 10, retries: int = 3) -> requests.Session:
+    return _mount(create_session(pool_size, retries), RecordingAdapter(
+        FixtureStore(fixtures), pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries))
+
+
+def replay_session(fixtures: str) -> requests.Session:
+    return _mount(create_session(), ReplayAdapter(FixtureStore(fixtures)))
+
+
+def server_session(base_url: str, pool_size: int = 10) -> requests.Session:
+    return _mount(create_session(pool_size, retries=0), ServerRedirectAdapter(
+        base_url, pool_connections=pool_size, pool_maxsize=pool_size))
+
+
+class FixtureServer:
+    """
+    フィクスチャを配信するスタブHTTPサーバー。
+    latency: 応答前に待つ秒数（実回線の往復遅延の模擬）
+    """
+
+    def __init__(self, fixtures: str, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        store = FixtureStore(fixtures)
+        self.store = store
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # ヘッダーと本文を別々に書き込むため、Nagle+遅延ACKの待ちを避ける
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # 途中で読み込みを打ち切るクライアント（ライブ状態の逐次判定など）
+                    pass
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                key = self.headers.get(_HOST_HEADER, _DEFAULT_HOST) + self.path
+                found = store.lookup(key)
+                if found is None:
+                    status, headers, body = 404, {'Content-Type': 'text/plain'}, b'fixture not found'
+                else:
+                    status, headers, body = found
+                    if _not_modified(self.headers, headers):
+                        status, body = 304, b''
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def synthetic_watch_page(video_id: str, live: bool = False, padding_kb: int = 600,
+                         channel_id: str = 'UCabcdefghijklmnopqrstuv', shorts: bool = False) -> str:
+    """実watchページ(数百KB)に近い構造・サイズの合成ページを生成する"""
+    details = {
+        'videoId': video_id,
+        'title': f'合成テスト動画 {video_id}',
+        'lengthSeconds': '631',
+        'keywords': ['test', 'bench'],
+        'channelId': channel_id,
+        'shortDescription': '1行目\n2行目 "quoted" \\ backslash\n' * 20,
+        'isLiveContent': live,
+        'isLive': live,
+        'thumbnail': {'thumbnails': [
+            {'url': f'https://i.ytimg.com/vi/{video_id}/default.jpg', 'width': 120, 'height': 90},
+            {'url': f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg', 'width': 480, 'height': 360},
+        ]},
+        'author': 'PEX Channel',
+        'viewCount': '12345',
+    }
+    micro = {
+        'thumbnail': {'thumbnails': [{'url': f'https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg', 'width': 1280, 'height': 720}]},
+        'title': {'simpleText': details['title']},
+        'description': {'simpleText': details['shortDescription']},
+        'ownerChannelName': 'PEX Channel',
+        'canonicalUrl': f'https://www.youtube.com/{"shorts/" if shorts else "watch?v="}{video_id}',
+        'publishDate': '2026-10-01T10:00:00-07:00',
+        'uploadDate': '2026-10-01T10:00:00-07:00',
+        'isLiveContent': live,
+    }
+    if live:
+        micro['liveBroadcastDetails'] = {'isLiveNow': True, 'startTimestamp': '2026-10-01T10:00:00+00:00'}
+    formats = [{
+        'itag': i,
+        'url': f'https://rr1---sn-example.googlevideo.com/videoplayback?expire=1&itag={i}&' + 'x' * 800,
+        'mimeType': 'video/mp4; codecs="avc1.4d401e"',
+        'bitrate': 1000 * i,
+    } for i in range(40)]
+    player = {
+        'responseContext': {'serviceTrackingParams': [{'service': 'GFEEDBACK', 'params': [{'key': 'k', 'value': 'v' * 64}] * 20}]},
+        'playabilityStatus': {'status': 'OK'},
+        'streamingData': {'expiresInSeconds': '21540', 'adaptiveFormats': formats},
+        'videoDetails': details,
+        'microformat': {'playerMicroformatRenderer': micro},
+    }
+    initial_data = {'contents': {'items': [{'videoRenderer': {'videoId': f'rel{i:08d}', 'title': {'runs': [{'text': 'related ' * 20}]}}} for i in range(400)]}}
+    head_pad = '<script>var _pad="' + ('a' * 1000 + '";\n_pad+="') * (padding_kb // 2) + '";</script>'
+    return (
+        '<!DOCTYPE html><html><head><title>' + details['title'] + ' - YouTube</title>'
+        + head_pad
+        + '<script>var ytInitialPlayerResponse = ' + json.dumps(player, ensure_ascii=False) + ';var meta = {};</script>'
+        + '<script>var ytInitialData = ' + json.dumps(initial_data, ensure_ascii=False) + ';</script>'
+        + '<script>var _tail="' + 'b' * 1000 * (padding_kb // 2) + '";</script>'
+        + '</head><body></body></html>'
+    )
+
+
+def synthetic_feed(entries: int = 15, channel_id: str = 'UCabcdefghijklmnopqrstuv', prefix: str = 'synth') -> bytes:
+    """YouTubeのRSS(Atom+yt+media)と同じ構造の合成フィードを生成する"""
+    items = []
+    for i in range(entries):
+        vid = f'{prefix}{i:06d}'
+        link = f'https://www.youtube.com/shorts/{vid}' if i % 4 == 0 else f'https://www.youtube.com/watch?v={vid}'
+        items.append(f""" <entry>
+  <id>yt:video:{vid}</id>
+  <yt:videoId>{vid}</yt:videoId>
+  <yt:channelId>{channel_id}</yt:channelId>
+  <title>合成テスト動画 #{i} &amp; more</title>
+  <link rel="alternate" href="{link}"/>
+  <author>
+   <name>PEX Channel</name>
+   <uri>https://www.youtube.com/channel/{channel_id}</uri>
+  </author>
+  <published>2026-10-{1 + i % 28:02d}T10:00:00+00:00</published>
+  <updated>2026-10-{1 + i % 28:02d}T11:00:00+00:00</updated>
+  <media:group>
+   <media:title>合成テスト動画 #{i}</media:title>
+   <media:content url="https://www.youtube.com/v/{vid}?version=3" type="application/x-shockwave-flash" width="640" height="390"/>
+   <media:thumbnail url="https://i2.ytimg.com/vi/{vid}/hqdefault.jpg" width="480" height="360"/>
+   <media:description>{'説明文 ' * 80}</media:description>
+   <media:community>
+    <media:starRating count="10" average="5.00" min="1" max="5"/>
+    <media:statistics views="123"/>
+   </media:community>
+  </media:group>
+ </entry>""")
+    return (f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+ <link rel="self" href="http://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"/>
+ <id>yt:channel:{channel_id[2:]}</id>
+ <yt:channelId>{channel_id[2:]}</yt:channelId>
+ <title>PEX Channel</title>
+ <link rel="alternate" href="https://www.youtube.com/channel/{channel_id}"/>
+ <author>
+  <name>PEX Channel</name>
+  <uri>https://www.youtube.com/channel/{channel_id}</uri>
+ </author>
+ <published>2020-01-01T00:00:00+00:00</published>
+""" + '\n'.join(items) + '\n</feed>\n').encode('utf-8')
+
+
+def synthetic_channel_page(channel_id: str, handle: str, padding_kb: int = 400) -> str:
+    """チャンネルページ(@handle)の合成版。channelIdとog:imageは実ページ同様に先頭付近に置く"""
+    return (
+        '<!DOCTYPE html><html><head><title>' + handle + ' - YouTube</title>'
+        + f'<meta property="og:image" content="https://yt3.googleusercontent.com/{channel_id}=s900-c-k-c0x00ffffff-no-rj">'
+        + f'<meta property="og:url" content="https://www.youtube.com/channel/{channel_id}">'
+        + '<script>var ytInitialData = {"metadata":{"channelMetadataRenderer":{"title":"' + handle
+        + '","externalId":"' + channel_id + '","channelId":"' + channel_id + '"}}};</script>'
+        + '<script>var _pad="' + 'c' * 1000 * padding_kb + '";</script></head><body></body></html>'
+    )
+
+
+def synthesize_fixtures(fixtures: str, channels: int = 3, videos: int = 15) -> List[str]:
+    """
+    合成フィクスチャを生成し、チャンネルURL(@handle形式)の一覧を返す。
+    各チャンネルの動画のうち1本は配信中、1本はShortsとして作る。
+    """
+    store = FixtureStore(fixtures)
+    html = {'Content-Type': 'text/html; charset=utf-8'}
+    urls = []
+    for c in range(channels):
+        channel_id = f'UCsynthetic{c:013d}'
+        handle = f'synth{c}'
+        prefix = f's{c}v'
+        store.save(f'https://www.youtube.com/@{handle}', 200, html, synthetic_channel_page(channel_id, handle).encode('utf-8'))
+        store.save(f'https://www.youtube.com/channel/{channel_id}', 200, html,
+                   synthetic_channel_page(channel_id, handle).encode('utf-8'))
+        store.save(f'https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}', 200,
+                   {'Content-Type': 'text/xml; charset=UTF-8', 'ETag': f'"{channel_id}-1"'},
+                   synthetic_feed(videos, channel_id, prefix))
+        for i in range(videos):
+            video_id = f'{prefix}{i:06d}'
+            page = synthetic_watch_page(video_id, live=(i == 1), channel_id=channel_id, shorts=(i % 4 == 0))
+            store.save(f'https://www.youtube.com/watch?v={video_id}', 200, html, page.encode('utf-8'))
+            store.save(oembed_url(video_id), 200, {'Content-Type': 'application/json'},
+                       json.dumps({'type': 'video', 'title': f'Synthetic video {i}', 'author_name': handle,
+                                   'provider_name': 'YouTube'}).encode('utf-8'))
+        urls.append(f'https://www.youtube.com/@{handle}')
+    return urls
+
+
+def record(fixtures: str, channel_urls: List[str]) -> None:
+    api = YoutubeRssApi(session=recording_session(fixtures))
+    for url in channel_urls:
+        channel_id = api.extract_channel_id(url)
+        print('Channel ID:', url, channel_id)
+        if not channel_id:
+            continue
+        api.get_channel_name(channel_id)
+        api.get_channel_owner_image(channel_id)
+        details = api.get_latest_videos_with_details(channel_id, concurrency=5)
+        # ライブ状態の判定で使うoEmbedも記録する
+        api.get_live_statuses([d.video_id for d in details], concurrency=5)
+        print(f'  {len(details)} videos recorded')
+    api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='YouTube RSS API fixture record/replay')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_record = sub.add_parser('record', help='実通信してフィクスチャを保存')
+    p_record.add_argument('--fixtures', default='fixtures')
+    p_record.add_argument('channels', nargs='+')
+    p_synth = sub.add_parser('synth', help='合成フィクスチャを生成')
+    p_synth.add_argument('--fixtures', default='fixtures')
+    p_synth.add_argument('--channels', type=int, default=3)
+    p_synth.add_argument('--videos', type=int, default=15)
+    p_serve = sub.add_parser('serve', help='スタブサーバーを起動')
+    p_serve.add_argument('--fixtures', default='fixtures')
+    p_serve.add_argument('--host', default='127.0.0.1')
+    p_serve.add_argument('--port', type=int, default=8080)
+    p_serve.add_argument('--latency', type=float, default=0.0, help='応答遅延(ms)')
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.fixtures, args.channels)
+    elif args.command == 'synth':
+        for url in synthesize_fixtures(args.fixtures, args.channels, args.videos):
+            print(url)
+    else:
+        server = FixtureServer(args.fixtures, args.host, args.port, args.latency / 1000)
+        print(f'Serving {len(server.store)} fixtures on {server.url} ...')
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
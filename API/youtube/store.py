@@ -0,0 +1,131 @@
+"""
+YouTube RSS API Utility 永続キャッシュ (Python)
+
+SQLiteによるローカル永続キャッシュ。プロセス再起動後も再取得せずに再開できる。
+- 名前空間(namespace)ごとのキー/値(JSON)を保存し、TTLで期限切れ
+- 件数上限を超えた分は最終アクセスが古い順(LRU)に削除
+- WALモード+busy_timeoutで複数ワーカープロセスから同じファイルを安全に共有
+- 接続はスレッドごとに保持（sqlite3の接続はスレッド間で共有しない）
+
+【使い方例】
+from index import YoutubeRssApi
+from store import PersistentCache
+
+api = YoutubeRssApi(cache=PersistentCache('youtube_cache.db'))
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at);
+"""
+
+
+class PersistentCache:
+    """
+    path: SQLiteファイルのパス
+    max_entries: 全名前空間合計の上限件数（超過分はLRUで削除）
+    evict_every: 何回の書き込みごとに期限切れ・超過分の掃除を行うか
+    """
+
+    def __init__(self, path: str = 'youtube_cache.db', max_entries: int = 100000,
+                 evict_every: int = 500, busy_timeout: float = 30):
+        self.path = os.path.abspath(path)
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?',
+            (namespace, key),
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            with self._lock:
+                self.misses += 1
+            return None
+        conn.execute(
+            'UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?',
+            (now, namespace, key),
+        )
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+            (namespace, key, json.dumps(value, ensure_ascii=False, separators=(',', ':')),
+             now + ttl if ttl is not None else None, now),
+        )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self.evict()
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._conn().execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def evict(self) -> int:
+        """期限切れと上限超過分(LRU)を削除し、削除件数を返す"""
+        conn = self._conn()
+        removed = conn.execute('DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                               (time.time(),)).rowcount
+        count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self.max_entries:
+            removed += conn.execute(
+                'DELETE FROM cache WHERE (namespace, key) IN '
+                '(SELECT namespace, key FROM cache ORDER BY accessed_at LIMIT ?)',
+                (count - self.max_entries,),
+            ).rowcount
+        return removed
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._conn().execute('DELETE FROM cache')
+        else:
+            self._conn().execute('DELETE FROM cache WHERE namespace = ?', (namespace,))
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._conn().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
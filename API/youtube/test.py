@@ -1,16 +1,30 @@
 """
 YouTube RSS API Utility テストスクリプト (Python)
 TypeScript test.tsと同等の分類・出力・デバッグ例
+
+  python test.py                 実際のYouTubeにアクセス
+  python test.py --replay DIR    replay.pyで保存したフィクスチャのみで実行（オフライン）
+  python test.py --replay DIR --channel URL
 """
 
+import argparse
+
 from index import YoutubeRssApi, YoutubeVideoType
 
 CHANNEL_URL = "https://www.youtube.com/@PEXkoukunn"
 
 
 def main():
-    api = YoutubeRssApi(debug_mode=False)
-    channel_id = api.extract_channel_id(CHANNEL_URL)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replay", metavar="DIR", help="フィクスチャディレクトリ")
+    parser.add_argument("--channel", default=CHANNEL_URL)
+    args = parser.parse_args()
+    session = None
+    if args.replay:
+        from replay import replay_session
+        session = replay_session(args.replay)
+    api = YoutubeRssApi(debug_mode=False, session=session)
+    channel_id = api.extract_channel_id(args.channel)
     print("Channel ID:", channel_id)
     if not channel_id:
         print("チャンネルID抽出失敗")
@@ -0,0 +1,64 @@
+"""チャンネルページの部分読み（ChannelPageScanner）の回帰テスト（ネットワーク不要）: python -m unittest test_channel_page"""
+
+import unittest
+from typing import Iterable
+
+from index import ChannelPageScanner
+from replay import synthetic_channel_page
+
+CHANNEL_ID = 'UCabcdefghijklmnopqrstuv'
+EXPECTED = {
+    'channel_id': CHANNEL_ID,
+    'name': 'synth0',
+    'owner_image': f'https://yt3.googleusercontent.com/{CHANNEL_ID}=s900-c-k-c0x00ffffff-no-rj',
+}
+
+
+def _scan(chunks: Iterable[bytes]) -> ChannelPageScanner:
+    scanner = ChannelPageScanner()
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner
+
+
+class ChannelPageScannerTest(unittest.TestCase):
+    def test_every_split_point(self):
+        page = synthetic_channel_page(CHANNEL_ID, 'synth0', padding_kb=1).encode('utf-8')
+        # 2分割の境界をすべての位置に置いても、境界をまたぐ一致を見落とさない
+        for i in range(len(page) + 1):
+            scanner = _scan((page[:i], page[i:]))
+            self.assertEqual(scanner.values, EXPECTED, f'split at {i}')
+
+    def test_one_byte_chunks(self):
+        page = synthetic_channel_page(CHANNEL_ID, 'synth0', padding_kb=1).encode('utf-8')
+        self.assertEqual(_scan(page[i:i + 1] for i in range(len(page))).values, EXPECTED)
+
+    def test_long_match_spanning_chunks(self):
+        # 持ち越し(2048バイト)より短い一致なら、チャンクより長くても拾える
+        image = 'https://yt3.googleusercontent.com/' + 'x' * 1900
+        page = (f'<html><head><meta property="og:image" content="{image}">'
+                f'<meta property="og:url" content="https://www.youtube.com/channel/{CHANNEL_ID}">'
+                '<script>var ytInitialData = {"metadata":{"channelMetadataRenderer":{"title":"A \\"quoted\\" name"'
+                '}}};</script></head></html>').encode('utf-8')
+        scanner = _scan(page[i:i + 1000] for i in range(0, len(page), 1000))
+        self.assertEqual(scanner.values['owner_image'], image)
+        self.assertEqual(scanner.values['channel_id'], CHANNEL_ID)
+        self.assertEqual(scanner.values['name'], 'A "quoted" name')
+
+    def test_stops_after_all_fields(self):
+        page = synthetic_channel_page(CHANNEL_ID, 'synth0', padding_kb=400).encode('utf-8')
+        scanner = _scan(page[i:i + 16384] for i in range(0, len(page), 16384))
+        self.assertTrue(scanner.done)
+        self.assertEqual(scanner.values, EXPECTED)
+        self.assertEqual(scanner.bytes_read, 16384)
+
+    def test_requested_fields_only(self):
+        page = synthetic_channel_page(CHANNEL_ID, 'synth0', padding_kb=1).encode('utf-8')
+        scanner = ChannelPageScanner(('channel_id',))
+        self.assertTrue(scanner.feed(page))
+        self.assertEqual(scanner.values, {'channel_id': CHANNEL_ID})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""watchページ解析（extract_player_response / classify_video / parse_video_detail）の回帰テスト（ネットワーク不要）:
+   python -m unittest test_extract"""
+
+import unittest
+from typing import Any, Dict
+
+from index import (
+    YoutubeLiveStatus,
+    YoutubeVideoType,
+    classify_video,
+    extract_player_response,
+    parse_video_detail,
+)
+from replay import synthetic_watch_page
+
+
+def _fields(**overrides: Any) -> Dict[str, Any]:
+    # extract_watch_fieldsと同じキーを持つ、player responseから取り出した直後の値
+    fields = {
+        'found': True, 'title': 'title', 'author': 'author', 'description': '', 'published': '',
+        'thumbnails': [], 'is_shorts': False, 'is_live_content': False, 'is_live': None,
+        'is_upcoming': None, 'live_broadcast_details': None,
+    }
+    fields.update(overrides)
+    return fields
+
+
+class ExtractPlayerResponseTest(unittest.TestCase):
+    def test_extracts_only_player_response(self):
+        player = extract_player_response(synthetic_watch_page('vidA', padding_kb=10))
+        self.assertEqual(player['videoDetails']['videoId'], 'vidA')
+        # 直後のytInitialDataは含まない
+        self.assertNotIn('contents', player)
+
+    def test_without_player_response(self):
+        self.assertIsNone(extract_player_response('<html><head><title>x - YouTube</title></head></html>'))
+
+
+class ParseVideoDetailTest(unittest.TestCase):
+    def test_normal_video(self):
+        detail = parse_video_detail(synthetic_watch_page('vidN', padding_kb=10), 'vidN')
+        self.assertEqual((detail.type, detail.live_status), (YoutubeVideoType.NORMAL, YoutubeLiveStatus.NONE))
+        self.assertEqual(detail.title, '合成テスト動画 vidN')
+        self.assertEqual(detail.author, 'PEX Channel')
+        self.assertEqual(detail.published, '2026-10-01T10:00:00-07:00')
+        self.assertEqual(detail.url, 'https://www.youtube.com/watch?v=vidN')
+        # microformatの大きい画像が先、重複なし
+        self.assertEqual(detail.thumbnails, [
+            'https://i.ytimg.com/vi/vidN/maxresdefault.jpg',
+            'https://i.ytimg.com/vi/vidN/default.jpg',
+            'https://i.ytimg.com/vi/vidN/hqdefault.jpg',
+        ])
+        self.assertIn('"quoted"', detail.description)
+
+    def test_live_video(self):
+        detail = parse_video_detail(synthetic_watch_page('vidL', live=True, padding_kb=10), 'vidL')
+        self.assertEqual((detail.type, detail.live_status), (YoutubeVideoType.ISLIVE, YoutubeLiveStatus.LIVE))
+
+    def test_shorts(self):
+        detail = parse_video_detail(synthetic_watch_page('vidS', shorts=True, padding_kb=10), 'vidS')
+        self.assertEqual(detail.type, YoutubeVideoType.SHORTS)
+
+    def test_fallback_to_title(self):
+        detail = parse_video_detail('<html><title>古い動画 - YouTube</title></html>', 'vidF')
+        self.assertEqual(detail.title, '古い動画')
+        self.assertEqual((detail.type, detail.live_status), (YoutubeVideoType.NORMAL, YoutubeLiveStatus.NONE))
+
+
+class ClassifyVideoTest(unittest.TestCase):
+    def test_cases(self):
+        cases = [
+            (_fields(), (YoutubeVideoType.NORMAL, YoutubeLiveStatus.NONE)),
+            (_fields(is_shorts=True), (YoutubeVideoType.SHORTS, YoutubeLiveStatus.NONE)),
+            (_fields(is_live_content=True, live_broadcast_details={'isLiveNow': True}),
+             (YoutubeVideoType.ISLIVE, YoutubeLiveStatus.LIVE)),
+            (_fields(is_live_content=True, live_broadcast_details={'isLiveNow': False}),
+             (YoutubeVideoType.LIVECONTENTS, YoutubeLiveStatus.UPCOMING)),
+            (_fields(is_live_content=True,
+                     live_broadcast_details={'isLiveNow': False, 'endTimestamp': '2026-10-01T12:00:00+00:00'}),
+             (YoutubeVideoType.LIVECONTENTS, YoutubeLiveStatus.ENDED)),
+            # isLiveContentが無ければliveBroadcastDetailsの有無で判断する
+            (_fields(is_live_content=None, live_broadcast_details={'isLiveNow': None}),
+             (YoutubeVideoType.LIVECONTENTS, YoutubeLiveStatus.UPCOMING)),
+            # どちらも無いページはタイトル・概要のキーワードで判断する
+            (_fields(is_live_content=None, title='夜の生放送'), (YoutubeVideoType.LIVECONTENTS, YoutubeLiveStatus.UPCOMING)),
+            (_fields(is_live_content=None, title='通常の動画'), (YoutubeVideoType.NORMAL, YoutubeLiveStatus.NONE)),
+        ]
+        for fields, expected in cases:
+            with self.subTest(fields=fields):
+                self.assertEqual(classify_video(fields), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""RSSフィードの逐次解析（FeedStreamParser / iter_feed_videos）の回帰テスト（ネットワーク不要）:
+   python -m unittest test_feed"""
+
+import unittest
+from typing import Iterator, List
+
+from index import FeedStreamParser, YoutubeVideoType, iter_feed_videos, parse_feed
+from replay import synthetic_feed
+
+CHANNEL_ID = 'UCabcdefghijklmnopqrstuv'
+
+
+def _chunks(data: bytes, size: int) -> List[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _key(video) -> tuple:
+    return video.video_id, video.title, video.author, video.published, video.url, video.type
+
+
+class FeedStreamParserTest(unittest.TestCase):
+    def setUp(self):
+        self.data = synthetic_feed(15, CHANNEL_ID, 'fv')
+
+    def test_whole_document(self):
+        feed = parse_feed(self.data)
+        self.assertEqual(feed.title, 'PEX Channel')
+        self.assertEqual(len(feed.videos), 15)
+        first, second = feed.videos[:2]
+        self.assertEqual(_key(first), ('fv000000', '合成テスト動画 #0 & more', 'PEX Channel', '2026-10-01T10:00:00+00:00',
+                                       'https://www.youtube.com/shorts/fv000000', YoutubeVideoType.SHORTS))
+        self.assertEqual(second.url, 'https://www.youtube.com/watch?v=fv000001')
+        self.assertEqual(second.type, YoutubeVideoType.NORMAL)
+
+    def test_chunk_boundaries(self):
+        expected = [_key(v) for v in parse_feed(self.data).videos]
+        # 1バイトずつ（マルチバイト文字・タグの途中で分割される）から全体一括まで同じ結果になる
+        for size in (1, 7, 64, 1000, 8192, len(self.data)):
+            with self.subTest(size=size):
+                parser = FeedStreamParser()
+                videos = []
+                for chunk in _chunks(self.data, size):
+                    videos += parser.feed(chunk)
+                videos += parser.close()
+                self.assertEqual([_key(v) for v in videos], expected)
+                self.assertEqual(parser.title, 'PEX Channel')
+
+    def test_entries_are_returned_as_they_complete(self):
+        parser = FeedStreamParser()
+        half = len(self.data) // 2
+        early = parser.feed(self.data[:half])
+        # 前半だけで完成したentryは返され、保持中の木には解析途中のentryしか残らない
+        self.assertTrue(0 < len(early) < 15)
+        self.assertLessEqual(len([e for e in parser._root if e.tag.endswith('entry')]), 1)
+        rest = parser.feed(self.data[half:]) + parser.close()
+        self.assertEqual(len(early) + len(rest), 15)
+
+
+class IterFeedVideosTest(unittest.TestCase):
+    def test_stop_at_skips_remaining_chunks(self):
+        data = synthetic_feed(15, CHANNEL_ID, 'fv')
+        chunks = _chunks(data, 512)
+        consumed = []
+
+        def source() -> Iterator[bytes]:
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        videos = list(iter_feed_videos(source(), stop_at='fv000003'))
+        self.assertEqual([v.video_id for v in videos], ['fv000000', 'fv000001', 'fv000002'])
+        self.assertLess(len(consumed), len(chunks))
+
+    def test_unknown_stop_at_returns_all(self):
+        data = synthetic_feed(5, CHANNEL_ID, 'fv')
+        self.assertEqual(len(list(iter_feed_videos(_chunks(data, 100), stop_at='missing'))), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
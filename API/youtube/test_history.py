@@ -0,0 +1,53 @@
+"""history.VideoHistory の回帰テスト（ネットワーク不要）: python -m unittest test_history"""
+
+import os
+import tempfile
+import unittest
+
+from history import VideoHistory
+from index import YoutubeLiveStatus, YoutubeVideoDetail, YoutubeVideoInfo, YoutubeVideoType
+
+CHANNEL_ID = 'UCsynthetic0000000000000'
+
+
+def _feed_video(video_id: str, published: str) -> YoutubeVideoInfo:
+    # フィード由来の動画はURLから判定したNORMAL/SHORTSの種別だけを持つ
+    return YoutubeVideoInfo(video_id, f'title {video_id}', 'author', published,
+                            f'https://www.youtube.com/watch?v={video_id}', None, YoutubeVideoType.NORMAL)
+
+
+class VideoHistoryMergeTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.history = VideoHistory(os.path.join(self.dir.name, 'history.db'))
+
+    def tearDown(self):
+        self.history.close()
+        self.dir.cleanup()
+
+    def test_merge_keeps_detail_type_and_live_status(self):
+        feed = [_feed_video('v1', '2026-10-01T00:00:00+00:00'), _feed_video('v2', '2026-10-02T00:00:00+00:00')]
+        self.assertEqual(self.history.merge(CHANNEL_ID, feed), 2)
+        detail = YoutubeVideoDetail('v1', 'title v1', 'author', '2026-10-01T00:00:00+00:00',
+                                    'https://www.youtube.com/watch?v=v1',
+                                    live_status=YoutubeLiveStatus.ENDED, type=YoutubeVideoType.LIVECONTENTS)
+        self.assertEqual(self.history.update_details([detail]), 1)
+        # 同じフィードを再取得しても詳細由来の種別・ライブ状態は残る
+        self.assertEqual(self.history.merge(CHANNEL_ID, feed), 0)
+        self.assertEqual(self.history.count(CHANNEL_ID, type=YoutubeVideoType.LIVECONTENTS), 1)
+        self.assertEqual(self.history.count(CHANNEL_ID, live_status=YoutubeLiveStatus.ENDED), 1)
+        self.assertEqual(self.history.count(CHANNEL_ID, type=YoutubeVideoType.NORMAL), 1)
+        videos = {v.video_id: v for v in self.history.page(CHANNEL_ID)['videos']}
+        self.assertEqual(videos['v1'].type, YoutubeVideoType.LIVECONTENTS)
+        self.assertEqual(videos['v1'].live_status, YoutubeLiveStatus.ENDED)
+
+    def test_merge_updates_title(self):
+        self.history.merge(CHANNEL_ID, [_feed_video('v1', '2026-10-01T00:00:00+00:00')])
+        renamed = _feed_video('v1', '2026-10-01T00:00:00+00:00')
+        renamed.title = 'renamed'
+        self.history.merge(CHANNEL_ID, [renamed])
+        self.assertEqual(self.history.page(CHANNEL_ID)['videos'][0].title, 'renamed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+"""
+test.py のTCP/UDPサーバー向け負荷生成・レイテンシ計測クライアント
+
+- TCP: concurrency本の接続ループを並列に回し、接続→挨拶受信→切断までを1リクエストとして計測
+- UDP: 指定レート(pkt/s)でデータグラムを送信し、応答までの時間と未応答(損失)を計測
+- レイテンシは対数バケットのヒストグラムに記録し、p50/p99/p999とスループットを表示
+
+【使い方例】
+python test.py both
+python port.py tcp -c 200 -d 10
+python port.py udp --rate 50000 -c 8 -d 10 --host 127.0.0.1
+"""
+
+import argparse
+import asyncio
+import math
+import socket
+import time
+from collections import deque
+
+# 1バケットあたり約1%の幅（対数スケール）
+_BUCKET_BASE = 1.01
+_LOG_BASE = math.log(_BUCKET_BASE)
+
+
+class Histogram:
+    """マイクロ秒単位の対数バケットヒストグラム（件数に関わらずメモリ一定）"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        us = max(seconds * 1e6, 1.0)
+        index = int(math.log(us) / _LOG_BASE)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                # バケット上端を返す（誤差は最大約1%）
+                return min(_BUCKET_BASE ** (index + 1) / 1e6, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Result:
+    def __init__(self, mode):
+        self.mode = mode
+        self.histogram = Histogram()
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def report(self):
+        elapsed = max((self.finished or time.perf_counter()) - self.started, 1e-9)
+        h = self.histogram
+        lost = max(self.sent - self.received - self.errors, 0)
+        loss = lost / self.sent * 100 if self.sent else 0.0
+        ms = lambda s: f"{s * 1000:.3f}"
+        print(f"[{self.mode}] {elapsed:.2f}s sent {self.sent} received {self.received} "
+              f"errors {self.errors} lost {lost} ({loss:.2f}%)")
+        print(f"  throughput {self.received / elapsed:.1f} req/s, {self.bytes_in / elapsed / 1024:.1f} KB/s in")
+        print(f"  latency ms: min {ms(h.min or 0)} mean {ms(h.mean())} p50 {ms(h.percentile(50))} "
+              f"p99 {ms(h.percentile(99))} p999 {ms(h.percentile(99.9))} max {ms(h.max or 0)}")
+
+
+async def tcp_worker(host, port, deadline, remaining, result, timeout):
+    while time.perf_counter() < deadline and remaining[0] != 0:
+        if remaining[0] > 0:
+            remaining[0] -= 1
+        result.sent += 1
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            data = await asyncio.wait_for(reader.read(), timeout)
+            writer.close()
+        except (OSError, asyncio.TimeoutError):
+            result.errors += 1
+            continue
+        result.histogram.record(time.perf_counter() - started)
+        result.received += 1
+        result.bytes_in += len(data)
+
+
+async def run_tcp(args):
+    result = Result("tcp")
+    deadline = time.perf_counter() + args.duration
+    # requests指定時は全ワーカーで共有する残り件数（-1は無制限）
+    remaining = [args.requests if args.requests else -1]
+    await asyncio.gather(*(tcp_worker(args.host, args.port, deadline, remaining, result, args.timeout)
+                           for _ in range(args.concurrency)))
+    result.finished = time.perf_counter()
+    return result
+
+
+class UdpClient(asyncio.DatagramProtocol):
+    """応答は送信順に届く前提で、ソケットごとの送信時刻キューと先頭から突き合わせる"""
+
+    def __init__(self, result, timeout):
+        self.result = result
+        self.timeout = timeout
+        self.pending = deque()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def send(self, payload):
+        self.pending.append(time.perf_counter())
+        self.transport.sendto(payload)
+        self.result.sent += 1
+
+    def datagram_received(self, data, addr):
+        now = time.perf_counter()
+        self.expire(now)
+        if not self.pending:
+            return
+        self.result.histogram.record(now - self.pending.popleft())
+        self.result.received += 1
+        self.result.bytes_in += len(data)
+
+    def expire(self, now):
+        # timeoutを過ぎた未応答は損失として捨てる
+        while self.pending and now - self.pending[0] > self.timeout:
+            self.pending.popleft()
+
+    def error_received(self, exc):
+        self.result.errors += 1
+        if self.pending:
+            self.pending.popleft()
+
+
+async def run_udp(args):
+    loop = asyncio.get_running_loop()
+    result = Result("udp")
+    family = socket.AF_INET6 if ":" in args.host else socket.AF_INET
+    clients = []
+    for _ in range(args.concurrency):
+        transport, client = await loop.create_datagram_endpoint(
+            lambda: UdpClient(result, args.timeout), remote_addr=(args.host, args.port), family=family)
+        clients.append(client)
+    payload = b"x" * args.size
+    started = time.perf_counter()
+    deadline = started + args.duration
+    total = args.requests or None
+    while True:
+        now = time.perf_counter()
+        if now >= deadline or (total is not None and result.sent >= total):
+            break
+        # 応答が届かないソケットでは受信時のexpireが走らないため、送信前にtimeout超過分を損失にして枠を空ける
+        for c in clients:
+            c.expire(now)
+        if args.rate:
+            # 1ms刻みで、開始からの経過時間に見合う数だけまとめて送る
+            due = int((now - started) * args.rate) - result.sent
+        else:
+            # レート無制限時はソケットごとの未応答数を上限にして送る
+            due = sum(max(0, args.window - len(c.pending)) for c in clients)
+        if total is not None:
+            due = min(due, total - result.sent)
+        for _ in range(due):
+            clients[result.sent % len(clients)].send(payload)
+        await asyncio.sleep(0.001 if args.rate or due == 0 else 0)
+    # 送信後、遅れて届く応答をtimeoutまで待つ
+    drain_deadline = time.perf_counter() + args.timeout
+    while any(c.pending for c in clients) and time.perf_counter() < drain_deadline:
+        await asyncio.sleep(0.005)
+    result.finished = time.perf_counter()
+    for c in clients:
+        c.transport.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="test.py サーバー向け負荷生成・レイテンシ計測")
+    parser.add_argument("mode", choices=["tcp", "udp"])
+    parser.add_argument("--host", default="::1")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument("-c", "--concurrency", type=int, default=50,
+                        help="TCP: 並列接続数 / UDP: 送信ソケット数")
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="計測時間(秒)")
+    parser.add_argument("-n", "--requests", type=int, default=0, help="総リクエスト数（0は時間のみで制限）")
+    parser.add_argument("--rate", type=float, default=0, help="UDP送信レート pkt/s（0は未応答数で制御）")
+    parser.add_argument("--window", type=int, default=32, help="UDPレート無制限時のソケットあたり未応答上限")
+    parser.add_argument("--size", type=int, default=32, help="UDPペイロードのバイト数")
+    parser.add_argument("--timeout", type=float, default=1.0, help="応答待ちのタイムアウト(秒)")
+    args = parser.parse_args(argv)
+
+    runner = run_tcp if args.mode == "tcp" else run_udp
+    result = asyncio.run(runner(args))
+    result.report()
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,398 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import selectors
+import signal
 import socket
-import sys
+import time
 
-# プロトコル選択: "tcp" または "udp"
-protocol = sys.argv[1] if len(sys.argv) > 1 else "tcp"
+# プロトコル選択: "tcp"(--workersでプリフォーク) / "udp" / "both"(asyncioでTCP+UDPを同時待ち受け) / "udp-fast"(バッチ受信)
 port = 2222
 
+TCP_GREETING = b"Hello from IPv6 TCP server!\n"
+UDP_GREETING = b"Hello from IPv6 UDP server!\n"
 
-if protocol.lower() == "tcp":
-    s = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+
+def dual_stack_socket(kind, reuse_port=False):
+    # IPv6ソケットでIPv4-mapped(::ffff:x.x.x.x)も受け付ける
+    s = socket.socket(socket.AF_INET6, kind)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        # 複数プロセスで同じポートを共有し、カーネルに負荷分散させる
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    try:
+        s.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+    except (AttributeError, OSError):
+        pass
     s.bind(("::", port))
-    s.listen()
-    print(f"Listening on IPv6 TCP port {port}...")
+    return s
 
-    while True:
-        conn, addr = s.accept()
-        print(f"TCP connection from {addr}")
-        conn.sendall(b"Hello from IPv6 TCP server!\n")
-        conn.close()
 
-elif protocol.lower() == "udp":
-    s = socket.socket(socket.AF_INET6, socket.SOCK_DGRAM)
-    s.bind(("::", port))
-    print(f"Listening on IPv6 UDP port {port}...")
+def raise_fd_limit():
+    # 数千の同時接続に備えてファイルディスクリプタ上限をハードリミットまで引き上げる
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+class Stats:
+    """接続数・パケット数・バイト数・処理時間を集計し、一定間隔でまとめて表示する"""
+
+    def __init__(self):
+        self.total_connections = 0
+        self.total_packets = 0
+        self.active = 0
+        self._reset()
+
+    def _reset(self):
+        self.connections = 0
+        self.packets = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latencies = []
+        self.started = time.monotonic()
+
+    def record(self, latency, bytes_in=0, bytes_out=0, packet=False):
+        if packet:
+            self.packets += 1
+            self.total_packets += 1
+        else:
+            self.connections += 1
+            self.total_connections += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.latencies.append(latency)
+
+    def record_batch(self, packets, latency, bytes_in, bytes_out):
+        # 1回の起床でまとめて処理したデータグラム群を1件の処理時間として記録する
+        self.packets += packets
+        self.total_packets += packets
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.latencies.append(latency / packets)
+
+    def snapshot(self):
+        # ワーカープロセスからスーパーバイザーへ送る区間集計（送信後はリセット）
+        snap = {
+            "connections": self.connections,
+            "packets": self.packets,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "latencies": self.latencies,
+            "active": self.active,
+        }
+        self._reset()
+        return snap
+
+    def merge(self, snap):
+        self.connections += snap["connections"]
+        self.total_connections += snap["connections"]
+        self.packets += snap["packets"]
+        self.total_packets += snap["packets"]
+        self.bytes_in += snap["bytes_in"]
+        self.bytes_out += snap["bytes_out"]
+        self.latencies.extend(snap["latencies"])
+
+    def report(self, label="stats"):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        lat = sorted(self.latencies)
+        if lat:
+            avg = sum(lat) / len(lat) * 1000
+            p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000
+        else:
+            avg = p99 = 0.0
+        print(
+            f"[{label}] tcp {self.connections / elapsed:8.1f} conn/s (active {self.active}, total {self.total_connections}) | "
+            f"udp {self.packets / elapsed:8.1f} pkt/s (total {self.total_packets}) | "
+            f"in {self.bytes_in / elapsed / 1024:8.1f} KB/s out {self.bytes_out / elapsed / 1024:8.1f} KB/s | "
+            f"latency avg {avg:.3f} ms p99 {p99:.3f} ms",
+            flush=True,
+        )
+        self._reset()
 
+
+class TcpGreeting(asyncio.Protocol):
+    def __init__(self, stats):
+        self.stats = stats
+
+    def connection_made(self, transport):
+        self.started = time.perf_counter()
+        self.stats.active += 1
+        transport.write(TCP_GREETING)
+        # 送信バッファを書き切ってから閉じる
+        transport.close()
+
+    def connection_lost(self, exc):
+        self.stats.active -= 1
+        self.stats.record(time.perf_counter() - self.started, bytes_out=len(TCP_GREETING))
+
+
+class UdpGreeting(asyncio.DatagramProtocol):
+    def __init__(self, stats):
+        self.stats = stats
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        started = time.perf_counter()
+        self.transport.sendto(UDP_GREETING, addr)
+        self.stats.record(time.perf_counter() - started, len(data), len(UDP_GREETING), packet=True)
+
+
+async def serve_both(interval=1.0):
+    loop = asyncio.get_running_loop()
+    raise_fd_limit()
+    stats = Stats()
+    tcp_sock = dual_stack_socket(socket.SOCK_STREAM)
+    tcp_sock.listen(4096)
+    tcp_sock.setblocking(False)
+    server = await loop.create_server(lambda: TcpGreeting(stats), sock=tcp_sock, backlog=4096)
+    udp_sock = dual_stack_socket(socket.SOCK_DGRAM)
+    udp_sock.setblocking(False)
+    udp_transport, _ = await loop.create_datagram_endpoint(lambda: UdpGreeting(stats), sock=udp_sock)
+    print(f"Listening on IPv6 (dual-stack) TCP+UDP port {port}...")
+    try:
+        async with server:
+            while True:
+                await asyncio.sleep(interval)
+                stats.report()
+    finally:
+        udp_transport.close()
+
+
+def serve_udp_fast(max_size=65535, batch=64, interval=1.0, reuse_port=False, rcvbuf=4 << 20):
+    """
+    高スループットUDP: 事前確保したバッファプールにrecvfrom_intoで受信し、
+    1回の起床でソケットが空になるか batch 件に達するまでまとめて処理する
+    """
+    s = dual_stack_socket(socket.SOCK_DGRAM, reuse_port)
+    s.setblocking(False)
+    try:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    except OSError:
+        pass
+    pool = bytearray(max_size * batch)
+    views = [memoryview(pool)[i * max_size:(i + 1) * max_size] for i in range(batch)]
+    # LinuxではMSG_TRUNCで切り詰め前の実サイズが返るため、max_size超過を検出できる
+    trunc_flag = getattr(socket, "MSG_TRUNC", 0)
+    selector = selectors.DefaultSelector()
+    selector.register(s, selectors.EVENT_READ)
+    stats = Stats()
+    label = f"udp-fast pid {os.getpid()}"
+    truncated = 0
+    received = [None] * batch
+    next_report = time.monotonic() + interval
+    print(f"Listening on IPv6 (dual-stack) UDP port {port} (max {max_size} bytes, batch {batch}, pid {os.getpid()})...",
+          flush=True)
     while True:
-        data, addr = s.recvfrom(1024)
-        print(f"UDP packet from {addr}: {data}")
-        s.sendto(b"Hello from IPv6 UDP server!\n", addr)
+        if selector.select(max(0.0, next_report - time.monotonic())):
+            started = time.perf_counter()
+            count = 0
+            bytes_in = 0
+            # 受信フェーズ: ソケットが空になるまでプールへ受信
+            while count < batch:
+                try:
+                    nbytes, addr = s.recvfrom_into(views[count], max_size, trunc_flag)
+                except (BlockingIOError, InterruptedError):
+                    break
+                if nbytes > max_size:
+                    truncated += 1
+                    nbytes = max_size
+                received[count] = (nbytes, addr)
+                bytes_in += nbytes
+                count += 1
+            # 送信フェーズ: 受信した分の応答をまとめて返す
+            bytes_out = 0
+            for i in range(count):
+                try:
+                    bytes_out += s.sendto(UDP_GREETING, received[i][1])
+                except (BlockingIOError, InterruptedError):
+                    pass
+                received[i] = None
+            if count:
+                stats.record_batch(count, time.perf_counter() - started, bytes_in, bytes_out)
+        if time.monotonic() >= next_report:
+            stats.report(label)
+            if truncated:
+                print(f"[{label}] truncated {truncated} datagrams larger than {max_size} bytes", flush=True)
+                truncated = 0
+            next_report += interval
+
+
+async def serve_tcp_worker(stats_queue, interval):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    stats = Stats()
+    sock = dual_stack_socket(socket.SOCK_STREAM, reuse_port=True)
+    sock.listen(4096)
+    sock.setblocking(False)
+    server = await loop.create_server(lambda: TcpGreeting(stats), sock=sock, backlog=4096)
+    pid = os.getpid()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        stats_queue.put((pid, stats.snapshot(), False))
+    # 新規受付を止め、処理中の接続が閉じるのを待ってから最終集計を送る
+    server.close()
+    await server.wait_closed()
+    while stats.active:
+        await asyncio.sleep(0.01)
+    stats_queue.put((pid, stats.snapshot(), True))
+
+
+def tcp_worker_main(stats_queue, interval):
+    # Ctrl+Cはスーパーバイザーが受け取り、ワーカーにはSIGTERMで停止を伝える
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    raise_fd_limit()
+    asyncio.run(serve_tcp_worker(stats_queue, interval))
+
+
+def supervise_tcp(workers, interval=1.0, shutdown_timeout=10.0):
+    """
+    プリフォーク型TCPサーバー: N個のワーカーが("::", port)をSO_REUSEPORTで開き、
+    カーネルが接続を振り分ける。各ワーカーの区間集計をスーパーバイザーが合算して表示する
+    """
+    stats_queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=tcp_worker_main, args=(stats_queue, interval))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    print(f"Listening on IPv6 (dual-stack) TCP port {port} with {workers} workers "
+          f"(pids {', '.join(str(p.pid) for p in procs)})...", flush=True)
+
+    stopping = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.append(True))
+    started = time.monotonic()
+    stats = Stats()
+    active = {}
+    per_worker = {}
+    finished = set()
+    next_report = time.monotonic() + interval
+    deadline = None
+
+    while len(finished) < workers:
+        if stopping and deadline is None:
+            print("Shutting down workers...", flush=True)
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+            deadline = time.monotonic() + shutdown_timeout
+        try:
+            pid, snap, final = stats_queue.get(timeout=max(0.0, min(next_report - time.monotonic(), 0.2)))
+            stats.merge(snap)
+            active[pid] = snap["active"]
+            per_worker[pid] = per_worker.get(pid, 0) + snap["connections"]
+            if final:
+                finished.add(pid)
+        except queue.Empty:
+            pass
+        # 異常終了したワーカーは待たない
+        finished.update(p.pid for p in procs if not p.is_alive() and p.exitcode != 0)
+        if time.monotonic() >= next_report:
+            stats.active = sum(active.values())
+            stats.report("supervisor")
+            next_report += interval
+        if deadline is not None and time.monotonic() > deadline:
+            break
+
+    for p in procs:
+        p.join(max(0.0, deadline - time.monotonic()) if deadline else None)
+        if p.is_alive():
+            p.kill()
+    elapsed = max(time.monotonic() - started, 1e-9)
+    print(f"[supervisor] total {stats.total_connections} connections in {elapsed:.1f}s "
+          f"({stats.total_connections / elapsed:.1f} conn/s)", flush=True)
+    print("per-worker connections: " + ", ".join(f"{pid}={n}" for pid, n in sorted(per_worker.items())),
+          flush=True)
+
+
+def _worker_entry(target, kwargs):
+    # Ctrl+Cは親だけが受けてterminate()で止める（各ワーカーがトレースバックを出さないように）
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    target(**kwargs)
+
+
+def run_workers(target, workers, shutdown_timeout=10.0, **kwargs):
+    # 各ワーカーがSO_REUSEPORTで同じポートを開く（カーネルが送信元ごとに振り分け）
+    procs = [multiprocessing.Process(target=_worker_entry, args=(target, dict(kwargs, reuse_port=True)), daemon=True)
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        # 終了を待って回収する（期限内に止まらないワーカーはkill）
+        deadline = time.monotonic() + shutdown_timeout
+        for p in procs:
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.kill()
+                p.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IPv6 TCP/UDP テストサーバー")
+    parser.add_argument("protocol", nargs="?", default="tcp", type=str.lower, choices=["tcp", "udp", "both", "udp-fast"])
+    parser.add_argument("--workers", type=int, default=1, help="tcp / udp-fast: SO_REUSEPORTで起動するプロセス数")
+    parser.add_argument("--max-size", type=int, default=65535, help="udp-fast: 受信する最大データグラムサイズ")
+    parser.add_argument("--batch", type=int, default=64, help="udp-fast: 1回の起床で処理する最大件数")
+    args = parser.parse_args()
+    protocol = args.protocol
+
+    if protocol == "tcp" and args.workers > 1:
+        supervise_tcp(args.workers)
+
+    elif protocol == "tcp":
+        s = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        s.bind(("::", port))
+        s.listen()
+        print(f"Listening on IPv6 TCP port {port}...")
+
+        while True:
+            conn, addr = s.accept()
+            print(f"TCP connection from {addr}")
+            conn.sendall(TCP_GREETING)
+            conn.close()
+
+    elif protocol == "udp":
+        s = socket.socket(socket.AF_INET6, socket.SOCK_DGRAM)
+        s.bind(("::", port))
+        print(f"Listening on IPv6 UDP port {port}...")
+
+        while True:
+            data, addr = s.recvfrom(1024)
+            print(f"UDP packet from {addr}: {data}")
+            s.sendto(UDP_GREETING, addr)
+
+    elif protocol == "both":
+        try:
+            asyncio.run(serve_both())
+        except KeyboardInterrupt:
+            pass
+
+    elif args.workers > 1:
+        run_workers(serve_udp_fast, args.workers, max_size=args.max_size, batch=args.batch)
+
+    else:
+        try:
+            serve_udp_fast(args.max_size, args.batch)
+        except KeyboardInterrupt:
+            pass
+
 
-else:
-    print("Invalid protocol. Use 'tcp' or 'udp'.")
+if __name__ == "__main__":
+    main()